@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : batch.py
+# @Description : 批量执行的参数矩阵解析：每行一组参数（CSV 格式）
+import csv
+import io
+
+
+def parse_arg_matrix(text: str, specs: list, defaults: list = None) -> list:
+    """
+    把 CSV 文本解析为多组插件参数
+
+    每行对应一次运行，列按插件 args 定义的顺序排列；若第一行全部是参数名，
+    则视为表头，按列名对应参数。缺少的列用 defaults（通常是表单当前值）补齐，
+    空行与 # 开头的行忽略。
+
+    :param text: CSV 文本
+    :param specs: 插件 plugin.json 中的 args 定义
+    :param defaults: 每个参数的默认值，与 specs 一一对应
+    :return: [[arg1, arg2, ...], ...]
+    """
+    names = [spec.get("name") for spec in specs]
+    defaults = list(defaults or [])
+    defaults += [""] * (len(specs) - len(defaults))
+
+    rows = [row for row in csv.reader(io.StringIO(text.lstrip("\ufeff")))
+            if any(cell.strip() for cell in row) and not row[0].lstrip().startswith("#")]
+    if not rows:
+        return []
+
+    columns = list(range(len(specs)))
+    header = [cell.strip() for cell in rows[0]]
+    if specs and all(cell in names for cell in header if cell) and any(header):
+        columns = [names.index(cell) if cell else None for cell in header]
+        rows = rows[1:]
+
+    matrix = []
+    for row in rows:
+        if len(row) > len(columns):
+            raise ValueError(f"第 {len(matrix) + 1} 组参数的列数（{len(row)}）超过插件参数个数（{len(columns)}）")
+        args = list(defaults)
+        for col, cell in zip(columns, row):
+            if col is not None:
+                args[col] = cell.strip()
+        matrix.append(args)
+    return matrix
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : bench_args_form.py
+# @Description : 参数表单基准（offscreen 平台）：在两个插件之间来回切换时，重建表单与复用缓存表单的耗时
+#
+# 用法： python benchmarks/bench_args_form.py --args 20 --switches 50
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+ARG_TYPES = ("string", "file", "folder", "choice", "int")
+
+
+def make_meta(name: str, n_args: int) -> dict:
+    args = []
+    for k in range(n_args):
+        spec = {"name": f"arg{k}", "label": f"参数{k}", "type": ARG_TYPES[k % len(ARG_TYPES)], "default": ""}
+        if spec["type"] == "choice":
+            spec["options"] = [f"选项{i}" for i in range(10)]
+            spec["default"] = "选项0"
+        args.append(spec)
+    return {"name": name, "type": "py", "path": f"/plugins/{name}", "args": args}
+
+
+def switch_times(window, metas: list, switches: int) -> list:
+    costs = []
+    for i in range(switches):
+        t0 = time.perf_counter()
+        window.show_plugin_meta(metas[i % 2])
+        QApplication.processEvents()
+        costs.append((time.perf_counter() - t0) * 1000)
+    return costs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="参数表单切换耗时")
+    parser.add_argument("--args", type=int, default=20, help="每个插件的参数个数")
+    parser.add_argument("--switches", type=int, default=50)
+    opts = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    import ui.main_window as main_window  # noqa: E402
+    from last_args import LastArgs  # noqa: E402
+
+    metas = [make_meta("插件A", opts.args), make_meta("插件B", opts.args)]
+    window = main_window.MainWindow()
+    window.last_args = LastArgs(os.path.join(tempfile.mkdtemp(prefix="bench_args_"), "last_args.json"))
+    window.show()
+    QApplication.processEvents()
+    for label, cache_size in (("每次重建表单", 0), ("复用缓存表单", main_window.FORM_CACHE_SIZE)):
+        main_window.FORM_CACHE_SIZE = cache_size
+        window.form_cache.clear()
+        costs = sorted(switch_times(window, metas, opts.switches))
+        print(f"{label}  中位数 {statistics.median(costs):7.2f} ms  最大 {costs[-1]:7.2f} ms")
+    window.close()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : bench_cli_startup.py
+# @Description : 对比无界面命令行（main.py list）与图形界面启动（导入 PyQt + 创建 QApplication/MainWindow）的耗时
+#
+# 用法： python benchmarks/bench_cli_startup.py --repeat 5
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUI_SNIPPET = """
+import sys
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from ui.main_window import MainWindow
+win = MainWindow()
+win.show()
+app.processEvents()
+win.close()
+"""
+
+
+def measure(cmd: list, repeat: int, env: dict) -> float:
+    costs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=BASE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        costs.append(time.perf_counter() - t0)
+    return statistics.median(costs) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="命令行与图形界面启动耗时对比")
+    parser.add_argument("--repeat", type=int, default=5)
+    opts = parser.parse_args()
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    baseline = measure([sys.executable, "-c", "pass"], opts.repeat, env)
+    cli = measure([sys.executable, "main.py", "list"], opts.repeat, env)
+    gui = measure([sys.executable, "-c", GUI_SNIPPET], opts.repeat, env)
+    print(f"空解释器          {baseline:8.1f} ms")
+    print(f"main.py list      {cli:8.1f} ms")
+    print(f"图形界面(offscreen) {gui:8.1f} ms")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : bench_gui_startup.py
+# @Description : 图形界面冷启动耗时（offscreen 平台）：导入耗时与从进程启动到窗口第一次绘制完成的耗时，超出预算时返回 1
+#
+# 每次在新的 python 进程中测量，分为：
+#   导入 PyQt      解释器启动 + 导入 PyQt5 + 创建 QApplication
+#   导入主窗口     导入 ui.main_window 及其依赖
+#   创建并显示窗口  MainWindow() + show() + 直到窗口收到第一次绘制事件
+# 插件扫描、日志清理等在第一次绘制之后进行，不计入。
+#
+# 用法： python benchmarks/bench_gui_startup.py --repeat 10 --budget-ms 500
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUI_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+from PyQt5.QtCore import QEvent, QObject
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+t1 = time.perf_counter()
+from ui.main_window import MainWindow
+t2 = time.perf_counter()
+
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and obj is win and not painted:
+            painted.append(time.perf_counter())
+        return False
+
+
+painted = []
+win = MainWindow()
+win.installEventFilter(FirstPaint(win))
+win.show()
+while not painted:
+    app.processEvents()
+print(json.dumps({"qt": t1 - t0, "import": t2 - t1, "window": painted[0] - t2}), flush=True)
+win.close()
+"""
+
+STAGES = (("qt", "导入 PyQt"), ("import", "导入主窗口"), ("window", "创建并显示窗口"), ("total", "进程启动到窗口显示"))
+
+
+def measure_once(env: dict) -> dict:
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", GUI_SNIPPET], cwd=BASE, env=env, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL)
+    # 窗口显示后子进程才输出计时，读到输出即为窗口显示的时刻（不含关闭窗口、退出进程的时间）
+    line = proc.stdout.readline()
+    total = time.perf_counter() - t0
+    proc.wait()
+    if proc.returncode != 0 or not line:
+        raise RuntimeError("启动图形界面失败")
+    result = json.loads(line)
+    result["total"] = total
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="图形界面冷启动耗时")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=500, help="进程启动到窗口显示的中位数预算（毫秒）")
+    opts = parser.parse_args()
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    measure_once(env)  # 预热磁盘缓存与 __pycache__，不计入
+    runs = [measure_once(env) for _ in range(opts.repeat)]
+    for key, label in STAGES:
+        ms = sorted(r[key] * 1000 for r in runs)
+        print(f"{label:10s}  中位数 {statistics.median(ms):7.1f} ms  最小 {ms[0]:7.1f} ms  最大 {ms[-1]:7.1f} ms")
+    total = statistics.median(r["total"] for r in runs) * 1000
+    if total > opts.budget_ms:
+        print(f"超出预算：{total:.1f} ms > {opts.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"预算内：{total:.1f} ms <= {opts.budget_ms:.0f} ms")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : bench_log_view.py
+# @Description : 日志控件吞吐基准：逐行 appendPlainText 与 LogView 批量刷新的对比
+#
+# 用法： python benchmarks/bench_log_view.py --lines 200000 --target 100000
+# 以 offscreen 平台运行，不需要显示器；LogView 吞吐低于 --target（行/秒）时返回非 0
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QPlainTextEdit  # noqa: E402
+
+import core  # noqa: E402
+from ui.log_view import LogView  # noqa: E402
+
+CHUNK = 50  # 模拟每次 readyRead 到达的行数
+
+
+def lines_source(total: int):
+    for start in range(0, total, CHUNK):
+        yield [f"processing row {i} of sheet 'Sheet1' ... ok" for i in range(start, min(total, start + CHUNK))]
+
+
+def bench_naive(app, total: int, max_lines: int) -> float:
+    view = QPlainTextEdit()
+    view.setMaximumBlockCount(max_lines)
+    view.show()
+    t0 = time.perf_counter()
+    for chunk in lines_source(total):
+        for line in chunk:
+            view.appendPlainText(f"[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())}] {line}")
+        app.processEvents()
+    return total / (time.perf_counter() - t0)
+
+
+def bench_log_view(app, total: int, max_lines: int) -> float:
+    view = LogView(max_lines)
+    view.show()
+    t0 = time.perf_counter()
+    for chunk in lines_source(total):
+        stamp = core.ts()
+        view.append_lines([f"[{stamp}] {line}" for line in chunk])
+        app.processEvents()
+    view.flush()
+    app.processEvents()
+    return total / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="日志控件吞吐基准")
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--max-lines", type=int, default=10000)
+    parser.add_argument("--target", type=int, default=100000, help="LogView 最低吞吐（行/秒）")
+    opts = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    naive = bench_naive(app, opts.lines, opts.max_lines)
+    batched = bench_log_view(app, opts.lines, opts.max_lines)
+    print(f"逐行 appendPlainText {naive:12.0f} 行/秒")
+    print(f"LogView 批量刷新     {batched:12.0f} 行/秒 (目标 {opts.target})")
+    sys.exit(0 if batched >= opts.target else 1)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : bench_plugin_index.py
+# @Description : 插件清单索引基准：对比全量解析与索引增量扫描的耗时
+#
+# 用法： python benchmarks/bench_plugin_index.py --sizes 1000 10000
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plugin_index import PluginIndex  # noqa: E402
+
+
+def make_plugins(root: Path, n: int):
+    for i in range(n):
+        d = root / f"plugin_{i:05d}"
+        d.mkdir()
+        meta = {
+            "name": f"插件{i}",
+            "type": "py",
+            "description": "基准测试用的合成插件 " * 4,
+            "version": "1.0.0",
+            "entry": "run.py",
+            "args": [{"name": f"arg{k}", "label": f"参数{k}", "type": "string"} for k in range(5)],
+        }
+        (d / "plugin.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+
+def full_parse(root: Path) -> int:
+    """旧实现：每次刷新都 iterdir + exists + json.loads"""
+    count = 0
+    for p in sorted(root.iterdir()):
+        if p.is_dir():
+            j = p / "plugin.json"
+            if j.exists():
+                meta = json.loads(j.read_text(encoding="utf-8"))
+                meta['path'] = str(p)
+                count += 1
+    return count
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        cost = time.perf_counter() - t0
+        best = cost if best is None else min(best, cost)
+    return best * 1000
+
+
+def bench(n: int):
+    work = Path(tempfile.mkdtemp(prefix="bench_index_"))
+    try:
+        root = work / "plugins"
+        root.mkdir()
+        make_plugins(root, n)
+        index_path = work / "plugin_index.json"
+
+        full = timed(lambda: full_parse(root))
+
+        def cold():
+            if index_path.exists():
+                index_path.unlink()
+            idx = PluginIndex(index_path)
+            idx.scan(root)
+            idx.save()
+
+        cold_ms = timed(cold)
+
+        def warm():
+            idx = PluginIndex(index_path)
+            idx.scan(root)
+            idx.save()
+
+        warm_ms = timed(warm)
+
+        # 进程内重复刷新：索引已在内存中，只做 stat 比对
+        resident = PluginIndex(index_path)
+        rescan_ms = timed(lambda: resident.scan(root))
+
+        # 修改 1% 的插件后增量扫描
+        changed = max(1, n // 100)
+        for i in range(changed):
+            j = root / f"plugin_{i:05d}" / "plugin.json"
+            j.write_text(j.read_text(encoding="utf-8").replace("1.0.0", "1.0.1"), encoding="utf-8")
+        idx = PluginIndex(index_path)
+        t0 = time.perf_counter()
+        result = idx.scan(root)
+        idx.save()
+        incr_ms = (time.perf_counter() - t0) * 1000
+
+        print(f"{n:>6} 个插件 | 全量解析 {full:8.1f} ms | 冷索引 {cold_ms:8.1f} ms | "
+              f"启动(载入+扫描) {warm_ms:8.1f} ms | 刷新 {rescan_ms:8.1f} ms | 变更{changed}个 {incr_ms:8.1f} ms (重新解析 {result['parsed']})")
+    finally:
+        shutil.rmtree(str(work), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="插件清单索引基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    opts = parser.parse_args()
+    for size in opts.sizes:
+        bench(size)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : bench_plugin_list.py
+# @Description : 插件列表基准（offscreen 平台）：对比 QListWidget（每个插件一个条目、Qt.UserRole 存完整清单）
+#                与列表模型（精简记录）的填充耗时、内存增长、搜索与切换排序的耗时
+#
+# 每种实现在新的 python 进程中测量，内存为进程常驻内存（RSS）的增长。
+#
+# 用法： python benchmarks/bench_plugin_list.py --sizes 1000 10000 30000
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = """
+import json, sys, time
+sys.path.insert(0, {base!r})
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication, QListView, QListWidget, QListWidgetItem
+from plugin_search import matches, parse_query
+from ui.plugin_model import PluginFilterProxy, PluginListModel, plugin_record
+app = QApplication(sys.argv)
+
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def make_meta(i):
+    return {{"path": "/plugins/plugin_%06d" % i, "name": "插件%d" % i, "type": ("py", "bat", "exe")[i % 3],
+             "version": "1.0.%d" % (i % 7), "description": "基准测试用的合成插件 " * 4, "_search": "chajian%d cj%d" % (i, i),
+             "args": [{{"name": "arg%d" % k, "label": "参数%d" % k, "type": "string", "default": ""}} for k in range(5)]}}
+
+
+n = {n}
+mode = {mode!r}
+# 扫描线程产生的数据：列表模型只在线程中转换为记录，完整清单不进入界面
+batches = [[make_meta(i) for i in range(s, min(n, s + 64))] for s in range(0, n, 64)]
+if mode == "model":
+    batches = [[plugin_record(m) for m in b] for b in batches]
+before = rss_kb()
+t0 = time.perf_counter()
+if mode == "widget":
+    view = QListWidget()
+    view.show()
+    items = {{}}
+    for batch in batches:
+        for meta in batch:
+            item = QListWidgetItem("%d. %s  v%s" % (len(items) + 1, meta["name"], meta["version"]))
+            item.setData(Qt.UserRole, meta)
+            item.setToolTip(meta["description"])
+            items[meta["path"]] = item
+            view.addItem(item)
+        app.processEvents()
+else:
+    model = PluginListModel()
+    proxy = PluginFilterProxy()
+    proxy.setSourceModel(model)
+    view = QListView()
+    view.setUniformItemSizes(True)
+    view.setModel(proxy)
+    view.show()
+    for batch in batches:
+        model.add(batch)
+        app.processEvents()
+fill = time.perf_counter() - t0
+del batches
+grown = rss_kb() - before
+
+t0 = time.perf_counter()
+if mode == "widget":
+    search = {{p: it.data(Qt.UserRole)["_search"] for p, it in items.items()}}
+    keywords = parse_query("chajian1")
+    for p, it in items.items():
+        hidden = not matches(search[p], keywords)
+        if it.isHidden() != hidden:
+            it.setHidden(hidden)
+else:
+    proxy.set_keywords(parse_query("chajian1"))
+app.processEvents()
+filt = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+if mode == "widget":
+    view.sortItems()
+else:
+    model.set_sort_mode("type")
+app.processEvents()
+sort = time.perf_counter() - t0
+print(json.dumps({{"fill": fill, "rss": grown, "filter": filt, "sort": sort}}), flush=True)
+"""
+
+
+def measure(n: int, mode: str) -> dict:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    out = subprocess.run([sys.executable, "-c", SNIPPET.format(base=BASE, n=n, mode=mode)], env=env,
+                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="插件列表基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 30000])
+    opts = parser.parse_args()
+    for size in opts.sizes:
+        for mode, label in (("widget", "QListWidget"), ("model", "列表模型")):
+            r = measure(size, mode)
+            print(f"{size:>6} 个插件 {label:12s} | 填充 {r['fill'] * 1000:8.1f} ms | 内存增长 {r['rss'] / 1024:7.1f} MB | "
+                  f"搜索 {r['filter'] * 1000:7.1f} ms | 排序 {r['sort'] * 1000:7.1f} ms")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : bench_plugin_search.py
+# @Description : 插件搜索基准：预计算拼音搜索文本的耗时，与每次按键过滤的耗时
+#
+# 预计算只在插件清单变化时发生（结果缓存在插件清单索引中），过滤在每次按键时发生。
+#
+# 用法： python benchmarks/bench_plugin_search.py --sizes 1000 10000
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plugin_search import matches, parse_query, pinyin_keys, search_text  # noqa: E402
+
+WORDS = ["合并", "拆分", "转换", "压缩", "导出", "导入", "批量", "重命名", "图片", "表格", "日志", "清理", "备份", "同步",
+         "PDF", "Excel", "Word", "文本", "编码", "查询"]
+QUERIES = ["p", "pdf", "pdfhb", "hebing", "pl", "plcmm", "excel dc", "日志", "zzz"]
+
+
+def make_metas(n: int) -> list:
+    rnd = random.Random(n)
+    return [{"name": "".join(rnd.sample(WORDS, 3)) + str(i), "description": "".join(rnd.sample(WORDS, 5))}
+            for i in range(n)]
+
+
+def bench(n: int):
+    metas = make_metas(n)
+    pinyin_keys("预热")  # 导入 pypinyin、加载词典，不计入
+    t0 = time.perf_counter()
+    texts = [search_text(meta, f"plugin_{i:05d}") for i, meta in enumerate(metas)]
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    costs = []
+    for query in QUERIES:
+        keywords = parse_query(query)
+        t0 = time.perf_counter()
+        hits = sum(1 for text in texts if matches(text, keywords))
+        costs.append(((time.perf_counter() - t0) * 1000, query, hits))
+    worst = max(costs)
+    print(f"{n:>6} 个插件 | 预计算 {build_ms:8.1f} ms | 每次按键过滤 平均 {sum(c[0] for c in costs) / len(costs):6.2f} ms "
+          f"最慢 {worst[0]:6.2f} ms（{worst[1]!r}，命中 {worst[2]}）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="插件搜索基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    opts = parser.parse_args()
+    for size in opts.sizes:
+        bench(size)
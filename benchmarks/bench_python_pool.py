@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : bench_python_pool.py
+# @Description : 对比 py 插件冷启动（新开 python 运行脚本）与在预热进程中运行的启动延迟
+#
+# 插件脚本导入 --preload 中的模块后立即退出，测量从发起运行到进程结束的耗时。
+# 预热进程提前启动并导入模块，不计入耗时（与进程池在后台补充预热进程一致）。
+#
+# 用法： python benchmarks/bench_python_pool.py --repeat 10 --preload pandas,openpyxl
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+from py_worker import job_line, parse_preload, worker_args  # noqa: E402
+
+# 标准库中导入较慢的模块，未安装 pandas 等第三方库时作为默认负载
+DEFAULT_PRELOAD = "asyncio,decimal,email.mime.multipart,http.client,json,logging.handlers,xml.etree.ElementTree,zipfile"
+
+
+def write_plugin(folder: str, modules: list) -> str:
+    script = os.path.join(folder, "run.py")
+    with open(script, "w", encoding="utf-8") as f:
+        for name in modules:
+            f.write(f"import {name}\n")
+        f.write("import sys\nprint('done', sys.argv[1:])\n")
+    return script
+
+
+def cold(script: str, repeat: int) -> list:
+    costs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, script, "x"], cwd=os.path.dirname(script), stdout=subprocess.DEVNULL,
+                       check=True)
+        costs.append(time.perf_counter() - t0)
+    return costs
+
+
+def warm(script: str, modules: list, repeat: int) -> list:
+    # 进程池在插件运行的同时于后台补充预热进程；这里每次在计时前启动并等待预热完成，
+    # 只测量插件的启动延迟，单核机器上也不受补充进程的干扰
+    costs = []
+    for _ in range(repeat):
+        worker = subprocess.Popen([sys.executable] + worker_args(modules), stdin=subprocess.PIPE,
+                                  stdout=subprocess.DEVNULL)
+        time.sleep(1.0)  # 等待预热完成
+        t0 = time.perf_counter()
+        worker.stdin.write(job_line(script, ["x"], os.path.dirname(script)))
+        worker.stdin.flush()
+        worker.wait()
+        costs.append(time.perf_counter() - t0)
+    return costs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="py 插件冷启动与预热启动延迟对比")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--preload", default=DEFAULT_PRELOAD, help="插件导入、预热进程预先导入的模块（逗号分隔）")
+    opts = parser.parse_args()
+
+    modules = parse_preload(opts.preload)
+    with tempfile.TemporaryDirectory() as tmp:
+        script = write_plugin(tmp, modules)
+        cold_costs = cold(script, opts.repeat)
+        warm_costs = warm(script, modules, opts.repeat)
+    for label, costs in (("冷启动", cold_costs), ("预热进程", warm_costs)):
+        ms = sorted(c * 1000 for c in costs)
+        print(f"{label:6s}  中位数 {statistics.median(ms):7.1f} ms  最小 {ms[0]:7.1f} ms  最大 {ms[-1]:7.1f} ms")
+    print(f"加速比 {statistics.median(cold_costs) / statistics.median(warm_costs):.1f}x")
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : cli.py
+# @Description : 无界面命令行入口，供计划任务/脚本调用，不导入 PyQt
+#
+# 用法：
+#   main.py list
+#   main.py run <插件名或目录名> [--arg 参数名=值 ...] [参数值 ...]
+#   main.py install <zip 包或存放 zip 包的文件夹 ...> [--activate]
+#   main.py versions <插件目录名> [--use 版本]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import core
+import plugin_env
+import plugin_installer
+from plugin_store import PluginStore
+import supervisor
+from launcher import LaunchError, default_args, find_plugin, output_encoding, resolve_command
+from logger_manager import get_plugin_logger
+from plugin_index import PluginIndex
+from run_history import RunHistory
+from stream_reader import LineReader
+
+COMMANDS = ("list", "run", "install", "versions")
+
+
+def is_cli(argv: list) -> bool:
+    """命令行参数是否为无界面子命令"""
+    return bool(argv) and argv[0] in COMMANDS
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--plugins", metavar="DIR", help="插件目录，默认使用配置中的插件路径")
+
+    parser = argparse.ArgumentParser(prog="worktoolbox", description="办公百宝箱命令行（无界面）")
+    sub = parser.add_subparsers(dest="command")
+    p_list = sub.add_parser("list", parents=[common], help="列出插件")
+    p_list.add_argument("--json", action="store_true", help="以 JSON 输出")
+    p_run = sub.add_parser("run", parents=[common], help="运行插件，返回插件的退出码")
+    p_run.add_argument("plugin", help="插件名称或插件目录名")
+    p_run.add_argument("--arg", action="append", default=[], metavar="NAME=VALUE", help="按参数名指定参数，可重复")
+    p_run.add_argument("values", nargs="*", help="按参数定义顺序给出的参数值")
+    p_install = sub.add_parser("install", parents=[common], help="安装插件 zip 包，文件夹中的 zip 包并行安装")
+    p_install.add_argument("packages", nargs="+", metavar="PATH", help="zip 包或存放 zip 包的文件夹")
+    p_install.add_argument("--activate", action="store_true",
+                           help="插件已存在时启用新版本，默认只保存为历史版本")
+    p_versions = sub.add_parser("versions", parents=[common], help="列出插件仓库中保存的插件版本，或切换版本")
+    p_versions.add_argument("name", metavar="DIR", help="插件目录名")
+    p_versions.add_argument("--use", metavar="VERSION", help="启用指定的版本（版本号或版本标识）")
+    return parser
+
+
+def discover(plugins_dir=None) -> list:
+    folder = plugins_dir or core.get_plugins_folder()
+    index = PluginIndex(core.get_plugin_index_path())
+    result = index.scan(folder)
+    try:
+        index.save()
+    except OSError:
+        pass
+    for path, err in result["failed"]:
+        print(f"load plugin failed {path} {err}", file=sys.stderr)
+    return result["plugins"]
+
+
+def cmd_list(opts) -> int:
+    plugins = discover(opts.plugins)
+    if opts.json:
+        print(json.dumps([{k: meta.get(k) for k in ("name", "type", "version", "description", "path")}
+                          for meta in plugins], ensure_ascii=False, indent=2))
+        return 0
+    for meta in plugins:
+        print(f"{meta.get('name', '')}\t{meta.get('type', '')}\t{meta.get('version', '')}\t{meta['path']}")
+    return 0
+
+
+def cmd_install(opts) -> int:
+    zip_paths = []
+    for path in opts.packages:
+        zip_paths.extend(plugin_installer.list_zips(path) if os.path.isdir(path) else [path])
+    plugins_dir = opts.plugins or core.get_plugins_folder()
+    plugin_installer.remove_leftovers(plugins_dir)
+    store = PluginStore(plugins_dir)
+    failed = 0
+    for zip_path, staged, error in plugin_installer.stage_many(zip_paths, plugins_dir,
+                                                               workers=min(8, os.cpu_count() or 1)):
+        if staged is not None:
+            dest = os.path.join(str(plugins_dir), staged["name"])
+            activate = opts.activate or not os.path.exists(dest)
+            try:
+                version = store.install(staged, activate)
+                state = "已启用" if activate else "已保存为历史版本"
+                print(f"{zip_path}\t{dest}\t{version['version'] or version['id']}\t{state}")
+                continue
+            except plugin_installer.InstallError as e:
+                error = str(e)
+        failed += 1
+        print(f"安装失败 {zip_path}：{error}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def cmd_versions(opts) -> int:
+    store = PluginStore(opts.plugins or core.get_plugins_folder())
+    versions = store.versions(opts.name)
+    if not versions:
+        print(f"插件 {opts.name} 不在插件仓库中", file=sys.stderr)
+        return 2
+    if opts.use:
+        matched = [v for v in versions if opts.use in (v["id"], v["version"])]
+        if not matched:
+            print(f"插件 {opts.name} 没有版本 {opts.use}", file=sys.stderr)
+            return 2
+        try:
+            # 同一个版本号安装过多次时启用最近安装的
+            store.activate(opts.name, matched[0]["id"])
+        except plugin_installer.InstallError as e:
+            print(f"切换失败：{e}", file=sys.stderr)
+            return 1
+    active = store.active_version(opts.name)
+    for version in versions:
+        mark = "*" if active is not None and version["id"] == active["id"] else " "
+        print(f"{mark} {version['version'] or '-'}\t{version['id']}\t{version['installed']}\t"
+              f"{len(version['files'])} 个文件\t{version['source']}")
+    return 0
+
+
+def build_args(meta: dict, values: list, named: list) -> list:
+    """默认值 <- 位置参数 <- --arg NAME=VALUE"""
+    specs = meta.get("args", [])
+    args = default_args(meta)
+    if len(values) > len(specs):
+        raise LaunchError(f"参数过多：插件只有 {len(specs)} 个参数")
+    args[:len(values)] = values
+    names = [spec.get("name") for spec in specs]
+    for item in named:
+        name, sep, value = item.partition("=")
+        if not sep or name not in names:
+            raise LaunchError(f"无法识别的参数：{item}（可用参数：{', '.join(names)}）")
+        args[names.index(name)] = value
+    return args
+
+
+def run_plugin(meta: dict, args: list, java_path: str, encoding: str = "utf-8") -> int:
+    """运行插件，输出同时写到 stdout 与插件日志，返回插件退出码"""
+    program, program_args, cwd = resolve_command(meta, args, java_path)
+    log_base_path, plugin_log_dir = core.get_loggers_path()
+    plugin_logger = get_plugin_logger(plugin_name=core.chinese_to_pinyin_no_space(meta.get("name", "")),
+                                      log_dir=plugin_log_dir, display_name=meta.get("name", ""))
+    plugin_logger.info("******************************")
+    plugin_logger.info(f"启动：{program} {' '.join(program_args)}")
+    limits = supervisor.read_limits(meta)
+    if supervisor.describe_limits(limits):
+        plugin_logger.info(f"限制：{supervisor.describe_limits(limits)}")
+    # 状态取值与界面作业一致（ui.job_scheduler）
+    run = {"plugin": meta.get("name", ""), "plugin_path": meta.get("path"), "version": meta.get("version"),
+           "args": args, "started": time.time(), "log_path": plugin_logger.path}
+    try:
+        proc = subprocess.Popen([program] + program_args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                **supervisor.popen_kwargs(limits))
+    except OSError as e:
+        plugin_logger.error(f"启动失败：{e}")
+        plugin_logger.close(wait=True)
+        record_run(dict(run, state="failed", exit_code=-1, ended=time.time()))
+        raise LaunchError(f"启动失败：{e}")
+    reader = LineReader(output_encoding(meta, encoding))
+
+    def emit(lines):
+        for line in lines:
+            sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+        plugin_logger.info_lines(lines)
+
+    timed_out = threading.Event()
+    timers = []
+
+    def terminate():
+        supervisor.terminate_tree(proc.pid)
+        timer = threading.Timer(supervisor.GRACE_SECONDS, supervisor.kill_tree, (proc.pid,))
+        timer.daemon = True
+        timer.start()
+        timers.append(timer)
+
+    def on_timeout():
+        timed_out.set()
+        plugin_logger.info(f"运行超过 {limits['timeout']:g} 秒，终止插件")
+        terminate()
+
+    if limits["timeout"]:
+        timer = threading.Timer(limits["timeout"], on_timeout)
+        timer.daemon = True
+        timer.start()
+        timers.append(timer)
+
+    try:
+        for chunk in iter(lambda: proc.stdout.read1(65536), b""):
+            emit(reader.feed(chunk))
+        emit(reader.flush())
+        code = proc.wait()
+        state = "finished"
+        if timed_out.is_set():
+            # 与 coreutils timeout 命令一致
+            code, state = 124, "timeout"
+    except KeyboardInterrupt:
+        supervisor.kill_tree(proc.pid)
+        proc.kill()
+        proc.wait()
+        plugin_logger.info("已强制结束进程树")
+        code = 130
+        state = "stopped"
+    for timer in timers:
+        timer.cancel()
+    if not supervisor.IS_WINDOWS and supervisor.kill_tree(proc.pid):
+        plugin_logger.info("已结束插件遗留的子进程")
+    plugin_logger.info(f"进程结束，退出码：{code}")
+    plugin_logger.close(wait=True)
+    record_run(dict(run, state=state, exit_code=code, ended=time.time()))
+    return code
+
+
+def record_run(run: dict):
+    """写入运行历史；历史库不可用时不影响插件的退出码"""
+    history = RunHistory(str(core.get_data_path() / "run_history.db"))
+    try:
+        history.start()
+        history.record(run)
+        history.close(wait=True)
+    except Exception as e:
+        print(f"写入运行历史失败：{e}", file=sys.stderr)
+
+
+def cmd_run(opts) -> int:
+    meta = find_plugin(discover(opts.plugins), opts.plugin)
+    if meta is None:
+        print(f"未找到插件：{opts.plugin}", file=sys.stderr)
+        return 2
+    try:
+        args = build_args(meta, opts.values, opts.arg)
+        config = core.load_config()
+        if plugin_env.needs_build(meta):
+            # 输出到 stderr，不混入插件自身的输出
+            plugin_env.build_env(meta, config.get("wheel_dir").get("value"),
+                                 lambda line: print(line, file=sys.stderr))
+        return run_plugin(meta, args, config.get("java_path").get("value"),
+                          config.get("output_encoding").get("value"))
+    except LaunchError as e:
+        print(f"{e.title}：{e}", file=sys.stderr)
+        return 2
+    except plugin_env.EnvError as e:
+        print(f"错误：{e}", file=sys.stderr)
+        return 2
+
+
+def main(argv: list) -> int:
+    if hasattr(sys.stdout, "reconfigure"):
+        # 控制台编码不支持的字符（例如 GBK 控制台中的特殊字符）用 ? 替代，避免输出中断
+        sys.stdout.reconfigure(errors="replace")
+    opts = build_parser().parse_args(argv)
+    if opts.command == "list":
+        return cmd_list(opts)
+    if opts.command == "install":
+        return cmd_install(opts)
+    if opts.command == "versions":
+        return cmd_versions(opts)
+    return cmd_run(opts)
@@ -1,37 +1,200 @@
+import copy
 import json
+import logging
 import os
 import sys
+import threading
 import time
 from pathlib import Path
-from pypinyin import lazy_pinyin, Style
 
 def chinese_to_pinyin_no_space(text: str) -> str:
+    # pypinyin 导入时会加载很大的词典，只在真正需要时导入（命令行 list 等不需要）
+    from pypinyin import lazy_pinyin, Style
     # 获取拼音（无声调）
     pinyins = lazy_pinyin(text, style=Style.NORMAL)
     # 每个拼音首字母大写，然后拼接
     return ''.join(word.capitalize() for word in pinyins)
 
+
+def warm_up_pinyin():
+    """在后台线程中预先导入 pypinyin（加载词典约需 0.2 秒），第一次运行插件时不用再等待"""
+    def _load():
+        try:
+            chinese_to_pinyin_no_space("预热")
+        except ImportError:
+            pass
+    threading.Thread(target=_load, name="pinyin-warm-up", daemon=True).start()
+
+DEFAULT_CONFIG = {
+    "java_path": {
+        "value": "",
+        "label": "jdk路径",
+        "type": "file"
+    },
+    "plugin_path": {
+        "value": "C:/plugins",
+        "label": "插件路径",
+        "type": "folder"
+    },
+    "max_parallel": {
+        "value": 2,
+        "label": "最大并行插件数",
+        "type": "int"
+    },
+    "log_max_lines": {
+        "value": 10000,
+        "label": "日志最大显示行数",
+        "type": "int"
+    },
+    "output_encoding": {
+        "value": "utf-8",
+        "label": "插件输出编码",
+        "type": "choice",
+        "options": ["utf-8", "gbk"]
+    },
+    "log_retention_days": {
+        "value": 30,
+        "label": "插件日志保留天数",
+        "type": "int"
+    },
+    "log_max_total_mb": {
+        "value": 1024,
+        "label": "插件日志总大小上限(MB)",
+        "type": "int"
+    },
+    "python_pool_size": {
+        "value": 0,
+        "label": "预热 Python 进程数(0 为关闭)",
+        "type": "int"
+    },
+    "python_pool_preload": {
+        "value": "",
+        "label": "预热时导入的模块(逗号分隔)",
+        "type": "string"
+    },
+    "wheel_dir": {
+        "value": "",
+        "label": "Python 依赖包(wheel)目录",
+        "type": "folder"
+    }
+}
+
+
+class Config:
+    """
+    配置服务：config.json 只在第一次使用时读取一次，之后读取内存中的配置；
+    update() 保存时先写临时文件再替换（写到一半不会损坏配置文件），并把变化的配置项通知给监听者
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._data = None
+        self._listeners = []
+
+    def data(self) -> dict:
+        """内存中的全部配置项（只读，修改请用 update）"""
+        if self._data is None:
+            self._data = self._read()
+        return self._data
+
+    def _read(self) -> dict:
+        try:
+            cfg = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return copy.deepcopy(DEFAULT_CONFIG)
+        if not isinstance(cfg, dict):
+            return copy.deepcopy(DEFAULT_CONFIG)
+        # 旧版本配置文件缺少的配置项用默认值补齐
+        for key, value in DEFAULT_CONFIG.items():
+            if key not in cfg:
+                cfg[key] = copy.deepcopy(value)
+        return cfg
+
+    def get(self, key: str, default=None):
+        """配置项的值"""
+        item = self.data().get(key)
+        if not isinstance(item, dict):
+            return default
+        return item.get("value", default)
+
+    def get_int(self, key: str, minimum: int = None) -> int:
+        return get_config_int(self.data(), key, minimum)
+
+    def snapshot(self) -> dict:
+        """全部配置项的副本，可以随意修改"""
+        return copy.deepcopy(self.data())
+
+    def update(self, values: dict) -> set:
+        """
+        修改配置项的值并保存；值没有变化时不写文件、不通知
+        :param values: {配置项: 值}
+        :return: 发生变化的配置项
+        :raise OSError: 写配置文件失败（监听者的异常不会抛出）
+        """
+        data = self.snapshot()
+        changed = set()
+        for key, value in values.items():
+            item = data.setdefault(key, copy.deepcopy(DEFAULT_CONFIG.get(key, {"label": key, "type": "string"})))
+            # 设置界面提交的都是字符串，30 与 "30" 视为没有变化
+            if str(item.get("value")) != str(value):
+                item["value"] = value
+                changed.add(key)
+        if not changed:
+            return changed
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(str(tmp), str(self.path))
+        self._data = data
+        for listener in list(self._listeners):
+            # 配置已经保存成功，监听者出错（例如新的插件目录无法访问）只记录日志，不当作保存失败
+            try:
+                listener(changed)
+            except Exception:
+                logging.exception("应用配置变化失败")
+        return changed
+
+    def add_listener(self, listener):
+        """注册配置变化的回调 listener(changed_keys: set)，在调用 update 的线程中执行"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+
+_config = []
+
+
+def get_config() -> Config:
+    """进程内共享的配置服务"""
+    if not _config:
+        _config.append(Config(get_config_path()))
+    return _config[0]
+
+
 def load_config():
+    """全部配置项的副本"""
+    return get_config().snapshot()
+
+
+def get_config_int(cfg: dict, key: str, minimum: int = None) -> int:
+    '''
+    读取整数配置项（设置界面保存的是字符串），非法值回退到默认值
+    :return:
+    '''
+    default = DEFAULT_CONFIG[key]["value"]
     try:
-        return json.loads(get_config_path().read_text(encoding="utf-8"))
-    except Exception as e:
-        defalut = {
-            "java_path": {
-                "value": "",
-                "label": "jdk路径",
-                "type": "file"
-            },
-            "plugin_path": {
-                "value": "C:/plugins",
-                "label": "插件路径",
-                "type": "folder"
-            }
-        }
-        return defalut
+        value = int(str(cfg.get(key, {}).get("value", default)).strip())
+    except ValueError:
+        value = default
+    if minimum is not None:
+        value = max(minimum, value)
+    return value
 
 
 def save_config(cfg: dict):
-    get_config_path().write_text(json.dumps(cfg, indent=2, ensure_ascii=False), encoding="utf-8")
+    get_config().update({key: item.get("value") for key, item in cfg.items() if isinstance(item, dict)})
 
 
 def get_base_path() -> str:
@@ -52,16 +215,14 @@ def get_config_path():
     获取配置文件的路径
     :return:
     '''
-    config_path = os.path.join(get_base_path(), 'config.json')
-    Path(config_path).touch(exist_ok=True)
-    return Path(config_path)
+    return Path(get_base_path()) / 'config.json'
 
 
 def get_plugins_folder():
     plugins_dir = get_base_path() + "/plugins"
     # 构建plugins文件夹路径
-    if load_config().get("plugin_path"):
-        plugins_dir = load_config().get("plugin_path").get("value")
+    if get_config().get("plugin_path"):
+        plugins_dir = get_config().get("plugin_path")
     # 如果plugins文件夹不存在，则创建
     if not os.path.exists(plugins_dir):
         os.makedirs(plugins_dir)
@@ -69,8 +230,16 @@ def get_plugins_folder():
     return Path(plugins_dir)
 
 
+_ts_cache = [None, ""]
+
+
 def ts():
-    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    # 同一秒内的时间戳只格式化一次（高频日志时 strftime 的开销很可观）
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[0] = now
+        _ts_cache[1] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+    return _ts_cache[1]
 
 
 def sanitize_name(s: str):
@@ -84,3 +253,27 @@ def get_loggers_path():
     return log_base_path, plugin_log_dir
 
 
+def get_data_path() -> Path:
+    '''
+    获取数据目录（运行历史等需要长期保留的数据）
+    :return:
+    '''
+    data_dir = Path(get_base_path()) / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+def get_cache_path() -> Path:
+    '''
+    获取缓存目录（插件索引等可再生数据）
+    :return:
+    '''
+    cache_dir = Path(get_base_path()) / "cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def get_plugin_index_path() -> Path:
+    return get_cache_path() / "plugin_index.json"
+
+
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : jvm.py
+# @Description : jar 插件的 JVM 启动参数：plugin.json 中的启动配置 + AppCDS 类数据共享归档
+#
+# plugin.json 可选配置：
+#   "jvm": {
+#     "profile": "short",          预设：short（短时工具，启动最快）/ batch（长时间批处理，吞吐优先）
+#     "xms": "64m", "xmx": "1g",   堆大小
+#     "gc": "serial",              serial / parallel / g1 / z / shenandoah
+#     "options": ["-Dx=y"],        其它 JVM 参数
+#     "cds": true                  是否使用 AppCDS 归档（默认开启，需要 JDK 13+）
+#   }
+import hashlib
+import json
+import os
+import re
+import subprocess
+import time
+import uuid
+
+import core
+
+JVM_PROFILES = {
+    # 短时工具：只用 C1 编译、串行 GC，减少启动和预热开销
+    "short": ["-XX:TieredStopAtLevel=1", "-XX:+UseSerialGC"],
+    # 长时间批处理：并行 GC，吞吐优先
+    "batch": ["-XX:+UseParallelGC"],
+}
+
+GC_FLAGS = {
+    "serial": "-XX:+UseSerialGC",
+    "parallel": "-XX:+UseParallelGC",
+    "g1": "-XX:+UseG1GC",
+    "z": "-XX:+UseZGC",
+    "shenandoah": "-XX:+UseShenandoahGC",
+}
+
+# 支持 -XX:ArchiveClassesAtExit（动态 AppCDS 归档）的最低 JDK 版本
+CDS_MIN_VERSION = 13
+
+# 第一次运行时生成的临时归档的后缀；修改时间在 DUMP_SETTLE_SECONDS 秒内的可能还没写完
+DUMP_SUFFIX = ".dump"
+DUMP_SETTLE_SECONDS = 5
+# 归档文件名前缀之后的部分：<摘要>.jsa 或 <摘要>.<进程号>-<随机串>.dump
+ARCHIVE_NAME_RE = re.compile(r"[0-9a-f]{16}\..+")
+
+VERSION_RE = re.compile(r'version "(\d+)(?:\.(\d+))?')
+
+
+def parse_java_version(text: str):
+    """从 java -version 的输出解析主版本号（1.8.0_131 -> 8，17.0.2 -> 17），无法解析时返回 None"""
+    m = VERSION_RE.search(text)
+    if not m:
+        return None
+    major = int(m.group(1))
+    if major == 1 and m.group(2):
+        major = int(m.group(2))
+    return major
+
+
+def _version_cache_path() -> str:
+    return str(core.get_cache_path() / "java_versions.json")
+
+
+def java_major_version(java_path: str):
+    """
+    java 的主版本号；按 java 可执行文件的路径与修改时间缓存，避免每次启动插件都运行 java -version
+    :return: int，无法获取时返回 None
+    """
+    try:
+        st = os.stat(java_path)
+    except OSError:
+        return None
+    key = f"{os.path.abspath(java_path)}|{st.st_mtime_ns}|{st.st_size}"
+    cache_path = _version_cache_path()
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if key in cache:
+        return cache[key]
+    try:
+        proc = subprocess.run([java_path, "-version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              timeout=30, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        version = parse_java_version(proc.stdout.decode("utf-8", "replace"))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    cache[key] = version
+    tmp = cache_path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+    return version
+
+
+def profile_options(jvm: dict) -> list:
+    """plugin.json 中 jvm 配置对应的 JVM 参数（不含 CDS）"""
+    options = list(JVM_PROFILES.get(str(jvm.get("profile", "")).lower(), []))
+    gc = GC_FLAGS.get(str(jvm.get("gc", "")).lower())
+    if gc:
+        # 显式指定的 GC 覆盖预设中的 GC
+        options = [o for o in options if o not in GC_FLAGS.values()] + [gc]
+    if jvm.get("xms"):
+        options.append(f"-Xms{jvm['xms']}")
+    if jvm.get("xmx"):
+        options.append(f"-Xmx{jvm['xmx']}")
+    extra = jvm.get("options", [])
+    if isinstance(extra, str):
+        extra = extra.split()
+    options.extend(str(o) for o in extra)
+    return options
+
+
+def cds_archive_path(jar_path: str, java_path: str, options: list) -> str:
+    """
+    jar 对应的 AppCDS 归档路径：<jar 名>-<jar 绝对路径的哈希>-<摘要>.jsa
+    不同目录下同名的 jar 使用不同的前缀；jar 的大小/修改时间、java 路径与 JVM 参数变化后摘要变化，归档随之失效
+    """
+    st = os.stat(jar_path)
+    java_st = os.stat(java_path)
+    jar_abspath = os.path.abspath(jar_path)
+    digest = hashlib.sha1("|".join([
+        jar_abspath, str(st.st_size), str(st.st_mtime_ns),
+        os.path.abspath(java_path), str(java_st.st_mtime_ns), " ".join(options),
+    ]).encode("utf-8")).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(jar_path))[0]
+    path_hash = hashlib.sha1(jar_abspath.encode("utf-8")).hexdigest()[:8]
+    return str(core.get_cache_path() / "cds" / f"{name}-{path_hash}-{digest}.jsa")
+
+
+def _archive_prefix(archive: str) -> str:
+    """归档文件名中同一个 jar 共用的部分：<jar 名>-<jar 绝对路径的哈希>-"""
+    return os.path.basename(archive).rsplit("-", 1)[0] + "-"
+
+
+def _remove_stale_archives(archive: str):
+    """删除同一个 jar 的旧归档及未完成的生成文件（jar 更新或 JVM 参数变化后留下的）"""
+    folder, name = os.path.split(archive)
+    prefix = _archive_prefix(archive)
+    current = name[:-len(".jsa")]
+    for other in os.listdir(folder):
+        if other.startswith(prefix) and ARCHIVE_NAME_RE.fullmatch(other[len(prefix):]) and not other.startswith(current):
+            try:
+                os.remove(os.path.join(folder, other))
+            except OSError:
+                pass
+
+
+def _dump_path(archive: str) -> str:
+    """本次运行生成归档的临时文件：同一个 jar 同时第一次运行时各写各的，不会写同一个文件"""
+    return f"{archive[:-len('.jsa')]}.{os.getpid()}-{uuid.uuid4().hex[:8]}{DUMP_SUFFIX}"
+
+
+def _adopt_dump(archive: str) -> bool:
+    """
+    把之前运行生成的临时归档改名为正式归档（JVM 在退出时才写归档，修改时间太近的可能还没写完，暂不使用）
+    :return: 正式归档是否已就绪
+    """
+    folder, name = os.path.split(archive)
+    current = name[:-len(".jsa")] + "."
+    now = time.time()
+    for other in sorted(os.listdir(folder)):
+        if not (other.startswith(current) and other.endswith(DUMP_SUFFIX)):
+            continue
+        path = os.path.join(folder, other)
+        try:
+            if now - os.path.getmtime(path) < DUMP_SETTLE_SECONDS or os.path.getsize(path) == 0:
+                continue
+            os.replace(path, archive)
+            return True
+        except OSError:
+            continue
+    return os.path.exists(archive)
+
+
+def java_options(meta: dict, jar_path: str, java_path: str) -> list:
+    """
+    jar 插件的 JVM 参数：启动配置 + AppCDS
+    第一次运行时用 -XX:ArchiveClassesAtExit 在退出时生成临时归档，下次启动时改名为正式归档，之后用 -XX:SharedArchiveFile 复用
+    """
+    jvm = meta.get("jvm") or {}
+    if not isinstance(jvm, dict):
+        jvm = {}
+    options = profile_options(jvm)
+    if jvm.get("cds", True) is False:
+        return options
+    version = java_major_version(java_path)
+    if version is None or version < CDS_MIN_VERSION:
+        return options
+    try:
+        archive = cds_archive_path(jar_path, java_path, options)
+        os.makedirs(os.path.dirname(archive), exist_ok=True)
+    except OSError:
+        return options
+    # 归档不可用（损坏、JDK 不匹配）时 JVM 会自动忽略并正常启动，关闭相关警告避免混入插件输出
+    options.append("-Xlog:cds*=off")
+    if os.path.exists(archive) or _adopt_dump(archive):
+        options.append(f"-XX:SharedArchiveFile={archive}")
+    else:
+        _remove_stale_archives(archive)
+        options.append(f"-XX:ArchiveClassesAtExit={_dump_path(archive)}")
+    return options
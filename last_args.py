@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : last_args.py
+# @Description : 记住每个插件上次使用的参数值，下次打开插件时填回表单
+#
+# 保存在 data/last_args.json：{插件目录: {参数名: 值}}。按参数名而不是位置对应，
+# 插件升级后参数增删、调整顺序也能填回还存在的参数；choice 参数的值不在选项中时使用默认值。
+import json
+import os
+from pathlib import Path
+
+from launcher import default_args
+
+
+class LastArgs:
+    """
+    插件上次使用的参数值；文件在第一次使用时读取，remember() 有变化时立即保存（先写临时文件再替换）
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._data = None
+
+    def data(self) -> dict:
+        if self._data is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            self._data = data if isinstance(data, dict) else {}
+        return self._data
+
+    def values(self, meta: dict) -> list:
+        """按参数定义顺序返回表单的初始值：上次使用的值，没有记录的参数使用默认值"""
+        values = default_args(meta)
+        saved = self.data().get(meta.get("path", ""))
+        if not isinstance(saved, dict):
+            return values
+        for i, spec in enumerate(meta.get("args", [])):
+            value = saved.get(spec.get("name"))
+            if value is None:
+                continue
+            if spec.get("type") == "choice" and value not in [str(o) for o in spec.get("options", [])]:
+                continue
+            values[i] = str(value)
+        return values
+
+    def remember(self, meta: dict, args: list) -> bool:
+        """
+        记录插件本次使用的参数值
+        :return: 是否有变化（有变化时已写入文件）
+        """
+        specs = meta.get("args", [])
+        named = {spec.get("name"): str(value) for spec, value in zip(specs, args) if spec.get("name")}
+        key = meta.get("path", "")
+        if not key or self.data().get(key) == named:
+            return False
+        data = dict(self.data())
+        data[key] = named
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(str(tmp), str(self.path))
+        self._data = data
+        return True
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : launcher.py
+# @Description : 插件启动命令的构造（不依赖 Qt，界面与命令行共用）
+from pathlib import Path
+
+from jvm import java_options
+from plugin_env import EnvError, find_env, python_program
+from stream_reader import normalize_encoding
+
+
+# 插件类型（plugin.json 的 type），界面、命令行与安装包校验共用
+PLUGIN_TYPES = ("bat", "python", "exe", "java")
+# 文档中沿用的简写
+TYPE_ALIASES = {"py": "python", "jar": "java"}
+# 没有指定 entry 时各类型的默认入口文件
+DEFAULT_ENTRIES = {"bat": "run.bat", "python": "run.py"}
+
+
+def plugin_type(meta: dict) -> str:
+    """规范化的插件类型（简写换成全称，未指定时为空字符串）"""
+    ptype = str(meta.get("type", "")).lower()
+    return TYPE_ALIASES.get(ptype, ptype)
+
+
+def default_entry(ptype: str, exists):
+    """
+    没有指定 entry 时的入口文件：bat / python 插件使用 run.bat / run.py，其它类型依次尝试 run.py、run.bat
+    :param exists: exists(相对路径) 判断插件中是否有该文件
+    :return: (entry, ptype)；找不到时 entry 为 None
+    """
+    if ptype in DEFAULT_ENTRIES:
+        return DEFAULT_ENTRIES[ptype], ptype
+    for guess in ("python", "bat"):
+        if exists(DEFAULT_ENTRIES[guess]):
+            return DEFAULT_ENTRIES[guess], guess
+    return None, ptype
+
+
+class LaunchError(Exception):
+    """插件无法启动；title 为提示框标题（错误 / 警告）"""
+
+    def __init__(self, message: str, title: str = "错误"):
+        super().__init__(message)
+        self.title = title
+
+
+def resolve_command(meta: dict, args: list, java_path: str = ""):
+    """
+    根据插件类型构造启动命令
+    :param meta: plugin.json 内容（含 path）
+    :param args: 按参数定义顺序排列的参数值
+    :param java_path: jar 插件使用的 java 可执行文件
+    :return: (program, program_args, cwd)
+    """
+    entry = meta.get("entry")
+    ptype = plugin_type(meta)
+    plugin_path = Path(meta.get("path", ""))
+    if not entry:
+        entry, ptype = default_entry(ptype, lambda name: (plugin_path / name).exists())
+        if entry is None:
+            raise LaunchError("找不到入口脚本 (run.py/run.bat)，请检查插件目录")
+    script_path = str(plugin_path / entry)
+    if not Path(script_path).exists():
+        raise LaunchError(f"入口文件不存在：{script_path}")
+
+    # build program / args for QProcess.start(program, args)
+    if ptype == "bat" or script_path.lower().endswith(".bat"):
+        program = "cmd"
+        qargs = ["/c", script_path] + args
+    elif ptype == "python" or script_path.lower().endswith(".py"):
+        program = python_program()
+        if program is None:
+            raise LaunchError("系统未检测到 Python,不能执行插件", "警告")
+        try:
+            # 声明了依赖的插件使用自己的运行环境
+            program = find_env(meta) or program
+        except EnvError as e:
+            raise LaunchError(str(e), "警告")
+        qargs = [script_path] + args
+    elif ptype == "exe" or script_path.lower().endswith(".exe"):
+        program = script_path
+        qargs = args
+    elif ptype == "java" or script_path.lower().endswith(".jar"):
+        program = java_path
+        if not program or not Path(program).exists():
+            raise LaunchError("未配置 Java 路径，请先在设置中配置 JDK！", "警告")
+        qargs = ["-Dfile.encoding=UTF-8"] + java_options(meta, script_path, program) + ["-jar", str(script_path)] + args
+    else:
+        # try make executable
+        program = script_path
+        qargs = args
+    return program, qargs, str(plugin_path)
+
+
+def output_encoding(meta: dict, default: str = "utf-8") -> str:
+    """插件输出的编码：plugin.json 中的 encoding 优先，否则使用全局配置"""
+    return normalize_encoding(meta.get("encoding") or default, default)
+
+
+def find_plugin(plugins: list, name: str):
+    """
+    按插件名称或插件目录名查找插件（大小写不敏感）
+    :return: 插件 meta，找不到时返回 None
+    """
+    lowered = name.lower()
+    for meta in plugins:
+        if meta.get("name", "").lower() == lowered or Path(meta["path"]).name.lower() == lowered:
+            return meta
+    return None
+
+
+def default_args(meta: dict) -> list:
+    """按参数定义顺序返回各参数的默认值（与界面表单的初始值一致）"""
+    values = []
+    for spec in meta.get("args", []):
+        default = spec.get("default", "")
+        if spec.get("type") == "choice" and default not in spec.get("options", []):
+            options = spec.get("options", [])
+            default = options[0] if options else ""
+        values.append(str(default))
+    return values
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : log_janitor.py
+# @Description : 插件日志的后台整理：压缩已结束的运行日志，按保留天数和总大小清理旧日志
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+
+from logger_manager import add_plugin_log_closed_listener, open_plugin_logs
+
+# 不是本进程写的 .log（例如命令行运行留下的），最后修改超过该时间才视为已结束并压缩
+FOREIGN_LOG_IDLE_SECONDS = 24 * 3600
+
+
+def gzip_file(path: str) -> str:
+    """把文件压缩为 path.gz 并删除原文件，返回压缩后的路径"""
+    gz_path = path + ".gz"
+    tmp = gz_path + ".tmp"
+    with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    shutil.copystat(path, tmp)
+    os.replace(tmp, gz_path)
+    os.remove(path)
+    return gz_path
+
+
+class LogJanitor:
+    """
+    插件日志清理线程
+
+    - 插件运行结束、日志文件关闭后，立即在后台压缩为 .gz
+    - 每隔 interval 秒巡检一次：压缩遗留的 .log，删除超过 max_age_days 天的日志，
+      总大小超过 max_total_bytes 时从最旧的开始删除
+    """
+
+    def __init__(self, log_dir: str, max_age_days: int = 30, max_total_bytes: int = 1024 * 1024 * 1024,
+                 interval: int = 3600):
+        self.log_dir = log_dir
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+        self.interval = interval
+        self.queue = queue.Queue()
+        self.thread = None
+        self._closing = threading.Event()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        add_plugin_log_closed_listener(self.queue.put)
+        self.thread = threading.Thread(target=self._run, name="log-janitor", daemon=True)
+        self.thread.start()
+
+    def set_policy(self, max_age_days: int, max_total_bytes: int):
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+        self.queue.put(None)  # 立即按新策略巡检一次
+
+    def close(self, wait: bool = True):
+        """处理完当前文件后结束后台线程；队列中尚未压缩的日志由之后的巡检处理"""
+        if self.thread is None:
+            return
+        self._closing.set()
+        self.queue.put(None)
+        if wait:
+            self.thread.join()
+        self.thread = None
+
+    def _run(self):
+        next_sweep = 0
+        while True:
+            timeout = max(0, next_sweep - time.time())
+            try:
+                path = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                path = None
+            if self._closing.is_set():
+                return
+            try:
+                if path is not None:
+                    self._compress(path)
+                if path is None or time.time() >= next_sweep:
+                    self.sweep()
+                    next_sweep = time.time() + self.interval
+            except Exception:
+                logging.exception("日志清理失败")
+
+    def _compress(self, path: str):
+        if os.path.exists(path):
+            gzip_file(path)
+
+    def sweep(self):
+        """巡检一次日志目录"""
+        if not os.path.isdir(self.log_dir):
+            return
+        now = time.time()
+        active = open_plugin_logs()
+        files = []
+        for de in os.scandir(self.log_dir):
+            if not de.is_file() or de.name.endswith(".tmp"):
+                continue
+            st = de.stat()
+            path = de.path
+            if de.name.endswith(".log") and path not in active and now - st.st_mtime > FOREIGN_LOG_IDLE_SECONDS:
+                try:
+                    path = gzip_file(path)
+                    st = os.stat(path)
+                except OSError:
+                    pass
+            files.append((st.st_mtime, st.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        expire_before = now - self.max_age_days * 86400 if self.max_age_days > 0 else None
+        removed = 0
+        for mtime, size, path in files:
+            too_old = expire_before is not None and mtime < expire_before
+            too_big = self.max_total_bytes > 0 and total > self.max_total_bytes
+            if not (too_old or too_big):
+                break
+            if path in active:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            logging.info(f"日志清理：删除 {removed} 个旧插件日志，剩余 {total // 1024} KB")
@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : log_search.py
+# @Description : 插件运行日志的全文检索索引（SQLite FTS），日志写入时增量入库
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from logger_manager import add_plugin_log_write_listener, open_plugin_log, open_plugin_logs, plugin_name_from_lines
+
+# 插件日志文件名：{插件名}_{YYYYmmdd_HHMMSS}[_{序号}].log[.gz]
+LOG_NAME_RE = re.compile(r"^(?P<plugin>.+)_(?P<stamp>\d{8}_\d{6})(?:_\d+)?\.log(?:\.gz)?$")
+
+# 每个事务最多写入的行数 / 等待凑批的最长时间
+BATCH_LINES = 5000
+BATCH_SECONDS = 0.5
+
+# 关键字的最少字符数；trigram 索引不支持的短关键字（1~2 个字符）只在最近 SHORT_QUERY_LINES 行中做子串扫描
+MIN_QUERY_CHARS = 2
+SHORT_QUERY_LINES = 200000
+
+
+def run_key(path: str) -> str:
+    """日志文件的运行标识：文件名去掉 .gz（压缩前后是同一次运行）"""
+    name = os.path.basename(path)
+    return name[:-3] if name.endswith(".gz") else name
+
+
+def parse_run_name(key: str):
+    """
+    从日志文件名解析插件名（拼音形式，日志开头没有记录显示名称时使用）与运行开始时间
+    :return: (plugin, started 时间戳)；无法解析时返回 (文件名, None)
+    """
+    m = LOG_NAME_RE.match(key)
+    if not m:
+        return key, None
+    return m.group("plugin"), datetime.strptime(m.group("stamp"), "%Y%m%d_%H%M%S").timestamp()
+
+
+def create_fts_table(conn: sqlite3.Connection) -> str:
+    """
+    创建全文检索表，按 SQLite 的支持情况依次尝试：
+    FTS5 trigram（支持中文任意子串）-> FTS5 -> FTS4 -> 普通表（LIKE 查询）
+    :return: 使用的方案名
+    """
+    row = conn.execute("SELECT value FROM meta WHERE key = 'fts'").fetchone()
+    if row:
+        return row[0]
+    candidates = [
+        ("fts5_trigram", "CREATE VIRTUAL TABLE lines USING fts5(text, run_id UNINDEXED, lineno UNINDEXED, "
+                         "tokenize='trigram')"),
+        ("fts5", "CREATE VIRTUAL TABLE lines USING fts5(text, run_id UNINDEXED, lineno UNINDEXED)"),
+        ("fts4", "CREATE VIRTUAL TABLE lines USING fts4(text, run_id, lineno, notindexed=run_id, notindexed=lineno)"),
+        ("plain", "CREATE TABLE lines (text TEXT, run_id INTEGER, lineno INTEGER)"),
+    ]
+    for kind, sql in candidates:
+        try:
+            conn.execute(sql)
+        except sqlite3.OperationalError:
+            continue
+        conn.execute("INSERT INTO meta (key, value) VALUES ('fts', ?)", (kind,))
+        return kind
+    raise sqlite3.OperationalError("无法创建日志索引表")
+
+
+class LogSearchIndex:
+    """
+    插件日志检索索引
+
+    写入：插件日志每写入一批行，通过回调进入队列，由后台线程按批次（一个事务）写入 SQLite；
+    启动时补录日志目录中尚未入库的历史日志，并删除对应文件已被清理的运行。
+    查询：search() 把请求交给查询线程（独立的只读连接），结果通过回调返回，调用方不会被索引建立或查询阻塞；
+    连续输入时只执行最新的请求。
+    """
+
+    def __init__(self, db_path: str, log_dir: str):
+        self.db_path = db_path
+        self.log_dir = log_dir
+        self.queue = queue.Queue()
+        self.thread = None
+        self.ready = threading.Event()
+        self._closing = threading.Event()
+        self.kind = None
+        self.queries = queue.Queue()
+        self.query_thread = None
+        self._read_conn = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        add_plugin_log_write_listener(lambda path, lines: self.queue.put((path, lines)))
+        self.thread = threading.Thread(target=self._run, name="log-index", daemon=True)
+        self.thread.start()
+
+    def close(self, wait: bool = True):
+        """结束查询线程；写完队列中的日志行后结束写入线程（未补录完的历史日志下次启动时继续补录）"""
+        if self.query_thread is not None:
+            self.queries.put(None)
+            self.query_thread = None
+        if self.thread is None:
+            return
+        self._closing.set()
+        self.queue.put(None)
+        if wait:
+            self.thread.join()
+        self.thread = None
+
+    # ---------------- 写入（后台线程） ----------------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _run(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, key TEXT UNIQUE, plugin TEXT, "
+                         "started REAL, lines INTEGER DEFAULT 0)")
+            self.kind = create_fts_table(conn)
+        self.ready.set()
+        self.run_ids = {}  # run key -> (run id, 已入库行数)
+        try:
+            self._backfill(conn)
+        except Exception:
+            logging.exception("补录历史插件日志失败")
+        while not self._closing.is_set():
+            self._drain(conn, block=True)
+        while not self.queue.empty():
+            self._drain(conn, block=False)
+        conn.close()
+
+    def _drain(self, conn, block: bool):
+        """把队列中的日志行凑成一批，在一个事务内写入；遇到 close() 放入的 None 时结束本批"""
+        try:
+            item = self.queue.get(block=block)
+        except queue.Empty:
+            return
+        batch = []
+        count = 0
+        deadline = time.time() + (BATCH_SECONDS if block else 0)
+        while item is not None:
+            batch.append(item)
+            count += len(item[1])
+            if count >= BATCH_LINES:
+                break
+            try:
+                item = self.queue.get(timeout=max(0, deadline - time.time()))
+            except queue.Empty:
+                break
+        if not batch:
+            return
+        try:
+            with conn:
+                for path, lines in batch:
+                    self._insert(conn, run_key(path), lines)
+        except Exception:
+            logging.exception("插件日志入库失败")
+
+    def _run_id(self, conn, key: str, lines: list):
+        if key not in self.run_ids:
+            row = conn.execute("SELECT id, lines FROM runs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                # 运行的第一批行中有插件的显示名称（见 logger_manager.get_plugin_logger）
+                plugin, started = parse_run_name(key)
+                plugin = plugin_name_from_lines(lines) or plugin
+                cur = conn.execute("INSERT INTO runs (key, plugin, started) VALUES (?, ?, ?)", (key, plugin, started))
+                row = (cur.lastrowid, 0)
+            self.run_ids[key] = row
+        return self.run_ids[key]
+
+    def _insert(self, conn, key: str, lines: list):
+        run_id, count = self._run_id(conn, key, lines)
+        conn.executemany("INSERT INTO lines (text, run_id, lineno) VALUES (?, ?, ?)",
+                         ((line.rstrip("\r\n"), run_id, count + i + 1) for i, line in enumerate(lines)))
+        count += len(lines)
+        self.run_ids[key] = (run_id, count)
+        conn.execute("UPDATE runs SET lines = ? WHERE id = ?", (count, run_id))
+
+    def _backfill(self, conn):
+        if not os.path.isdir(self.log_dir):
+            return
+        files = {}
+        active = open_plugin_logs()  # 正在写入的日志由写入回调入库
+        for de in os.scandir(self.log_dir):
+            if de.path in active:
+                continue
+            if de.is_file() and (de.name.endswith(".log") or de.name.endswith(".log.gz")):
+                files[run_key(de.name)] = (de.stat().st_mtime, de.path)
+        indexed = {key: run_id for run_id, key in conn.execute("SELECT id, key FROM runs")}
+        gone = [run_id for key, run_id in indexed.items() if key not in files]
+        if gone:
+            with conn:
+                for run_id in gone:
+                    conn.execute("DELETE FROM lines WHERE run_id = ?", (run_id,))
+                    conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+        # 按时间顺序补录（rowid 保持新旧顺序）；每补录完一个文件处理一次实时写入，避免新运行的日志长时间查不到
+        for key in sorted(set(files) - set(indexed), key=lambda k: files[k]):
+            if self._closing.is_set():
+                return
+            self._backfill_file(conn, key, files[key][1])
+            self._drain(conn, block=False)
+
+    def _backfill_file(self, conn, key: str, path: str):
+        """逐行读取日志文件按批写入（日志可能有几百 MB，不整个读入内存）；一个文件一个事务，读取失败时整体回滚"""
+        try:
+            with conn, open_plugin_log(path) as f:
+                batch = []
+                for line in f:
+                    batch.append(line)
+                    if len(batch) >= BATCH_LINES:
+                        self._insert(conn, key, batch)
+                        batch = []
+                if batch:
+                    self._insert(conn, key, batch)
+        except (OSError, EOFError, zlib.error):
+            # 读取过程中被压缩/删除或压缩文件不完整，下次启动再补录
+            self.run_ids.pop(key, None)
+
+    # ---------------- 查询（查询线程） ----------------
+    def is_short_query(self, text: str) -> bool:
+        """关键字太短、不能使用 trigram 索引（或没有全文索引），只检索最近 SHORT_QUERY_LINES 行"""
+        return self.kind in ("fts5_trigram", "plain") and len(text.strip()) < 3
+
+    def search(self, text: str, limit: int, callback, plugin: str = None):
+        """
+        检索包含 text 的日志行（新的运行在前），在查询线程中执行
+        :param callback: callback(rows)，在查询线程中调用，rows 为 [(plugin, started, lineno, line), ...]；
+                         关键字少于 MIN_QUERY_CHARS 个字符时直接回调空列表；被更新的请求取代的请求不回调
+        :param plugin: 只检索该插件（显示名称）的日志
+        """
+        text = text.strip()
+        if len(text) < MIN_QUERY_CHARS:
+            callback([])
+            return
+        self._submit("search", (text, limit, plugin), callback)
+
+    def plugins(self, callback):
+        """有日志的插件（显示名称），在查询线程中回调 callback(names)"""
+        self._submit("plugins", (), callback)
+
+    def _submit(self, kind: str, params: tuple, callback):
+        if self.query_thread is None:
+            self.query_thread = threading.Thread(target=self._serve_queries, name="log-search", daemon=True)
+            self.query_thread.start()
+        self.queries.put((kind, params, callback))
+
+    def _serve_queries(self):
+        while True:
+            requests = [self.queries.get()]
+            while True:
+                try:
+                    requests.append(self.queries.get_nowait())
+                except queue.Empty:
+                    break
+            if None in requests:
+                # close()：窗口已关闭，剩余的请求不再执行
+                if self._read_conn is not None:
+                    self._read_conn.close()
+                return
+            # 检索只执行最新的一次，其它请求依次执行
+            searches = [r for r in requests if r[0] == "search"]
+            for kind, params, callback in [r for r in requests if r[0] != "search"] + searches[-1:]:
+                try:
+                    if not self.ready.wait(timeout=30):
+                        result = []
+                    elif kind == "search":
+                        result = self._query(*params)
+                    else:
+                        result = self._plugin_names()
+                except sqlite3.Error:
+                    logging.exception("检索插件日志失败")
+                    result = []
+                try:
+                    callback(result)
+                except Exception:
+                    logging.exception("日志检索回调失败")
+
+    def _reader(self) -> sqlite3.Connection:
+        if self._read_conn is None:
+            self._read_conn = sqlite3.connect(self.db_path, timeout=5)
+        return self._read_conn
+
+    def _plugin_names(self) -> list:
+        return [row[0] for row in self._reader().execute("SELECT DISTINCT plugin FROM runs ORDER BY plugin")]
+
+    def _query(self, text: str, limit: int, plugin: str = None) -> list:
+        like = "lines.text LIKE ? ESCAPE '\\'"
+        pattern = "%" + re.sub(r"([%_\\\\])", r"\\\1", text) + "%"
+        if self.is_short_query(text):
+            # trigram 不支持的短词：只在最近的行中做子串扫描（按 rowid 范围，不扫全表）
+            where = like + " AND rowid > IFNULL((SELECT rowid FROM lines ORDER BY rowid DESC LIMIT 1), 0) - ?"
+            params = (pattern, SHORT_QUERY_LINES)
+        elif self.kind == "plain":
+            # SQLite 不支持全文检索时只能子串扫描
+            where, params = like, (pattern,)
+        else:
+            where, params = "lines MATCH ?", ('"' + text.replace('"', '""') + '"',)
+        if plugin:
+            where += " AND run_id IN (SELECT id FROM runs WHERE plugin = ?)"
+            params += (plugin,)
+        sql = (f"SELECT runs.plugin, runs.started, l.lineno, l.text FROM "
+               f"(SELECT rowid, run_id, lineno, text FROM lines WHERE {where} ORDER BY rowid DESC LIMIT ?) AS l "
+               f"JOIN runs ON runs.id = l.run_id ORDER BY l.rowid DESC")
+        return self._reader().execute(sql, params + (limit,)).fetchall()
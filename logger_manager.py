@@ -4,11 +4,17 @@
 # @Author  : 我的名字
 # @File    : logger_manager.py
 # @Description : 这个函数是用来balabalabala自己写
+import atexit
+import gzip
 import os
 import sys
 import logging
+import logging.handlers
+import queue
 import threading
+import time
 import traceback
+import weakref
 from datetime import datetime
 
 
@@ -17,6 +23,9 @@ def init_logging(
         main_log_name: str = "app.log",
         level: int = logging.INFO,
         console: bool = True,
+        redirect_std: bool = True,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
 ):
     """
     初始化日志系统（系统日志 + 全局异常捕获）
@@ -26,6 +35,9 @@ def init_logging(
         main_log_name: 主系统日志文件名
         level: 日志等级
         console: 是否在控制台同步输出
+        redirect_std: 是否把 print()/stderr 重定向到日志（命令行模式下需保留原始输出）
+        max_bytes: 主日志单个文件的大小上限，超过后滚动为 app.log.1 ...（0 表示不滚动）
+        backup_count: 保留的滚动文件个数
     """
 
     os.makedirs(log_dir, exist_ok=True)
@@ -34,7 +46,8 @@ def init_logging(
     handlers = []
 
     # === 文件日志 ===
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                        encoding="utf-8")
     file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] [%(threadName)s] %(message)s"))
     handlers.append(file_handler)
 
@@ -81,7 +94,9 @@ def init_logging(
             pass
 
     # 仅当打包无控制台时才重定向
-    if not (sys.stdout and hasattr(sys.stdout, "write")):
+    if not redirect_std:
+        pass
+    elif not (sys.stdout and hasattr(sys.stdout, "write")):
         sys.stdout = StreamToLogger(logging.info)
         sys.stderr = StreamToLogger(logging.error)
     else:
@@ -97,25 +112,172 @@ def get_logger(name=None):
     return logging.getLogger(name or __name__)
 
 
-def get_plugin_logger(plugin_name: str, log_dir: str = "./plugin_logs"):
+class PluginLogSink:
     """
-    获取插件专用日志对象（文件独立保存）
+    单次插件运行的日志（每次运行一个独立文件）
+
+    调用方线程里只记录时间和内容并放入队列（QueueHandler 的做法），由后台线程
+    批量取出、格式化并写入文件，每批 flush 一次；close() 后后台线程写完剩余记录并关闭文件。
+    文件格式与 "%(asctime)s [%(levelname)s] %(message)s" 一致。
     """
-    os.makedirs(log_dir, exist_ok=True)
-    log_path = os.path.join(
-        log_dir,
-        f"{plugin_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-    )
+    _STOP = object()
+
+    def __init__(self, log_path: str):
+        self.path = log_path
+        self.queue = queue.Queue()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name=f"plugin-log-{os.path.basename(log_path)}",
+                                       daemon=True)
+        self.thread.start()
+        _open_sinks.add(self)
+
+    def log(self, level: int, msg: str):
+        if self.closed:
+            return
+        self.queue.put((time.time(), level, msg))
+
+    def info(self, msg: str):
+        self.log(logging.INFO, msg)
+
+    def info_lines(self, lines: list):
+        """一次提交多行（同一时间戳），高频输出时减少入队次数"""
+        if lines and not self.closed:
+            self.queue.put((time.time(), logging.INFO, lines))
+
+    def error(self, msg: str):
+        self.log(logging.ERROR, msg)
+
+    def close(self, wait: bool = False):
+        """结束本次运行的日志；wait=True 时等待全部写入完成"""
+        if not self.closed:
+            self.closed = True
+            self.queue.put(self._STOP)
+        if wait:
+            self.thread.join()
 
-    plugin_logger = logging.getLogger(plugin_name)
-    plugin_logger.setLevel(logging.INFO)
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                batch = [self.queue.get()]
+                try:
+                    while len(batch) < 1000:
+                        batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    pass
+                stop = False
+                lines = []
+                last_sec, prefix = None, ""
+                for record in batch:
+                    if record is self._STOP:
+                        stop = True
+                        continue
+                    created, level, msg = record
+                    sec = int(created)
+                    if sec != last_sec:
+                        last_sec, prefix = sec, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+                    head = f"{prefix},{int((created - sec) * 1000):03d} [{logging.getLevelName(level)}] "
+                    if isinstance(msg, list):
+                        lines.extend(head + m + "\n" for m in msg)
+                    else:
+                        lines.append(head + msg + "\n")
+                f.write("".join(lines))
+                f.flush()
+                if lines:
+                    for listener in list(_plugin_log_write_listeners):
+                        try:
+                            listener(self.path, lines)
+                        except Exception:
+                            logging.exception("插件日志写入回调失败")
+                if stop:
+                    break
+        _open_sinks.discard(self)
+        for listener in list(_plugin_log_closed_listeners):
+            try:
+                listener(self.path)
+            except Exception:
+                logging.exception("插件日志关闭回调失败")
 
-    # 防止重复添加 handler
-    if not plugin_logger.handlers:
-        fh = logging.FileHandler(log_path, encoding="utf-8")
-        fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-        fh.setFormatter(fmt)
-        plugin_logger.addHandler(fh)
 
+_plugin_log_lock = threading.Lock()
+_open_sinks = weakref.WeakSet()
+_plugin_log_closed_listeners = []
+_plugin_log_write_listeners = []
+
+
+def add_plugin_log_write_listener(callback):
+    """注册插件日志写入回调 callback(log_path, lines)，lines 为本批写入的行（含换行符），在日志写入线程中调用"""
+    _plugin_log_write_listeners.append(callback)
+
+
+def add_plugin_log_closed_listener(callback):
+    """注册插件日志写完并关闭后的回调 callback(log_path)，在日志写入线程中调用"""
+    _plugin_log_closed_listeners.append(callback)
+
+
+def resolve_plugin_log(path):
+    """
+    插件日志的实际路径：运行结束后日志会被压缩为 path.gz（见 log_janitor），
+    运行记录中保存的是压缩前的路径，读取日志的地方都经过这里；两者都不存在时返回 path
+    """
+    if not path or os.path.exists(path):
+        return path
+    gz_path = path + ".gz"
+    return gz_path if os.path.exists(gz_path) else path
+
+
+def open_plugin_log(path):
+    """以文本方式打开插件日志（已压缩的自动解压）"""
+    path = resolve_plugin_log(path)
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+# 插件日志开头记录插件的显示名称（文件名中是拼音），日志检索据此显示和筛选插件
+PLUGIN_NAME_HEADER = "插件名称："
+
+
+def plugin_name_from_lines(lines: list):
+    """从插件日志的开头几行中取出插件的显示名称，没有记录时返回 None"""
+    marker = "] " + PLUGIN_NAME_HEADER
+    for line in lines[:5]:
+        pos = line.find(marker)
+        if pos >= 0:
+            return line[pos + len(marker):].rstrip("\r\n") or None
+    return None
+
+
+def open_plugin_logs() -> set:
+    """正在写入的插件日志文件路径"""
+    return {sink.path for sink in list(_open_sinks)}
+
+
+@atexit.register
+def _close_plugin_logs():
+    # 程序退出时仍在运行的插件（例如被强制结束）的日志也要写完再退出
+    for sink in list(_open_sinks):
+        sink.close(wait=True)
+
+
+def get_plugin_logger(plugin_name: str, log_dir: str = "./plugin_logs", display_name: str = None) -> PluginLogSink:
+    """
+    获取插件专用日志对象（每次运行独立保存一个文件，用完需调用 close() 释放文件）
+    :param plugin_name: 用于日志文件名（拼音，不含空格）
+    :param display_name: 插件的显示名称，记录在日志开头（见 plugin_name_from_lines）
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    with _plugin_log_lock:
+        # 同一秒内多次运行同一插件时追加序号，保证每次运行一个文件
+        log_path = os.path.join(log_dir, f"{plugin_name}_{stamp}.log")
+        seq = 1
+        while os.path.exists(log_path) or os.path.exists(log_path + ".gz"):
+            log_path = os.path.join(log_dir, f"{plugin_name}_{stamp}_{seq}.log")
+            seq += 1
+        open(log_path, "a", encoding="utf-8").close()
+
+    plugin_logger = PluginLogSink(log_path)
     plugin_logger.info(f"插件日志启动：{log_path}")
+    if display_name:
+        plugin_logger.info(f"{PLUGIN_NAME_HEADER}{display_name}")
     return plugin_logger
@@ -1,26 +1,34 @@
 # main.py
-import os
 import sys
 
-from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import (
-    QApplication
-)
-
 import core
-from ui.main_window import MainWindow
 from logger_manager import init_logging
 import logging
 
-if __name__ == "__main__":
-    log_base_path, plugin_log_dir = core.get_loggers_path()
-    init_logging(log_dir=log_base_path,main_log_name='app.log')
-    icon_path = os.path.join(core.get_base_path(), "doc/logo.png")
+
+def run_gui() -> int:
+    from PyQt5.QtWidgets import (
+        QApplication
+    )
+    from ui.main_window import MainWindow
+
+    # 程序图标在窗口第一次绘制之后设置（见 MainWindow.start_background_work）
     app = QApplication(sys.argv)
-    app.setWindowIcon(QIcon(icon_path))
     win = MainWindow()
     win.show()
+    return app.exec_()
 
-    exec_num=app.exec_()
+
+if __name__ == "__main__":
+    import cli
+
+    log_base_path, plugin_log_dir = core.get_loggers_path()
+    if cli.is_cli(sys.argv[1:]):
+        # 无界面模式：不导入 PyQt，保留控制台输出
+        init_logging(log_dir=log_base_path, main_log_name='app.log', console=False, redirect_std=False)
+        exec_num = cli.main(sys.argv[1:])
+    else:
+        init_logging(log_dir=log_base_path, main_log_name='app.log')
+        exec_num = run_gui()
     logging.info("==系统退出==")
     sys.exit(exec_num)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : pipeline.py
+# @Description : 插件流水线：把多个插件按依赖关系（DAG）串起来运行（不依赖 Qt，界面中的执行见 ui.pipeline_runner）
+#
+# 流水线定义放在插件根目录下的 <名称>.pipeline.json：
+# {
+#   "name": "PDF 处理",
+#   "steps": [
+#     {"id": "split", "plugin": "PDF拆分", "args": {"input": "D:/a.pdf", "output": "{run_dir}/split"}},
+#     {"id": "ocr",   "plugin": "OCR识别", "args": {"folder": "{split.output}"}},
+#     {"id": "index", "plugin": "建立索引", "args": {"folder": "{split.output}"}, "after": ["ocr"]},
+#     {"id": "list",  "plugin": "列出文件", "args": {"folder": "{ocr.output}"}},
+#     {"id": "count", "plugin": "统计行数", "stdin": "list"}
+#   ]
+# }
+#   plugin   插件名称或插件目录名
+#   args     按参数名给出的参数值，没有给出的使用插件的默认值
+#   after    需要先成功结束的步骤
+#   stdin    该步骤的标准输入直接接到另一个步骤的标准输出（两个步骤同时启动，数据经管道传递，不落地）
+# 参数值中可以引用：
+#   {run_dir}        本次运行的工作目录（data/pipelines/<流水线名>/<时间>），用于存放中间结果
+#   {步骤.参数名}     另一个步骤的参数值（例如它的输出目录），被引用的步骤自动成为依赖
+# 没有依赖关系的步骤并行运行；某个步骤失败后，依赖它的步骤都不再运行。
+import json
+import os
+import re
+from pathlib import Path
+
+from launcher import default_args
+
+PIPELINE_SUFFIX = ".pipeline.json"
+RUN_DIR = "{run_dir}"
+REF_RE = re.compile(r"\{([^{}.\s]+)\.([^{}\s]+)\}")
+
+# 步骤状态
+WAITING = "waiting"
+RUNNING = "running"
+OK = "ok"
+FAILED = "failed"
+STOPPED = "stopped"
+SKIPPED = "skipped"
+
+STATE_LABELS = {
+    WAITING: "等待",
+    RUNNING: "运行中",
+    OK: "成功",
+    FAILED: "失败",
+    STOPPED: "已停止",
+    SKIPPED: "已跳过",
+}
+
+
+class PipelineError(Exception):
+    """流水线定义有误或无法运行"""
+
+
+def list_pipelines(plugins_dir) -> list:
+    """插件根目录下的流水线定义文件"""
+    try:
+        names = sorted(n for n in os.listdir(str(plugins_dir)) if n.endswith(PIPELINE_SUFFIX))
+    except OSError:
+        return []
+    return [os.path.join(str(plugins_dir), n) for n in names]
+
+
+def load_pipeline(path) -> dict:
+    """
+    读取并校验流水线定义
+    :return: {"name", "description", "path", "steps": [{"id", "plugin", "args", "after", "stdin"}, ...],
+              "deps": {步骤: 依赖的步骤集合}, "groups": [[管道相连、同时启动的步骤], ...]}
+    :raise PipelineError:
+    """
+    try:
+        with open(str(path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise PipelineError(f"无法读取流水线定义 {path}：{e}")
+    if not isinstance(data, dict) or not isinstance(data.get("steps"), list) or not data["steps"]:
+        raise PipelineError("流水线定义必须是包含 steps 列表的 JSON 对象")
+    steps = []
+    for i, raw in enumerate(data["steps"]):
+        if not isinstance(raw, dict) or not raw.get("id") or not raw.get("plugin"):
+            raise PipelineError(f"第 {i + 1} 个步骤缺少 id 或 plugin")
+        args = raw.get("args") or {}
+        after = raw.get("after") or []
+        if not isinstance(args, dict) or not isinstance(after, list):
+            raise PipelineError(f"步骤 {raw['id']}：args 必须是对象，after 必须是列表")
+        steps.append({"id": str(raw["id"]), "plugin": str(raw["plugin"]),
+                      "args": {str(k): str(v) for k, v in args.items()},
+                      "after": [str(a) for a in after], "stdin": str(raw["stdin"]) if raw.get("stdin") else None})
+    ids = [s["id"] for s in steps]
+    duplicated = {sid for sid in ids if ids.count(sid) > 1}
+    if duplicated:
+        raise PipelineError(f"步骤 id 重复：{', '.join(sorted(duplicated))}")
+    pipeline = {"name": str(data.get("name") or Path(path).name[:-len(PIPELINE_SUFFIX)]),
+                "description": str(data.get("description", "")), "path": str(path), "steps": steps}
+    pipeline["deps"] = _dependencies(steps)
+    pipeline["groups"] = _pipe_groups(steps)
+    _check_acyclic(pipeline)
+    return pipeline
+
+
+def _dependencies(steps: list) -> dict:
+    """每个步骤需要先成功结束的步骤：after + 参数中引用的步骤"""
+    ids = {s["id"] for s in steps}
+    deps = {}
+    for step in steps:
+        refs = {m.group(1) for value in step["args"].values() for m in REF_RE.finditer(value)} & ids
+        unknown = [a for a in step["after"] if a not in ids]
+        if unknown:
+            raise PipelineError(f"步骤 {step['id']} 依赖的步骤不存在：{', '.join(unknown)}")
+        deps[step["id"]] = set(step["after"]) | refs
+        if step["id"] in deps[step["id"]]:
+            raise PipelineError(f"步骤 {step['id']} 不能依赖自己")
+    return deps
+
+
+def _pipe_groups(steps: list) -> list:
+    """通过 stdin 管道相连的步骤组成一组（例如 a | b | c），按定义顺序排列"""
+    ids = [s["id"] for s in steps]
+    consumers = {}
+    group_of = {sid: [sid] for sid in ids}
+    for step in steps:
+        source = step["stdin"]
+        if source is None:
+            continue
+        if source not in group_of or source == step["id"]:
+            raise PipelineError(f"步骤 {step['id']} 的 stdin 来源无效：{source}")
+        if source in consumers:
+            raise PipelineError(f"步骤 {source} 的输出只能接到一个步骤（{consumers[source]}、{step['id']}）")
+        consumers[source] = step["id"]
+        merged = group_of[source] + [s for s in group_of[step["id"]] if s not in group_of[source]]
+        for sid in merged:
+            group_of[sid] = merged
+    groups = []
+    for sid in ids:
+        if group_of[sid] not in groups:
+            groups.append(group_of[sid])
+    return [sorted(g, key=ids.index) for g in groups]
+
+
+def _check_acyclic(pipeline: dict):
+    """依赖关系不能有环；管道相连的步骤同时运行，彼此之间不能再有先后依赖"""
+    group_index = {sid: i for i, group in enumerate(pipeline["groups"]) for sid in group}
+    edges = {i: set() for i in range(len(pipeline["groups"]))}
+    for sid, deps in pipeline["deps"].items():
+        for dep in deps:
+            if group_index[dep] == group_index[sid]:
+                raise PipelineError(f"步骤 {sid} 与 {dep} 通过管道同时运行，不能再等待对方结束")
+            edges[group_index[sid]].add(group_index[dep])
+    visiting, done = set(), set()
+
+    def visit(node):
+        if node in done:
+            return
+        if node in visiting:
+            raise PipelineError("步骤之间的依赖关系有环：" + "、".join(pipeline["groups"][node]))
+        visiting.add(node)
+        for dep in edges[node]:
+            visit(dep)
+        visiting.discard(node)
+        done.add(node)
+
+    for node in edges:
+        visit(node)
+
+
+def resolve_args(pipeline: dict, metas: dict, run_dir: str) -> dict:
+    """
+    按插件的参数定义把各步骤的参数换成按顺序排列的参数值，并替换 {run_dir} 与 {步骤.参数名}
+    :param metas: {步骤: 插件 meta}
+    :return: {步骤: 参数值列表}
+    :raise PipelineError: 参数名不存在
+    """
+    steps = {s["id"]: s for s in pipeline["steps"]}
+    named = {}  # 步骤 -> {参数名: 替换后的值}
+    resolved = {}
+
+    def substitute(value: str) -> str:
+        def ref(m):
+            if m.group(1) not in named:
+                return m.group(0)
+            if m.group(2) not in named[m.group(1)]:
+                raise PipelineError(f"引用的参数不存在：{m.group(0)}")
+            return named[m.group(1)][m.group(2)]
+        return REF_RE.sub(ref, value.replace(RUN_DIR, run_dir))
+
+    for group in topological_groups(pipeline):
+        for sid in group:
+            meta = metas[sid]
+            names = [spec.get("name") for spec in meta.get("args", [])]
+            values = default_args(meta)
+            for name, value in steps[sid]["args"].items():
+                if name not in names:
+                    raise PipelineError(f"步骤 {sid}：插件 {meta.get('name', '')} 没有参数 {name}"
+                                        f"（可用参数：{', '.join(n for n in names if n)}）")
+                values[names.index(name)] = substitute(value)
+            named[sid] = dict(zip(names, values))
+            resolved[sid] = values
+    return resolved
+
+
+def topological_groups(pipeline: dict) -> list:
+    """按依赖顺序排列的步骤组（依赖的组在前）"""
+    remaining = list(pipeline["groups"])
+    ordered, finished = [], set()
+    while remaining:
+        group = next(g for g in remaining if all(pipeline["deps"][sid] <= finished for sid in g))
+        remaining.remove(group)
+        ordered.append(group)
+        finished.update(group)
+    return ordered
+
+
+class PipelineRun:
+    """
+    一次流水线运行的步骤状态；执行器（ui.pipeline_runner）启动 ready_groups() 返回的步骤组，
+    步骤结束时调用 step_done()，直到 is_finished()
+    """
+
+    def __init__(self, pipeline: dict, metas: dict, args: dict, run_dir: str):
+        self.pipeline = pipeline
+        self.metas = metas
+        self.args = args
+        self.run_dir = run_dir
+        self.states = {s["id"]: WAITING for s in pipeline["steps"]}
+        self.stdin_of = {s["id"]: s["stdin"] for s in pipeline["steps"]}
+        self.group_of = {sid: group for group in pipeline["groups"] for sid in group}
+        self.stop_requested = set()  # 已要求停止的运行中步骤
+        self.stopping = False
+
+    def ready_groups(self) -> list:
+        """依赖都已成功结束、可以启动的步骤组"""
+        if self.stopping:
+            return []
+        return [group for group in self.pipeline["groups"]
+                if all(self.states[sid] == WAITING for sid in group)
+                and all(self.states[dep] == OK for sid in group for dep in self.pipeline["deps"][sid])]
+
+    def mark_running(self, group: list):
+        for sid in group:
+            self.states[sid] = RUNNING
+
+    def step_done(self, sid: str, ok: bool) -> tuple:
+        """
+        记录步骤结束；失败时依赖它的等待中步骤（直接或间接）标为跳过
+        :return: (需要停止的同组步骤 —— 管道另一端的步骤没有了输入或输出, 本次被跳过的步骤)
+        """
+        if self.states[sid] != RUNNING:
+            return [], []
+        if ok and sid not in self.stop_requested:
+            self.states[sid] = OK
+            return [], []
+        # 被要求停止的步骤即使退出码为 0，输出也可能不完整，同样不再运行依赖它的步骤
+        self.states[sid] = STOPPED if sid in self.stop_requested else FAILED
+        partners = [s for s in self.group_of[sid]
+                    if s != sid and self.states[s] == RUNNING and s not in self.stop_requested]
+        self.stop_requested.update(partners)
+        return partners, self._skip_downstream()
+
+    def _skip_downstream(self) -> list:
+        skipped = []
+        changed = True
+        while changed:
+            changed = False
+            for group in self.pipeline["groups"]:
+                if any(self.states[sid] != WAITING for sid in group):
+                    continue
+                deps = {dep for sid in group for dep in self.pipeline["deps"][sid]}
+                if any(self.states[dep] in (FAILED, STOPPED, SKIPPED) for dep in deps):
+                    for sid in group:
+                        self.states[sid] = SKIPPED
+                    skipped.extend(group)
+                    changed = True
+        return skipped
+
+    def stop(self) -> list:
+        """
+        停止流水线：等待中的步骤不再运行
+        :return: 正在运行、需要停止的步骤
+        """
+        self.stopping = True
+        running = []
+        for sid in self.step_ids():
+            if self.states[sid] == WAITING:
+                self.states[sid] = SKIPPED
+            elif self.states[sid] == RUNNING and sid not in self.stop_requested:
+                running.append(sid)
+        self.stop_requested.update(running)
+        return running
+
+    def step_ids(self) -> list:
+        return [s["id"] for s in self.pipeline["steps"]]
+
+    def state(self, sid: str) -> str:
+        return self.states[sid]
+
+    def is_finished(self) -> bool:
+        return all(self.states[sid] not in (WAITING, RUNNING) for sid in self.step_ids())
+
+    def summary(self) -> str:
+        counts = {}
+        for sid in self.step_ids():
+            counts[self.states[sid]] = counts.get(self.states[sid], 0) + 1
+        parts = [f"{STATE_LABELS[state]} {counts[state]}" for state in (OK, FAILED, STOPPED, SKIPPED) if counts.get(state)]
+        return f"流水线 {self.pipeline['name']} 结束：" + "，".join(parts)
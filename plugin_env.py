@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : plugin_env.py
+# @Description : py 插件的独立运行环境（venv）：按依赖列表的哈希创建并缓存，依赖相同的插件共用一个环境
+#
+# plugin.json 中声明依赖（二选一）：
+#   "requirements": ["openpyxl==3.1.2", "requests"]
+#   "requirements": "requirements.txt"        插件目录下的依赖文件
+# 依赖从设置中的 wheel 目录安装（pip --no-index --find-links），未配置时使用 pip 默认的软件源。
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import core
+
+# 环境创建完成后写入的标记文件；没有标记的目录视为未完成（创建中断），下次重新创建
+READY_MARKER = "worktoolbox_env.json"
+
+# 已确认可用的环境：(插件目录, 依赖声明, 依赖文件修改时间) -> 环境中的 python
+_resolved = {}
+_python_program = []
+
+
+class EnvError(Exception):
+    """插件运行环境不可用（未检测到 Python、依赖文件无法读取、环境未创建或创建失败）"""
+
+
+def python_program():
+    """
+    运行 py 插件使用的 python；打包后的程序使用系统中的 python，找不到时返回 None
+    查找结果在进程内缓存，不必每次启动插件都搜索 PATH
+    """
+    if not _python_program:
+        if not (shutil.which("python3") or shutil.which("python")):
+            program = None
+        elif getattr(sys, 'frozen', False):
+            program = shutil.which("python3") or shutil.which("python") or "python"
+        else:
+            program = sys.executable
+        _python_program.append(program)
+    return _python_program[0]
+
+
+def read_requirements(meta: dict) -> list:
+    """
+    插件声明的依赖，去掉注释与空行后排序去重（顺序、重复不影响环境的哈希）
+    :return: [requirement, ...]，未声明依赖时为空列表
+    """
+    reqs = meta.get("requirements")
+    if not reqs:
+        return []
+    if isinstance(reqs, str):
+        path = Path(meta.get("path", "")) / reqs
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except OSError as e:
+            raise EnvError(f"无法读取依赖文件 {path}：{e}")
+    else:
+        lines = [str(r) for r in reqs]
+    result = set()
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if line:
+            result.add(line)
+    return sorted(result)
+
+
+def env_key(requirements: list, base_python: str) -> str:
+    """环境的哈希：依赖列表 + 基础 python（路径与修改时间，升级 python 后重新创建）"""
+    st = os.stat(base_python)
+    text = "\n".join([os.path.abspath(base_python), str(st.st_mtime_ns)] + requirements)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def get_envs_path() -> Path:
+    envs = Path(core.get_base_path()) / "envs"
+    envs.mkdir(parents=True, exist_ok=True)
+    return envs
+
+
+def env_python(env_dir) -> str:
+    if sys.platform.startswith("win"):
+        return str(Path(env_dir) / "Scripts" / "python.exe")
+    return str(Path(env_dir) / "bin" / "python")
+
+
+def _cache_key(meta: dict):
+    reqs = meta.get("requirements")
+    mtime = None
+    if isinstance(reqs, str):
+        try:
+            mtime = os.stat(Path(meta.get("path", "")) / reqs).st_mtime_ns
+        except OSError:
+            pass
+    return meta.get("path"), json.dumps(reqs, ensure_ascii=False), mtime
+
+
+def plan(meta: dict):
+    """
+    插件需要的环境
+    :return: (环境目录, 依赖列表)；插件未声明依赖时返回 None
+    """
+    requirements = read_requirements(meta)
+    if not requirements:
+        return None
+    base = python_program()
+    if base is None:
+        raise EnvError("系统未检测到 Python,不能执行插件")
+    return get_envs_path() / env_key(requirements, base), requirements
+
+
+def find_env(meta: dict):
+    """
+    插件环境中的 python；插件未声明依赖时返回 None
+    :raise EnvError: 声明了依赖但环境尚未创建
+    """
+    key = _cache_key(meta)
+    if key in _resolved:
+        return _resolved[key]
+    planned = plan(meta)
+    if planned is None:
+        python = None
+    else:
+        env_dir, _requirements = planned
+        if not is_ready(env_dir):
+            raise EnvError("插件的运行环境尚未创建，请先单独执行一次插件以创建环境")
+        python = env_python(env_dir)
+    _resolved[key] = python
+    return python
+
+
+def is_ready(env_dir) -> bool:
+    return (Path(env_dir) / READY_MARKER).exists()
+
+
+def needs_build(meta: dict) -> bool:
+    """插件声明了依赖且对应的环境尚未创建"""
+    planned = plan(meta)
+    return planned is not None and not is_ready(planned[0])
+
+
+def build_env(meta: dict, wheel_dir: str = "", on_output=None) -> str:
+    """
+    创建插件的运行环境（耗时操作，界面中请在后台线程调用）
+    :param wheel_dir: 本地 wheel 目录，为空时使用 pip 默认的软件源
+    :param on_output: 回调，接收 venv / pip 输出的每一行
+    :return: 环境中的 python
+    :raise EnvError:
+    """
+    env_dir, requirements = plan(meta)
+    if is_ready(env_dir):
+        return env_python(env_dir)
+    on_output = on_output or (lambda line: None)
+    if env_dir.exists():
+        # 上次创建中断留下的目录
+        shutil.rmtree(env_dir, ignore_errors=True)
+    started = time.time()
+    base = python_program()
+    on_output(f"创建运行环境 {env_dir}")
+    _run([base, "-m", "venv", str(env_dir)], on_output)
+    req_file = env_dir / "requirements.txt"
+    req_file.write_text("\n".join(requirements) + "\n", encoding="utf-8")
+    cmd = [env_python(env_dir), "-m", "pip", "install", "--disable-pip-version-check", "--no-input"]
+    if wheel_dir:
+        cmd += ["--no-index", "--find-links", wheel_dir]
+    _run(cmd + ["-r", str(req_file)], on_output)
+    (env_dir / READY_MARKER).write_text(json.dumps({
+        "requirements": requirements,
+        "base_python": base,
+        "wheel_dir": wheel_dir,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }, ensure_ascii=False, indent=2), encoding="utf-8")
+    on_output(f"运行环境创建完成，耗时 {time.time() - started:.1f} 秒")
+    return env_python(env_dir)
+
+
+def _run(cmd: list, on_output):
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    except OSError as e:
+        raise EnvError(f"创建运行环境失败：{e}")
+    for raw in proc.stdout:
+        on_output(raw.decode("utf-8", "replace").rstrip())
+    if proc.wait() != 0:
+        raise EnvError(f"创建运行环境失败（{' '.join(cmd[:4])} 退出码 {proc.returncode}），详见日志")
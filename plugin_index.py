@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : plugin_index.py
+# @Description : 插件清单索引，缓存 plugin.json 的解析结果，刷新时只重新解析有变化的插件
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from plugin_search import search_text
+
+MANIFEST_NAME = "plugin.json"
+INDEX_VERSION = 3
+
+
+def manifest_key(st: os.stat_result) -> list:
+    """
+    plugin.json 的变更标识：修改时间(ns) + 文件大小 + inode
+    切换插件版本时 plugin.json 换成从仓库复制出的文件（保留修改时间），修改时间与大小可能恰好相同，inode 一定不同
+    """
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def read_manifest(plugin_dir: str) -> dict:
+    """读取并解析插件目录下的 plugin.json"""
+    with open(os.path.join(plugin_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if not isinstance(meta, dict):
+        raise ValueError("plugin.json 内容必须是 JSON 对象")
+    return meta
+
+
+class PluginIndex:
+    """
+    插件清单的磁盘索引
+
+    以插件目录路径为 key，记录 plugin.json 的 mtime/size 与解析结果。
+    scan() 时只对新增或发生变化的 plugin.json 重新解析，已删除的目录从索引中移除。
+    scan()/save() 在后台扫描线程中执行，manifest() 在界面线程中执行，entries 与 dirty 的读写都在 lock 内。
+    """
+
+    def __init__(self, index_path):
+        self.index_path = Path(index_path)
+        # plugin dir -> {"key": [mtime_ns, size, ino], "meta": {...}, "search": 搜索文本} 或 {"key":..., "error": "..."}
+        self.entries = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        # 扫描期间 manifest() 写入的插件目录，扫描结束替换 entries 时保留
+        self._updated = set()
+        self.load()
+
+    def load(self):
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            entries = data.get("entries", {}) if data.get("version") == INDEX_VERSION else {}
+        except Exception:
+            entries = {}
+        with self.lock:
+            self.entries = entries
+            self.dirty = False
+
+    def save(self):
+        """索引有变化时写回磁盘（先写临时文件再替换，避免写一半的索引）"""
+        with self.lock:
+            if not self.dirty:
+                return
+            text = json.dumps({"version": INDEX_VERSION, "entries": self.entries}, ensure_ascii=False)
+            self.dirty = False
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(str(tmp), str(self.index_path))
+        except Exception:
+            with self.lock:
+                self.dirty = True
+            raise
+
+    def _probe(self, path: str):
+        """
+        检查单个插件目录：plugin.json 未变化时复用索引，否则重新解析
+        :return: (entry, 是否重新解析)；目录下没有 plugin.json 时返回 (None, False)
+        """
+        try:
+            st = os.stat(os.path.join(path, MANIFEST_NAME))
+        except OSError:
+            return None, False
+        key = manifest_key(st)
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry is not None and entry.get("key") == key:
+            return entry, False
+        try:
+            meta = read_manifest(path)
+            # 搜索用的拼音等随索引缓存，plugin.json 不变就不重新计算
+            return {"key": key, "meta": meta, "search": search_text(meta, os.path.basename(path))}, True
+        except Exception as e:
+            # 解析失败同样记入索引，文件未变化前不再重复解析
+            return {"key": key, "error": str(e)}, True
+
+    def manifest(self, path: str):
+        """
+        单个插件的完整清单（含 path），plugin.json 未变化时直接取自索引
+        :return: meta；plugin.json 不存在或解析失败时返回 None
+        """
+        entry, parsed = self._probe(path)
+        if entry is None or "meta" not in entry:
+            return None
+        if parsed:
+            with self.lock:
+                self.entries[path] = entry
+                self._updated.add(path)
+                self.dirty = True
+        meta = dict(entry["meta"])
+        meta["path"] = path
+        meta["_search"] = entry.get("search", "")
+        return meta
+
+    def scan(self, folder, workers: int = 1, batch_size: int = 64, on_batch=None, is_cancelled=None) -> dict:
+        """
+        扫描插件根目录，返回扫描结果
+
+        :param workers: 并行检查/解析插件目录的线程数（网络盘上 stat/读取的延迟可以重叠）
+        :param batch_size: 每批处理的目录数
+        :param on_batch: 每完成一批回调 on_batch(plugins, done, total)，plugins 按目录名有序
+        :param is_cancelled: 返回 True 时在批次之间中止扫描；中止时不会移除尚未扫描到的索引项
+        :return: {"plugins": [meta, ...], "failed": [(path, error), ...], "dirs": 全部子目录, "parsed": 重新解析数,
+                  "reused": 命中索引数, "removed": 移除数, "cancelled": 是否被中止}
+        """
+        result = {"plugins": [], "failed": [], "dirs": [], "parsed": 0, "reused": 0, "removed": 0,
+                  "cancelled": False}
+        seen = {}
+        root = str(Path(folder))
+        with os.scandir(root) as it:
+            # 以 . 开头的目录是安装插件时的暂存目录等，不是插件
+            paths = [os.path.join(root, name) for name in
+                     sorted(de.name for de in it if de.is_dir() and not de.name.startswith("."))]
+        result["dirs"] = paths
+        with self.lock:
+            self._updated.clear()
+
+        pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for start in range(0, len(paths), batch_size):
+                if is_cancelled is not None and is_cancelled():
+                    result["cancelled"] = True
+                    break
+                chunk = paths[start:start + batch_size]
+                probed = pool.map(self._probe, chunk) if pool else map(self._probe, chunk)
+                batch = []
+                for path, (entry, parsed) in zip(chunk, probed):
+                    if entry is None:
+                        continue
+                    if parsed:
+                        result["parsed"] += 1
+                        with self.lock:
+                            self.dirty = True
+                    else:
+                        result["reused"] += 1
+                    seen[path] = entry
+                    if "meta" in entry:
+                        meta = dict(entry["meta"])
+                        meta["path"] = path
+                        meta["_search"] = entry.get("search", "")
+                        batch.append(meta)
+                    else:
+                        result["failed"].append((path, entry.get("error")))
+                result["plugins"].extend(batch)
+                if on_batch is not None:
+                    on_batch(batch, start + len(chunk), len(paths))
+        finally:
+            if pool:
+                pool.shutdown(wait=False)
+
+        with self.lock:
+            if result["cancelled"]:
+                self.entries.update(seen)
+                return result
+            # 扫描期间在界面中选中、由 manifest() 新解析的插件（例如刚复制进来的目录）不丢弃
+            for path in self._updated:
+                if path in self.entries and os.path.isfile(os.path.join(path, MANIFEST_NAME)):
+                    seen[path] = self.entries[path]
+            result["removed"] = len(self.entries.keys() - seen.keys())
+            if result["removed"]:
+                self.dirty = True
+            self.entries = seen
+            self._updated.clear()
+        return result
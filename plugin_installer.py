@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : plugin_installer.py
+# @Description : 插件 zip 包的安装（不依赖 Qt，界面与命令行共用）
+#
+# 安装分两步：
+#   stage()  只把 plugin.json 所在的子目录逐个文件流式解压到插件根目录下的暂存目录（.install-*），
+#            解压时校验每个文件的 CRC，并在解压前校验 plugin.json 与入口文件；
+#   commit() 用 rename 把暂存目录换到插件目录。暂存目录与插件目录在同一个文件系统上，
+#            扫描插件时不会看到只解压了一半的插件；覆盖安装时旧目录先改名再删除。
+# 暂存阶段耗时（解压），可在多个线程中并行；commit 只有几次 rename。
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import tempfile
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import core
+from launcher import PLUGIN_TYPES, TYPE_ALIASES, default_entry, plugin_type
+from plugin_index import MANIFEST_NAME
+
+STAGING_PREFIX = ".install-"
+TRASH_PREFIX = ".remove-"
+# 压缩工具自动加入的、不属于插件的目录
+IGNORED_DIRS = ("__MACOSX",)
+COPY_BUFFER = 1024 * 1024
+
+
+class InstallError(Exception):
+    """插件包无效或安装失败"""
+
+
+def member_name(info: zipfile.ZipInfo) -> str:
+    """
+    zip 中的文件名；中文 Windows 的压缩工具按 GBK 写文件名且不设置 UTF-8 标记，
+    zipfile 会按 cp437 解码成乱码，这里还原
+    """
+    name = info.filename
+    if not info.flag_bits & 0x800:
+        try:
+            name = name.encode("cp437").decode("gbk")
+        except UnicodeError:
+            pass
+    return name.replace("\\", "/")
+
+
+def find_plugin_root(names: list):
+    """
+    插件在 zip 中的根目录：层级最浅的 plugin.json 所在目录（"" 表示 zip 根目录）
+    :return: 根目录前缀（以 / 结尾或为空）；没有 plugin.json 时返回 None
+    """
+    roots = []
+    for name in names:
+        parts = name.split("/")
+        if parts[-1] == MANIFEST_NAME and not any(p in IGNORED_DIRS for p in parts):
+            roots.append((len(parts), name[:-len(MANIFEST_NAME)]))
+    if not roots:
+        return None
+    return min(roots)[1]
+
+
+def safe_relpath(name: str, prefix: str):
+    """
+    文件在插件目录中的相对路径；不在插件根目录下或路径越界（绝对路径、..）时返回 None
+    """
+    if not name.startswith(prefix):
+        return None
+    rel = posixpath.normpath(name[len(prefix):])
+    if rel in ("", ".") or rel.startswith("../") or rel == ".." or posixpath.isabs(rel) or ":" in rel:
+        return None
+    return rel
+
+
+def validate_manifest(meta, rel_files: set):
+    """
+    检查 plugin.json：必须是 JSON 对象，name 必填，类型与入口文件的规则同 launcher.resolve_command
+    （没有 entry 时入口为 run.py / run.bat），入口文件必须在包中
+    """
+    if not isinstance(meta, dict):
+        raise InstallError("plugin.json 内容必须是 JSON 对象")
+    if not str(meta.get("name", "")).strip():
+        raise InstallError("plugin.json 缺少 name")
+    ptype = plugin_type(meta)
+    if ptype and ptype not in PLUGIN_TYPES:
+        names = list(PLUGIN_TYPES) + list(TYPE_ALIASES)
+        raise InstallError(f"不支持的插件类型：{meta.get('type')}（支持 {', '.join(names)}）")
+    entry = str(meta.get("entry") or "").strip()
+    if entry:
+        entry = posixpath.normpath(entry.replace("\\", "/"))
+        if entry not in rel_files:
+            raise InstallError(f"zip 包中未包含入口文件 {meta['entry']}")
+    else:
+        entry, _ = default_entry(ptype, lambda name: name in rel_files)
+        if entry is None or entry not in rel_files:
+            raise InstallError(f"plugin.json 未指定 entry，zip 包中也没有默认入口文件 {entry or 'run.py / run.bat'}")
+    args = meta.get("args", [])
+    if not isinstance(args, list) or not all(isinstance(a, dict) for a in args):
+        raise InstallError("plugin.json 中的 args 必须是对象列表")
+
+
+def folder_name(meta: dict, zip_path: str) -> str:
+    """插件安装后的目录名"""
+    stem = os.path.splitext(os.path.basename(zip_path))[0]
+    name = core.sanitize_name(str(meta.get("folder", meta.get("name", stem))))
+    # 名称全部是非法字符时退回 zip 文件名
+    return name or core.sanitize_name(stem) or "plugin"
+
+
+def stage(zip_path: str, plugins_dir) -> dict:
+    """
+    校验插件包并解压到暂存目录
+    :return: {"zip": zip 路径, "meta": plugin.json, "name": 安装目录名, "staging": 暂存目录, "files": 文件数, "size": 字节数,
+              "hashes": {相对路径: 文件内容的 sha256}}
+    :raise InstallError:
+    """
+    try:
+        zf = zipfile.ZipFile(zip_path, "r")
+    except (OSError, zipfile.BadZipFile) as e:
+        raise InstallError(f"无法打开 zip 包：{e}")
+    with zf:
+        infos = [(member_name(info), info) for info in zf.infolist()]
+        prefix = find_plugin_root([name for name, _ in infos])
+        if prefix is None:
+            raise InstallError("zip 包中未包含 plugin.json")
+        members = []
+        for name, info in infos:
+            rel = safe_relpath(name, prefix)
+            if rel is None:
+                if name.startswith(prefix) and not info.is_dir():
+                    raise InstallError(f"zip 包中的路径不合法：{name}")
+                continue
+            if not info.is_dir():
+                members.append((rel, info))
+        rel_files = {rel for rel, _ in members}
+        try:
+            meta = json.loads(zf.read(_manifest_info(infos, prefix)).decode("utf-8"))
+        except (zipfile.BadZipFile, zlib.error, KeyError, NotImplementedError, RuntimeError) as e:
+            raise InstallError(f"plugin.json 无法读取：{e}")
+        except ValueError as e:
+            raise InstallError(f"plugin.json 不是合法的 JSON：{e}")
+        validate_manifest(meta, rel_files)
+
+        staging = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=str(plugins_dir))
+        size = 0
+        hashes = {}
+        try:
+            for rel, info in members:
+                target = os.path.join(staging, *rel.split("/"))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                # ZipExtFile 读到文件末尾时校验 CRC，不一致抛出 BadZipFile；解压的同时计算哈希（插件仓库按哈希存放文件）
+                digest = hashlib.sha256()
+                with zf.open(info) as src, open(target, "wb") as dst:
+                    for chunk in iter(lambda: src.read(COPY_BUFFER), b""):
+                        digest.update(chunk)
+                        dst.write(chunk)
+                hashes[rel] = digest.hexdigest()
+                size += info.file_size
+        except (OSError, zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, RuntimeError) as e:
+            # RuntimeError：加密的 zip 包；NotImplementedError：不支持的压缩算法
+            shutil.rmtree(staging, ignore_errors=True)
+            raise InstallError(f"解压失败：{e}")
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+    return {"zip": str(zip_path), "meta": meta, "name": folder_name(meta, zip_path), "staging": staging,
+            "files": len(members), "size": size, "hashes": hashes}
+
+
+def _manifest_info(infos: list, prefix: str) -> zipfile.ZipInfo:
+    # 按还原后的文件名找到 plugin.json 对应的条目（原始文件名可能是乱码）
+    for name, info in infos:
+        if name == prefix + MANIFEST_NAME:
+            return info
+    raise KeyError(MANIFEST_NAME)
+
+
+def commit(staged: dict, dest: str) -> str:
+    """
+    把暂存目录换到 dest；dest 已存在时覆盖（旧目录先改名，新目录到位后再删除）
+    :return: dest
+    :raise InstallError:
+    """
+    staging = staged["staging"]
+    trash = None
+    if os.path.exists(dest):
+        trash = tempfile.mkdtemp(prefix=TRASH_PREFIX, dir=os.path.dirname(dest))
+        os.rmdir(trash)
+        try:
+            os.rename(dest, trash)
+        except OSError as e:
+            # 常见于 Windows 上插件目录中的文件被占用（插件正在运行）
+            discard(staged)
+            raise InstallError(f"无法替换插件目录 {dest}：{e}")
+    try:
+        os.rename(staging, dest)
+    except OSError as e:
+        if trash is not None:
+            os.rename(trash, dest)
+        discard(staged)
+        raise InstallError(f"安装失败：{e}")
+    if trash is not None:
+        shutil.rmtree(trash, ignore_errors=True)
+    return dest
+
+
+def discard(staged: dict):
+    """放弃安装，删除暂存目录"""
+    shutil.rmtree(staged["staging"], ignore_errors=True)
+
+
+def remove_leftovers(plugins_dir):
+    """删除上次安装中断（程序退出、断电）留下的暂存目录和待删除目录"""
+    try:
+        with os.scandir(str(plugins_dir)) as it:
+            names = [de.name for de in it if de.is_dir()]
+    except OSError:
+        return
+    for name in names:
+        if name.startswith(STAGING_PREFIX) or name.startswith(TRASH_PREFIX):
+            shutil.rmtree(os.path.join(str(plugins_dir), name), ignore_errors=True)
+
+
+def list_zips(folder: str) -> list:
+    """文件夹下的全部 zip 包（不含子目录），按文件名排序"""
+    with os.scandir(folder) as it:
+        return sorted(de.path for de in it if de.is_file() and de.name.lower().endswith(".zip"))
+
+
+def stage_many(zip_paths: list, plugins_dir, workers: int = 4, on_staged=None, is_cancelled=None) -> list:
+    """
+    并行暂存多个插件包
+    :param on_staged: 每完成一个回调 on_staged(zip_path, staged, error)，staged 与 error 二者之一为 None
+    :param is_cancelled: 返回 True 时不再开始新的解压
+    :return: [(zip_path, staged, error), ...]，与 zip_paths 顺序一致
+    """
+    def work(zip_path):
+        if is_cancelled is not None and is_cancelled():
+            result = (zip_path, None, "已取消")
+        else:
+            try:
+                result = (zip_path, stage(zip_path, plugins_dir), None)
+            except InstallError as e:
+                result = (zip_path, None, str(e))
+        if on_staged is not None:
+            on_staged(*result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(work, zip_paths))
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : plugin_search.py
+# @Description : 插件搜索：按名称、说明、拼音全拼或首字母过滤插件（例如 "pdfhb" 匹配 "PDF合并"）
+#
+# 拼音在扫描插件时计算一次，随插件清单索引缓存（plugin.json 不变就不重新计算），
+# 搜索时只做子串匹配，不再调用 pypinyin。
+import re
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def pinyin_keys(text: str):
+    """
+    文字的拼音全拼与首字母（小写、去掉空白），非中文部分原样保留
+    :return: (全拼, 首字母)；未安装 pypinyin 时为 ("", "")
+    """
+    try:
+        # pypinyin 导入时会加载很大的词典，只在需要时导入
+        from pypinyin import lazy_pinyin, Style
+    except ImportError:
+        return "", ""
+    full = "".join(lazy_pinyin(text, style=Style.NORMAL))
+    initials = "".join(lazy_pinyin(text, style=Style.FIRST_LETTER))
+    return _SPACE_RE.sub("", full).lower(), _SPACE_RE.sub("", initials).lower()
+
+
+def search_text(meta: dict, folder: str = "") -> str:
+    """插件的搜索文本：名称、目录名、说明、名称的拼音全拼与首字母，小写后以换行分隔"""
+    name = str(meta.get("name", ""))
+    full, initials = pinyin_keys(name)
+    parts = [name, _SPACE_RE.sub("", name), folder, str(meta.get("description", "")), full, initials]
+    return "\n".join(p for p in parts if p).lower()
+
+
+def parse_query(query: str) -> list:
+    """搜索框中的文字拆成关键词（空格分隔，都要匹配）"""
+    return query.lower().split()
+
+
+def matches(text: str, keywords: list) -> bool:
+    return all(k in text for k in keywords)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : plugin_store.py
+# @Description : 插件仓库：按内容哈希存放插件文件，保留插件的历史版本，多个版本中相同的文件只存一份
+#
+# 仓库位于插件根目录下的 .store（与插件目录在同一个文件系统上，才能 rename）：
+#   .store/objects/ab/abcdef...      文件内容，文件名为内容的 sha256，同样内容的文件只存一份
+#   .store/plugins/<插件目录名>.json  插件的各个版本（相对路径 -> 哈希）与当前启用的版本
+# 插件目录中的文件是 objects 的副本而不是硬链接：插件原地修改自己的文件（配置、数据文件、sqlite）时
+# 不会改到仓库中的文件，也就不会影响其它版本和内容相同的其它插件。
+# 启用某个版本时在暂存目录中按清单复制出插件目录，再整体换入插件目录（plugin_installer.commit）。
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import plugin_installer
+from plugin_index import read_manifest
+
+STORE_DIR = ".store"
+# 插件运行时生成、切换版本时不需要保留的目录
+SKIP_DIRS = ("__pycache__",)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(plugin_installer.COPY_BUFFER), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def version_id(files: dict) -> str:
+    """版本标识：全部文件（相对路径 + 哈希）的哈希，内容完全相同的安装包对应同一个版本"""
+    text = "\n".join(f"{rel}\0{files[rel]}" for rel in sorted(files))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def walk_files(folder: str) -> list:
+    """目录下全部文件的相对路径（/ 分隔），跳过 SKIP_DIRS"""
+    result = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        rel_root = os.path.relpath(root, folder).replace(os.sep, "/")
+        for name in files:
+            result.append(name if rel_root == "." else f"{rel_root}/{name}")
+    return result
+
+
+def _link(src: str, dst: str):
+    """硬链接，文件系统不支持（FAT32、部分网络盘）时复制；只用于插件自己生成的文件，不用于仓库中的文件"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _copy_atomic(src: str, dst: str):
+    """复制文件，先写临时文件再替换，中断时不会留下写了一半的 dst"""
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class PluginStore:
+    """
+    插件仓库，插件以插件目录名区分
+
+    install() 把暂存好的安装包（plugin_installer.stage 的结果）存入仓库并记为一个版本，
+    activate() 切换插件目录到指定版本，remove_version() 删除不再需要的版本并回收文件。
+    非线程安全，由界面线程 / 命令行顺序调用。
+    """
+
+    def __init__(self, plugins_dir):
+        self.plugins_dir = str(plugins_dir)
+        self.root = os.path.join(self.plugins_dir, STORE_DIR)
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.records_dir = os.path.join(self.root, "plugins")
+
+    def object_path(self, sha: str) -> str:
+        return os.path.join(self.objects_dir, sha[:2], sha)
+
+    def _record_path(self, name: str) -> str:
+        return os.path.join(self.records_dir, name + ".json")
+
+    def load(self, name: str):
+        """
+        插件在仓库中的记录
+        :return: {"active": 版本标识, "versions": [{"id", "version", "installed", "source", "files"}, ...]}；
+                 不在仓库中时返回 None
+        """
+        try:
+            with open(self._record_path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, name: str, record: dict):
+        os.makedirs(self.records_dir, exist_ok=True)
+        path = self._record_path(name)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+    def versions(self, name: str) -> list:
+        """插件的全部版本，最近安装的在前"""
+        record = self.load(name)
+        if record is None:
+            return []
+        # 记录中按安装顺序排列（重复安装的版本移到末尾）
+        return list(reversed(record["versions"]))
+
+    def active_version(self, name: str):
+        record = self.load(name)
+        if record is None:
+            return None
+        return next((v for v in record["versions"] if v["id"] == record.get("active")), None)
+
+    def _store_file(self, path: str, sha: str):
+        """把文件复制到 objects（内容相同的文件已存在时跳过）；path 与仓库中的文件互不影响"""
+        obj = self.object_path(sha)
+        if os.path.exists(obj):
+            return
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        _copy_atomic(path, obj)
+
+    def _add_version(self, name: str, files: dict, meta: dict, source: str) -> dict:
+        record = self.load(name) or {"active": None, "versions": []}
+        vid = version_id(files)
+        version = {"id": vid, "version": str(meta.get("version", "")), "installed": time.strftime("%Y-%m-%d %H:%M:%S"),
+                   "source": source, "files": files}
+        # 重复安装同一个包只更新安装时间
+        record["versions"] = [v for v in record["versions"] if v["id"] != vid] + [version]
+        self._save(name, record)
+        return version
+
+    def adopt(self, name: str):
+        """
+        把不在仓库中的已有插件目录（手动拷贝的插件、旧版本安装的插件）记为一个版本，之后可以回滚到它
+        :return: 版本；目录不存在或已在仓库中时返回 None
+        """
+        dest = os.path.join(self.plugins_dir, name)
+        if self.load(name) is not None or not os.path.isdir(dest):
+            return None
+        files = {}
+        for rel in walk_files(dest):
+            path = os.path.join(dest, *rel.split("/"))
+            sha = file_sha256(path)
+            self._store_file(path, sha)
+            files[rel] = sha
+        try:
+            meta = read_manifest(dest)
+        except (OSError, ValueError):
+            meta = {}
+        version = self._add_version(name, files, meta, "已有目录")
+        record = self.load(name)
+        record["active"] = version["id"]
+        self._save(name, record)
+        return version
+
+    def install(self, staged: dict, activate: bool = True) -> dict:
+        """
+        把暂存的安装包存入仓库，记为插件的一个版本；插件目录已存在时先把它记为一个版本
+        :param activate: 是否启用该版本；不启用时只保存，之后可在版本管理中启用
+        :return: 版本
+        :raise plugin_installer.InstallError:
+        """
+        name = staged["name"]
+        try:
+            self.adopt(name)
+            for rel, sha in staged["hashes"].items():
+                self._store_file(os.path.join(staged["staging"], *rel.split("/")), sha)
+            version = self._add_version(name, staged["hashes"], staged["meta"], staged["zip"])
+        except OSError as e:
+            plugin_installer.discard(staged)
+            raise plugin_installer.InstallError(f"存入插件仓库失败：{e}")
+        if activate:
+            self._swap(name, staged["staging"], version)
+        else:
+            plugin_installer.discard(staged)
+        return version
+
+    def activate(self, name: str, vid: str) -> dict:
+        """
+        启用插件的指定版本（切换 / 回滚）：按版本清单从仓库复制出插件目录后整体换入
+        :raise plugin_installer.InstallError:
+        """
+        record = self.load(name)
+        version = next((v for v in (record or {}).get("versions", []) if v["id"] == vid), None)
+        if version is None:
+            raise plugin_installer.InstallError(f"插件 {name} 没有版本 {vid}")
+        staging = tempfile.mkdtemp(prefix=plugin_installer.STAGING_PREFIX, dir=self.plugins_dir)
+        try:
+            for rel, sha in version["files"].items():
+                target = os.path.join(staging, *rel.split("/"))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(self.object_path(sha), target)
+        except OSError as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise plugin_installer.InstallError(f"仓库中的文件缺失或无法读取：{e}")
+        self._swap(name, staging, version)
+        return version
+
+    def _swap(self, name: str, staging: str, version: dict):
+        dest = os.path.join(self.plugins_dir, name)
+        record = self.load(name)
+        old = next((v for v in record["versions"] if v["id"] == record.get("active")), None)
+        if old is not None and os.path.isdir(dest):
+            try:
+                self._carry_untracked(dest, staging, old["files"], version["files"])
+            except OSError as e:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise plugin_installer.InstallError(f"无法保留插件目录中生成的文件：{e}")
+        plugin_installer.commit({"staging": staging}, dest)
+        record["active"] = version["id"]
+        self._save(name, record)
+
+    @staticmethod
+    def _carry_untracked(dest: str, staging: str, old_files: dict, new_files: dict):
+        """插件运行时在自己目录中生成的文件（不属于旧版本）带到新版本中；用硬链接，换入失败时原目录不受影响"""
+        for rel in walk_files(dest):
+            if rel in old_files or rel in new_files:
+                continue
+            target = os.path.join(staging, *rel.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            _link(os.path.join(dest, *rel.split("/")), target)
+
+    def remove_version(self, name: str, vid: str):
+        """删除插件的一个历史版本（不能删除当前启用的版本），并回收不再被任何版本引用的文件"""
+        record = self.load(name)
+        if record is None:
+            return
+        if record.get("active") == vid:
+            raise plugin_installer.InstallError("不能删除当前启用的版本")
+        record["versions"] = [v for v in record["versions"] if v["id"] != vid]
+        self._save(name, record)
+        self.collect_garbage()
+
+    def collect_garbage(self) -> int:
+        """
+        删除不被任何插件的任何版本引用的文件
+        :return: 删除的文件数
+        """
+        referenced = set()
+        try:
+            names = [n[:-5] for n in os.listdir(self.records_dir) if n.endswith(".json")]
+        except OSError:
+            names = []
+        for name in names:
+            record = self.load(name)
+            if record is None:
+                # 记录损坏时无法判断引用关系，不回收
+                return 0
+            for version in record["versions"]:
+                referenced.update(version["files"].values())
+        removed = 0
+        for root, _dirs, files in os.walk(self.objects_dir):
+            for sha in files:
+                if sha not in referenced:
+                    try:
+                        os.remove(os.path.join(root, sha))
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : proc_sampler.py
+# @Description : 采样插件进程及其全部子进程的 CPU / 内存 / 线程数 / IO
+#
+# Linux 直接读取 /proc；其它平台安装了 psutil 时使用 psutil，否则不采样。
+import os
+import sys
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROC_ROOT = "/proc"
+
+
+def is_supported() -> bool:
+    return sys.platform.startswith("linux") and os.path.isdir(PROC_ROOT) or psutil is not None
+
+
+def format_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def format_usage(usage: dict) -> str:
+    return (f"CPU {usage['cpu']:.0f}%  内存 {format_bytes(usage['rss'])}  线程 {usage['threads']}  "
+            f"进程 {usage['procs']}  读 {format_bytes(usage['read'])}  写 {format_bytes(usage['write'])}")
+
+
+class _ProcReader:
+    """/proc 读取（Linux）"""
+    clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+    page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def __init__(self):
+        # 内核未提供 /proc/<pid>/task/<tid>/children 时退化为扫描全部进程的父进程号
+        self.has_children_file = os.path.exists(f"{PROC_ROOT}/self/task/{os.getpid()}/children")
+
+    def tree(self, root: int) -> list:
+        """root 及其全部子孙进程的 pid"""
+        if self.has_children_file:
+            children = self._children_from_tasks
+        else:
+            parents = {}
+            for name in os.listdir(PROC_ROOT):
+                if name.isdigit():
+                    ppid = self._ppid(int(name))
+                    if ppid is not None:
+                        parents.setdefault(ppid, []).append(int(name))
+            children = lambda pid: parents.get(pid, [])
+        pids, stack = [], [root]
+        while stack:
+            pid = stack.pop()
+            pids.append(pid)
+            stack.extend(children(pid))
+        return pids
+
+    def _children_from_tasks(self, pid: int) -> list:
+        result = []
+        try:
+            tids = os.listdir(f"{PROC_ROOT}/{pid}/task")
+        except OSError:
+            return result
+        for tid in tids:
+            try:
+                with open(f"{PROC_ROOT}/{pid}/task/{tid}/children") as f:
+                    result.extend(int(p) for p in f.read().split())
+            except OSError:
+                continue
+        return result
+
+    @staticmethod
+    def _stat_fields(pid: int):
+        with open(f"{PROC_ROOT}/{pid}/stat") as f:
+            data = f.read()
+        # 进程名可能包含空格和括号，从最后一个 ')' 之后开始切分
+        return data[data.rfind(")") + 2:].split()
+
+    def _ppid(self, pid: int):
+        try:
+            return int(self._stat_fields(pid)[1])
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def read(self, pid: int):
+        """
+        :return: (cpu 秒, rss 字节, 线程数, 读字节, 写字节)；进程已退出时返回 None
+        """
+        try:
+            fields = self._stat_fields(pid)
+            cpu = (int(fields[11]) + int(fields[12])) / self.clock_ticks
+            threads = int(fields[17])
+            rss = int(fields[21]) * self.page_size
+        except (OSError, IndexError, ValueError):
+            return None
+        read = write = 0
+        try:
+            with open(f"{PROC_ROOT}/{pid}/io") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key == "rchar":
+                        read = int(value)
+                    elif key == "wchar":
+                        write = int(value)
+        except (OSError, ValueError):
+            pass  # 其它用户的进程没有权限读取 io
+        return cpu, rss, threads, read, write
+
+
+class _PsutilReader:
+    """psutil 读取（Windows / macOS）"""
+
+    def __init__(self):
+        self.procs = {}
+
+    def tree(self, root: int) -> list:
+        try:
+            proc = psutil.Process(root)
+            procs = [proc] + proc.children(recursive=True)
+        except psutil.Error:
+            return []
+        # 复用 Process 对象，cpu_times 等读取更快
+        self.procs = {p.pid: self.procs.get(p.pid, p) for p in procs}
+        return list(self.procs)
+
+    def read(self, pid: int):
+        proc = self.procs.get(pid)
+        if proc is None:
+            return None
+        try:
+            with proc.oneshot():
+                times = proc.cpu_times()
+                rss = proc.memory_info().rss
+                threads = proc.num_threads()
+                try:
+                    io = proc.io_counters()
+                    read, write = io.read_bytes, io.write_bytes
+                except (psutil.Error, AttributeError):
+                    read = write = 0
+        except psutil.Error:
+            return None
+        return times.user + times.system, rss, threads, read, write
+
+
+class ProcessTreeSampler:
+    """
+    进程树采样器：每次 sample() 汇总根进程及其全部子孙进程的资源占用，并记录峰值
+
+    CPU% 为两次采样之间占用的 CPU 时间 / 经过的时间（多核可超过 100%）；
+    读写字节数为累计值，已退出的子进程保留其最后一次采样到的数值。
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        if sys.platform.startswith("linux") and os.path.isdir(PROC_ROOT):
+            self.reader = _ProcReader()
+        elif psutil is not None:
+            self.reader = _PsutilReader()
+        else:
+            self.reader = None
+        self.last_time = None
+        self.cpu_times = {}  # pid -> 上次采样时的 CPU 秒
+        self.io = {}  # pid -> (读, 写)
+        self.peak = {"cpu": 0.0, "rss": 0, "threads": 0, "procs": 0}
+
+    def sample(self):
+        """
+        :return: {"cpu", "rss", "threads", "procs", "read", "write"}；不支持或进程已退出时返回 None
+        """
+        if self.reader is None:
+            return None
+        now = time.monotonic()
+        first = self.last_time is None
+        cpu_delta, rss, threads, procs, cpu_times = 0.0, 0, 0, 0, {}
+        for pid in self.reader.tree(self.pid):
+            values = self.reader.read(pid)
+            if values is None:
+                continue
+            cpu, p_rss, p_threads, read, write = values
+            # 上次采样后新出现的子进程，其 CPU 时间全部发生在本周期内
+            cpu_delta += cpu - self.cpu_times.get(pid, cpu if first else 0.0)
+            cpu_times[pid] = cpu
+            rss += p_rss
+            threads += p_threads
+            procs += 1
+            self.io[pid] = (read, write)
+        if not procs:
+            return None
+        elapsed = now - self.last_time if not first else 0
+        self.last_time = now
+        self.cpu_times = cpu_times
+        usage = {
+            "cpu": cpu_delta / elapsed * 100 if elapsed > 0 else 0.0,
+            "rss": rss,
+            "threads": threads,
+            "procs": procs,
+            "read": sum(r for r, _ in self.io.values()),
+            "write": sum(w for _, w in self.io.values()),
+        }
+        for key in self.peak:
+            self.peak[key] = max(self.peak[key], usage[key])
+        return usage
+
+    def peak_usage(self) -> dict:
+        """峰值（CPU / 内存 / 线程 / 进程数）与累计读写字节数"""
+        return dict(self.peak,
+                    read=sum(r for r, _ in self.io.values()),
+                    write=sum(w for _, w in self.io.values()))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : py_worker.py
+# @Description : 预热的 Python 解释器：提前启动并导入常用库，收到任务后以 __main__ 方式运行插件入口脚本
+#
+# 每个预热进程只运行一次插件（与冷启动一样进程隔离，插件之间不会共享模块状态），
+# 运行结束后由进程池补充新的预热进程；Windows 没有 fork，因此采用预先启动而不是复制进程。
+import json
+
+# 预热进程的启动代码（通过 python -c 传入，打包后的程序中同样可用）：
+#   argv[1:] 为需要预先导入的模块；导入失败的模块忽略，运行插件时再按需导入
+#   stdin 第一行为任务 JSON：{"script": 入口脚本, "argv": [参数...], "cwd": 工作目录}
+WORKER_CODE = """\
+import importlib, json, os, runpy, sys
+for _name in sys.argv[1:]:
+    try:
+        importlib.import_module(_name)
+    except Exception:
+        pass
+_line = sys.stdin.readline()
+if not _line:
+    sys.exit(0)
+_job = json.loads(_line)
+os.chdir(_job["cwd"])
+sys.argv = [_job["script"]] + _job["argv"]
+sys.path.insert(0, os.path.dirname(os.path.abspath(_job["script"])))
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def worker_args(preload: list) -> list:
+    """预热进程的 python 参数"""
+    return ["-c", WORKER_CODE] + list(preload)
+
+
+def job_line(script: str, argv: list, cwd: str) -> bytes:
+    """发送给预热进程的任务（一行 JSON）"""
+    # 只含 ASCII，预热进程按任何控制台编码读取都不会出错
+    return (json.dumps({"script": script, "argv": list(argv), "cwd": cwd}) + "\n").encode("ascii")
+
+
+def parse_preload(text: str) -> list:
+    """配置中以逗号分隔的预先导入模块列表"""
+    return [name.strip() for name in str(text or "").replace("，", ",").split(",") if name.strip()]
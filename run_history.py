@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : run_history.py
+# @Description : 插件运行历史（SQLite），由后台线程写入，界面线程只读
+import json
+import logging
+import math
+import os
+import queue
+import sqlite3
+import threading
+
+from logger_manager import resolve_plugin_log
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    plugin TEXT NOT NULL,
+    plugin_path TEXT,
+    version TEXT,
+    args TEXT,
+    state TEXT,
+    exit_code INTEGER,
+    started REAL,
+    ended REAL,
+    wall REAL,
+    log_path TEXT,
+    peak_cpu REAL,
+    peak_rss INTEGER,
+    peak_threads INTEGER,
+    io_read INTEGER,
+    io_write INTEGER
+)
+"""
+
+# 旧版本数据库缺少的列：(列名, 类型)
+ADDED_COLUMNS = [
+    ("peak_cpu", "REAL"),
+    ("peak_rss", "INTEGER"),
+    ("peak_threads", "INTEGER"),
+    ("io_read", "INTEGER"),
+    ("io_write", "INTEGER"),
+]
+
+
+def percentile(sorted_values: list, p: float):
+    """最近秩法求百分位数，sorted_values 需已升序排列；为空时返回 None"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RunHistory:
+    """
+    插件运行历史
+
+    record() 只把记录放入队列，由后台线程写入数据库，不阻塞调用方；建表、升级表结构也在后台线程中进行，
+    完成前查询返回空结果。查询在调用方线程使用独立的连接（WAL 模式下读写互不阻塞）。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.queue = queue.Queue()
+        self.thread = None
+        self.ready = threading.Event()  # 表结构已就绪
+        self._read_conn = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._run, name="run-history", daemon=True)
+        self.thread.start()
+
+    def record(self, run: dict):
+        """
+        记录一次运行
+        :param run: plugin, plugin_path, version, args(list), state, exit_code, started, ended, log_path,
+                    usage(资源峰值，见 proc_sampler.ProcessTreeSampler.peak_usage，可为 None)
+        """
+        self.queue.put(run)
+
+    def close(self, wait: bool = True):
+        """写完队列中剩余的记录后结束后台线程"""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        if wait:
+            self.thread.join()
+        self.thread = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _open(self):
+        """打开数据库并建表 / 补齐旧版本缺少的列"""
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+            for name, ctype in ADDED_COLUMNS:
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE runs ADD COLUMN {name} {ctype}")
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_plugin ON runs (plugin, started)")
+        return conn
+
+    def _run(self):
+        try:
+            conn = self._open()
+            self.ready.set()
+        except Exception:
+            logging.exception("打开运行历史数据库失败")
+            conn = None
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            runs = [run for run in batch if run is not None]
+            if conn is None:
+                if None in batch:
+                    return
+                continue
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO runs (plugin, plugin_path, version, args, state, exit_code, started, ended, "
+                        "wall, log_path, peak_cpu, peak_rss, peak_threads, io_read, io_write) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(run.get("plugin", ""), run.get("plugin_path"), run.get("version"),
+                          json.dumps(run.get("args", []), ensure_ascii=False), run.get("state"),
+                          run.get("exit_code"), run.get("started"), run.get("ended"),
+                          self._wall(run), run.get("log_path")) + self._usage(run) for run in runs])
+            except Exception:
+                logging.exception("写入运行历史失败")
+            if None in batch:
+                conn.close()
+                return
+
+    @staticmethod
+    def _wall(run: dict):
+        if run.get("started") is None or run.get("ended") is None:
+            return None
+        return run["ended"] - run["started"]
+
+    @staticmethod
+    def _usage(run: dict) -> tuple:
+        usage = run.get("usage")
+        if not usage:
+            return None, None, None, None, None
+        return usage.get("cpu"), usage.get("rss"), usage.get("threads"), usage.get("read"), usage.get("write")
+
+    # ---------------- 查询 ----------------
+    def _reader(self):
+        """查询用的连接；表结构尚未就绪时返回 None"""
+        if not self.ready.is_set():
+            return None
+        if self._read_conn is None:
+            self._read_conn = sqlite3.connect(self.db_path, timeout=5)
+            self._read_conn.row_factory = sqlite3.Row
+        return self._read_conn
+
+    def recent(self, plugin: str = None, limit: int = 500) -> list:
+        """
+        最近的运行记录，新的在前
+        :return: [dict, ...]，args 已解析为列表，log_path 为日志的实际路径（可能已压缩为 .gz）
+        """
+        sql = "SELECT * FROM runs"
+        params = []
+        if plugin:
+            sql += " WHERE plugin = ?"
+            params.append(plugin)
+        sql += " ORDER BY started DESC, id DESC LIMIT ?"
+        params.append(limit)
+        rows = []
+        conn = self._reader()
+        if conn is None:
+            return rows
+        for row in conn.execute(sql, params):
+            run = dict(row)
+            try:
+                run["args"] = json.loads(run["args"] or "[]")
+            except ValueError:
+                run["args"] = []
+            run["log_path"] = resolve_plugin_log(run["log_path"])
+            rows.append(run)
+        return rows
+
+    def plugins(self) -> list:
+        """有运行记录的插件名"""
+        conn = self._reader()
+        if conn is None:
+            return []
+        return [row[0] for row in conn.execute("SELECT DISTINCT plugin FROM runs ORDER BY plugin")]
+
+    def stats(self, plugin: str) -> dict:
+        """
+        插件的运行统计：次数、成功次数、成功运行耗时的 p50 / p95（秒）
+        """
+        conn = self._reader()
+        if conn is None:
+            return {"runs": 0, "succeeded": 0, "p50": None, "p95": None}
+        total = conn.execute("SELECT COUNT(*) FROM runs WHERE plugin = ?", (plugin,)).fetchone()[0]
+        walls = [row[0] for row in conn.execute(
+            "SELECT wall FROM runs WHERE plugin = ? AND state = 'finished' AND exit_code = 0 AND wall IS NOT NULL "
+            "ORDER BY wall", (plugin,))]
+        return {"runs": total, "succeeded": len(walls), "p50": percentile(walls, 50), "p95": percentile(walls, 95)}
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : stream_reader.py
+# @Description : 插件输出的增量解码与分行：跨数据块的多字节字符和半行都能正确拼接
+import codecs
+
+# 没有换行符的超长输出（例如进度条刷屏）超过该长度时强制作为一行输出，避免缓冲区无限增长
+MAX_LINE_CHARS = 64 * 1024
+
+
+def normalize_encoding(encoding: str, default: str = "utf-8") -> str:
+    """校验编码名称，无法识别时回退到 default"""
+    try:
+        return codecs.lookup(encoding or default).name
+    except LookupError:
+        return codecs.lookup(default).name
+
+
+class LineReader:
+    """
+    把进程输出的字节流解码并切分为完整的行
+
+    feed() 每次接收任意大小的数据块，只返回已经完整的行；
+    末尾不完整的字符/半行留到下一块数据到达时再拼接，进程结束后调用 flush() 取出剩余内容。
+    """
+
+    def __init__(self, encoding: str = "utf-8", errors: str = "replace"):
+        self.encoding = normalize_encoding(encoding)
+        self.decoder = codecs.getincrementaldecoder(self.encoding)(errors)
+        self.partial = ""
+
+    def feed(self, data: bytes) -> list:
+        return self._split(self.partial + self.decoder.decode(data))
+
+    def flush(self) -> list:
+        text = self.partial + self.decoder.decode(b"", final=True)
+        self.partial = ""
+        return text.splitlines()
+
+    def _split(self, text: str) -> list:
+        lines = text.splitlines(True)
+        self.partial = ""
+        if lines and not lines[-1].endswith(("\n", "\r")):
+            self.partial = lines.pop()
+        elif lines and lines[-1].endswith("\r"):
+            # \r\n 可能被拆在两个数据块之间，先保留 \r 等待下一块
+            self.partial = lines.pop()
+        if len(self.partial) > MAX_LINE_CHARS:
+            lines.append(self.partial)
+            self.partial = ""
+        return [line.rstrip("\r\n") for line in lines]
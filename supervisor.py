@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : supervisor.py
+# @Description : 插件进程监管：独立进程组、运行超时、整棵进程树的先终止后强杀、资源限制
+#
+# plugin.json 可选配置：
+#   "timeout": 600                                   运行超时（秒）
+#   "limits": {"memory_mb": 2048, "cpu_seconds": 3600}  地址空间 / CPU 时间上限（仅 Linux / macOS）
+import os
+import shutil
+import signal
+import subprocess
+import sys
+
+# 先发送终止信号，超过该时间仍未退出则强制结束
+GRACE_SECONDS = 5
+
+IS_WINDOWS = sys.platform.startswith("win")
+
+# POSIX 下的启动包装：新建会话（进程组）并设置资源限制后 exec 插件程序，pid 保持不变
+WRAPPER_CODE = """\
+import os, sys
+os.setsid()
+mem, cpu = int(sys.argv[1]), int(sys.argv[2])
+if mem > 0 or cpu > 0:
+    try:
+        import resource
+        if mem > 0:
+            resource.setrlimit(resource.RLIMIT_AS, (mem, mem))
+        if cpu > 0:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 5))
+    except (ImportError, ValueError, OSError) as e:
+        sys.stderr.write("资源限制设置失败：%s\\n" % e)
+try:
+    os.execvp(sys.argv[3], sys.argv[3:])
+except OSError as e:
+    sys.stderr.write("启动失败：%s\\n" % e)
+    os._exit(127)
+"""
+
+
+def read_limits(meta: dict) -> dict:
+    """
+    读取 plugin.json 中的超时与资源限制，非法值视为未配置
+    :return: {"timeout": 秒或 None, "memory_mb": int 或 None, "cpu_seconds": int 或 None}
+    """
+    def positive(value, cast):
+        try:
+            value = cast(value)
+        except (TypeError, ValueError):
+            return None
+        return value if value > 0 else None
+
+    limits = meta.get("limits") or {}
+    if not isinstance(limits, dict):
+        limits = {}
+    return {
+        "timeout": positive(meta.get("timeout"), float),
+        "memory_mb": positive(limits.get("memory_mb"), int),
+        "cpu_seconds": positive(limits.get("cpu_seconds"), int),
+    }
+
+
+def describe_limits(limits: dict) -> str:
+    parts = []
+    if limits.get("timeout"):
+        parts.append(f"超时 {limits['timeout']:g} 秒")
+    if limits.get("memory_mb"):
+        parts.append(f"内存 {limits['memory_mb']} MB")
+    if limits.get("cpu_seconds"):
+        parts.append(f"CPU 时间 {limits['cpu_seconds']} 秒")
+    return "，".join(parts)
+
+
+def _wrapper_python():
+    if getattr(sys, "frozen", False):
+        return shutil.which("python3") or shutil.which("python")
+    return sys.executable
+
+
+def wrap_command(program: str, args: list, limits: dict):
+    """
+    为 QProcess 包装启动命令，使插件运行在独立的进程组中（POSIX）
+    Windows 不需要包装，进程树通过 taskkill /T 结束
+    :return: (program, args, grouped)，grouped 表示插件进程的 pid 同时是其进程组号
+    """
+    python = None if IS_WINDOWS else _wrapper_python()
+    if python is None:
+        return program, args, False
+    mem = (limits.get("memory_mb") or 0) * 1024 * 1024
+    cpu = limits.get("cpu_seconds") or 0
+    return python, ["-S", "-c", WRAPPER_CODE, str(mem), str(cpu), program] + list(args), True
+
+
+def popen_kwargs(limits: dict) -> dict:
+    """subprocess.Popen 的参数：独立进程组 + 资源限制"""
+    if IS_WINDOWS:
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+
+    mem = (limits.get("memory_mb") or 0) * 1024 * 1024
+    cpu = limits.get("cpu_seconds") or 0
+
+    def apply_limits():
+        import resource
+        if mem:
+            resource.setrlimit(resource.RLIMIT_AS, (mem, mem))
+        if cpu:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 5))
+
+    kwargs = {"start_new_session": True}
+    if mem or cpu:
+        kwargs["preexec_fn"] = apply_limits
+    return kwargs
+
+
+def _signal_group(pid: int, sig) -> bool:
+    try:
+        os.killpg(pid, sig)
+        return True
+    except (ProcessLookupError, PermissionError):
+        return False
+
+
+def _taskkill(pid: int, force: bool) -> bool:
+    cmd = ["taskkill", "/T", "/PID", str(pid)]
+    if force:
+        cmd.insert(1, "/F")
+    try:
+        return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)).returncode == 0
+    except OSError:
+        return False
+
+
+def terminate_tree(pid: int) -> bool:
+    """请求插件进程树退出（SIGTERM / taskkill），返回是否还有进程存在"""
+    if not pid:
+        return False
+    if IS_WINDOWS:
+        return _taskkill(pid, force=False)
+    return _signal_group(pid, signal.SIGTERM)
+
+
+def kill_tree(pid: int) -> bool:
+    """强制结束插件进程树（SIGKILL / taskkill /F），返回是否还有进程存在"""
+    if not pid:
+        return False
+    if IS_WINDOWS:
+        return _taskkill(pid, force=True)
+    return _signal_group(pid, signal.SIGKILL)
@@ -0,0 +1,158 @@
+import json
+
+import pytest
+
+from pipeline import (
+    FAILED, OK, RUNNING, SKIPPED, STOPPED, WAITING, PipelineError, PipelineRun, _pipe_groups, load_pipeline,
+    topological_groups
+)
+
+
+def write_pipeline(tmp_path, steps, name="test") -> str:
+    path = tmp_path / f"{name}.pipeline.json"
+    path.write_text(json.dumps({"steps": steps}, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def step(sid, after=None, stdin=None, **args) -> dict:
+    data = {"id": sid, "plugin": "p", "args": args}
+    if after:
+        data["after"] = after
+    if stdin:
+        data["stdin"] = stdin
+    return data
+
+
+def steps_of(*specs) -> list:
+    """_pipe_groups 使用的规范化步骤"""
+    return [{"id": sid, "plugin": "p", "args": {}, "after": [], "stdin": stdin} for sid, stdin in specs]
+
+
+@pytest.mark.parametrize("steps, message", [
+    ([], "steps"),
+    ([{"id": "a"}], "缺少 id 或 plugin"),
+    ([step("a"), step("a")], "重复"),
+    ([step("a", after=["x"])], "不存在"),
+    ([step("a", after=["a"])], "自己"),
+    ([step("a", after=["b"]), step("b", after=["a"])], "有环"),
+    ([step("a", stdin="x")], "stdin 来源无效"),
+    ([step("a", stdin="a")], "stdin 来源无效"),
+    ([step("a"), step("b", stdin="a"), step("c", stdin="a")], "只能接到一个步骤"),
+    ([step("a"), step("b", stdin="a", after=["a"])], "不能再等待对方结束"),
+    ([step("a", f="{b.out}"), step("b", stdin="a")], "不能再等待对方结束"),
+])
+def test_load_pipeline_errors(tmp_path, steps, message):
+    with pytest.raises(PipelineError, match=message):
+        load_pipeline(write_pipeline(tmp_path, steps))
+
+
+def test_load_pipeline_invalid_json(tmp_path):
+    path = tmp_path / "bad.pipeline.json"
+    path.write_text("{", encoding="utf-8")
+    with pytest.raises(PipelineError, match="无法读取"):
+        load_pipeline(str(path))
+
+
+def test_load_pipeline_dependencies(tmp_path):
+    pipeline = load_pipeline(write_pipeline(tmp_path, [
+        step("split", output="{run_dir}/split"),
+        step("ocr", folder="{split.output}"),
+        step("index", after=["ocr"], folder="{split.output}"),
+    ], name="pdf"))
+    assert pipeline["name"] == "pdf"
+    assert pipeline["deps"] == {"split": set(), "ocr": {"split"}, "index": {"ocr", "split"}}
+    assert pipeline["groups"] == [["split"], ["ocr"], ["index"]]
+
+
+def test_pipe_groups_merge_chains():
+    # c 接在 b 后面、b 接在 a 后面：定义顺序与管道方向不同也合并为一组，按定义顺序排列
+    steps = steps_of(("c", "b"), ("x", None), ("b", "a"), ("a", None))
+    assert _pipe_groups(steps) == [["c", "b", "a"], ["x"]]
+
+
+def test_pipe_groups_merge_two_chains_joined_later():
+    steps = steps_of(("a", None), ("b", "a"), ("c", None), ("d", "c"), ("e", "b"))
+    assert _pipe_groups(steps) == [["a", "b", "e"], ["c", "d"]]
+
+
+def test_topological_groups(tmp_path):
+    pipeline = load_pipeline(write_pipeline(tmp_path, [
+        step("report", after=["count", "index"]),
+        step("count", stdin="list"),
+        step("index", after=["split"]),
+        step("list", after=["split"]),
+        step("split"),
+    ]))
+    order = topological_groups(pipeline)
+    assert sorted(map(sorted, order)) == sorted(map(sorted, pipeline["groups"]))
+    position = {sid: i for i, group in enumerate(order) for sid in group}
+    for sid, deps in pipeline["deps"].items():
+        assert all(position[dep] < position[sid] for dep in deps)
+    assert position["count"] == position["list"]
+
+
+def make_run(tmp_path, steps) -> PipelineRun:
+    pipeline = load_pipeline(write_pipeline(tmp_path, steps))
+    return PipelineRun(pipeline, {}, {}, str(tmp_path))
+
+
+def start_ready(run: PipelineRun) -> list:
+    groups = run.ready_groups()
+    for group in groups:
+        run.mark_running(group)
+    return groups
+
+
+def test_step_done_runs_dependents_in_order(tmp_path):
+    run = make_run(tmp_path, [step("a"), step("b", after=["a"]), step("c", after=["a"])])
+    assert start_ready(run) == [["a"]]
+    assert run.step_done("a", True) == ([], [])
+    assert start_ready(run) == [["b"], ["c"]]
+    run.step_done("b", True)
+    run.step_done("c", True)
+    assert run.is_finished()
+    assert [run.state(sid) for sid in run.step_ids()] == [OK, OK, OK]
+
+
+def test_failure_skips_downstream_transitively(tmp_path):
+    run = make_run(tmp_path, [step("a"), step("b", after=["a"]), step("c", after=["b"]), step("d")])
+    start_ready(run)
+    partners, skipped = run.step_done("a", False)
+    assert partners == []
+    assert sorted(skipped) == ["b", "c"]
+    assert run.state("a") == FAILED
+    assert run.state("d") == RUNNING
+    run.step_done("d", True)
+    assert run.is_finished()
+    assert "失败 1" in run.summary() and "已跳过 2" in run.summary()
+
+
+def test_failure_in_pipe_group_stops_partner(tmp_path):
+    run = make_run(tmp_path, [step("list"), step("count", stdin="list"), step("report", after=["count"])])
+    assert start_ready(run) == [["list", "count"]]
+    partners, skipped = run.step_done("list", False)
+    assert partners == ["count"]
+    assert skipped == []
+    # 被要求停止的步骤即使退出码为 0 也记为已停止，下游跳过
+    partners, skipped = run.step_done("count", True)
+    assert partners == []
+    assert skipped == ["report"]
+    assert run.state("count") == STOPPED
+    assert run.is_finished()
+
+
+def test_stop_skips_waiting_and_returns_running(tmp_path):
+    run = make_run(tmp_path, [step("a"), step("b", after=["a"])])
+    start_ready(run)
+    assert run.stop() == ["a"]
+    assert run.state("b") == SKIPPED
+    assert run.ready_groups() == []
+    run.step_done("a", True)
+    assert run.state("a") == STOPPED
+    assert run.is_finished()
+
+
+def test_step_done_ignores_steps_not_running(tmp_path):
+    run = make_run(tmp_path, [step("a")])
+    assert run.step_done("a", False) == ([], [])
+    assert run.state("a") == WAITING
@@ -0,0 +1,61 @@
+import json
+import os
+import zipfile
+
+import plugin_installer
+from plugin_store import PluginStore
+
+
+def make_zip(path, name: str, version: str, files: dict) -> str:
+    manifest = {"name": name, "type": "python", "entry": "run.py", "version": version}
+    with zipfile.ZipFile(str(path), "w") as zf:
+        zf.writestr("plugin.json", json.dumps(manifest))
+        zf.writestr("run.py", f"print({version!r})")
+        for rel, content in files.items():
+            zf.writestr(rel, content)
+    return str(path)
+
+
+def install(store: PluginStore, plugins_dir, zip_path: str) -> dict:
+    return store.install(plugin_installer.stage(zip_path, plugins_dir))
+
+
+def read(path) -> str:
+    with open(str(path), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_write_in_active_dir_does_not_change_other_versions(tmp_path):
+    plugins_dir = tmp_path / "plugins"
+    plugins_dir.mkdir()
+    store = PluginStore(plugins_dir)
+    v1 = install(store, plugins_dir, make_zip(tmp_path / "a1.zip", "a", "1.0", {"data.txt": "shared"}))
+    install(store, plugins_dir, make_zip(tmp_path / "a2.zip", "a", "2.0", {"data.txt": "shared"}))
+    install(store, plugins_dir, make_zip(tmp_path / "b.zip", "b", "1.0", {"data.txt": "shared"}))
+
+    # 插件原地修改自己的文件（不是先删除再新建）
+    with open(str(plugins_dir / "a" / "data.txt"), "r+", encoding="utf-8") as f:
+        f.write("CHANGED")
+
+    assert read(plugins_dir / "a" / "data.txt") == "CHANGED"
+    assert read(store.object_path(v1["files"]["data.txt"])) == "shared"
+    assert read(plugins_dir / "b" / "data.txt") == "shared"
+    store.activate("a", v1["id"])
+    assert read(plugins_dir / "a" / "data.txt") == "shared"
+
+
+def test_activate_keeps_files_created_by_plugin(tmp_path):
+    plugins_dir = tmp_path / "plugins"
+    plugins_dir.mkdir()
+    store = PluginStore(plugins_dir)
+    v1 = install(store, plugins_dir, make_zip(tmp_path / "a1.zip", "a", "1.0", {}))
+    install(store, plugins_dir, make_zip(tmp_path / "a2.zip", "a", "2.0", {}))
+    with open(str(plugins_dir / "a" / "output.log"), "w", encoding="utf-8") as f:
+        f.write("generated")
+
+    store.activate("a", v1["id"])
+
+    assert read(plugins_dir / "a" / "output.log") == "generated"
+    assert read(plugins_dir / "a" / "run.py") == "print('1.0')"
+    assert store.active_version("a")["id"] == v1["id"]
+    assert not any(name.startswith(".install-") for name in os.listdir(str(plugins_dir)))
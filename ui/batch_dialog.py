@@ -0,0 +1,199 @@
+import os
+from collections import deque
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPlainTextEdit, QPushButton, QFileDialog, QMessageBox,
+    QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView, QSplitter
+)
+
+from batch import parse_arg_matrix
+from ui.job_scheduler import JobScheduler, STATE_LABELS, FINISHED
+
+# 每个批量子任务在界面上保留的最近输出行数（完整输出在插件日志文件中）
+KEEP_LINES = 200
+
+
+class BatchDialog(QDialog):
+    """
+    批量执行：同一插件按参数矩阵运行多次，按 CPU 数并行
+    """
+    batch_finished = pyqtSignal(str)  # 汇总信息
+
+    def __init__(self, meta: dict, defaults: list, build_command, when_envs_ready, default_encoding: str = "utf-8",
+                 parent=None):
+        """
+        :param build_command: 构造启动命令，出错时提示并返回 None
+        :param when_envs_ready: when_envs_ready(metas, callback)，插件的运行环境就绪后调用 callback
+        """
+        super().__init__(parent)
+        self.meta = meta
+        self.specs = meta.get("args", [])
+        self.defaults = defaults
+        self.build_command = build_command
+        self.when_envs_ready = when_envs_ready
+        self.scheduler = JobScheduler(os.cpu_count() or 1, default_encoding, self)
+        self.scheduler.job_done.connect(self.on_job_done)
+        self.jobs = []
+        self.outputs = {}  # job_id -> 最近输出
+        self.setWindowTitle(f"批量执行 - {meta.get('name', '')}")
+        self.resize(800, 600)
+        self.init_ui()
+
+    def init_ui(self):
+        v = QVBoxLayout(self)
+        names = ", ".join(spec.get("label") or spec.get("name") for spec in self.specs) or "无参数"
+        hint = QLabel(f"每行一组参数（CSV 格式，列顺序：{names}）。第一行可以是参数名表头，缺少的列使用表单中的当前值。")
+        hint.setWordWrap(True)
+        v.addWidget(hint)
+
+        self.matrix_edit = QPlainTextEdit()
+        self.matrix_edit.setFont(QFont("Courier", 10))
+        self.matrix_edit.setPlaceholderText("参数1,参数2\n参数1,参数2")
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["序号", "参数", "状态", "退出码"])
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+
+        self.output_view = QPlainTextEdit()
+        self.output_view.setReadOnly(True)
+        self.output_view.setFont(QFont("Courier", 10))
+
+        splitter = QSplitter(Qt.Vertical)
+        splitter.addWidget(self.matrix_edit)
+        splitter.addWidget(self.table)
+        splitter.addWidget(self.output_view)
+        splitter.setSizes([150, 250, 150])
+        v.addWidget(splitter, 1)
+
+        self.progress = QProgressBar()
+        self.progress.setFormat("%v / %m")
+        self.summary_label = QLabel("")
+        v.addWidget(self.progress)
+        v.addWidget(self.summary_label)
+
+        row = QHBoxLayout()
+        self.import_btn = QPushButton("导入 CSV")
+        self.start_btn = QPushButton("开始")
+        self.stop_btn = QPushButton("全部停止")
+        self.stop_btn.setEnabled(False)
+        row.addWidget(self.import_btn)
+        row.addStretch(1)
+        row.addWidget(QLabel(f"并行数：{self.scheduler.max_parallel}"))
+        row.addWidget(self.start_btn)
+        row.addWidget(self.stop_btn)
+        v.addLayout(row)
+
+        self.import_btn.clicked.connect(self.on_import_clicked)
+        self.start_btn.clicked.connect(self.on_start_clicked)
+        self.stop_btn.clicked.connect(self.scheduler.stop_all)
+        self.table.itemSelectionChanged.connect(self.show_selected_output)
+
+    def on_import_clicked(self):
+        fn, _ = QFileDialog.getOpenFileName(self, "选择参数 CSV", "", "CSV files (*.csv *.txt)")
+        if not fn:
+            return
+        for encoding in ("utf-8-sig", "gbk"):
+            try:
+                with open(fn, "r", encoding=encoding) as f:
+                    self.matrix_edit.setPlainText(f.read())
+                return
+            except UnicodeDecodeError:
+                continue
+        QMessageBox.warning(self, "导入失败", "无法识别文件编码，请保存为 UTF-8 或 GBK")
+
+    def on_start_clicked(self):
+        try:
+            matrix = parse_arg_matrix(self.matrix_edit.toPlainText(), self.specs, self.defaults)
+        except ValueError as e:
+            QMessageBox.warning(self, "参数错误", str(e))
+            return
+        if not matrix:
+            QMessageBox.information(self, "提示", "请先填写参数")
+            return
+        self.start_btn.setEnabled(False)
+        # 声明了依赖的插件先创建运行环境，创建完成后再开始
+        self.when_envs_ready([self.meta], lambda: self._start(matrix))
+        # 运行环境创建失败时不会回调，可以重新点击开始
+        self.start_btn.setEnabled(not self.is_running())
+
+    def is_running(self) -> bool:
+        return any(job.is_active() for job in self.jobs)
+
+    def _start(self, matrix: list):
+        if self.is_running() or not self.isVisible():
+            return
+        commands = []
+        for args in matrix:
+            command = self.build_command(self.meta, args)
+            if command is None:
+                return
+            commands.append((args, command))
+
+        self.jobs = []
+        self.outputs = {}
+        self.table.setRowCount(len(commands))
+        self.progress.setRange(0, len(commands))
+        self.progress.setValue(0)
+        self.summary_label.setText("")
+        self.matrix_edit.setReadOnly(True)
+        self.start_btn.setEnabled(False)
+        self.import_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        for row, (args, (program, program_args, cwd)) in enumerate(commands):
+            job = self.scheduler.create_job(self.meta, args, program, program_args, cwd)
+            self.jobs.append(job)
+            self.outputs[job.job_id] = deque(maxlen=KEEP_LINES)
+            self.table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
+            self.table.setItem(row, 1, QTableWidgetItem(" ".join(args)))
+            self.table.setItem(row, 2, QTableWidgetItem(STATE_LABELS[job.state]))
+            self.table.setItem(row, 3, QTableWidgetItem(""))
+            job.output.connect(self.outputs[job.job_id].extend)
+            job.state_changed.connect(lambda state, _row=row: self.table.item(_row, 2).setText(STATE_LABELS[state]))
+        for job in self.jobs:
+            self.scheduler.submit(job)
+
+    def on_job_done(self, job):
+        row = self.jobs.index(job)
+        self.table.item(row, 3).setText("" if job.exit_code is None or job.exit_code < 0 else str(job.exit_code))
+        done = [j for j in self.jobs if not j.is_active()]
+        failed = [j for j in done if self._failed(j)]
+        self.progress.setValue(len(done))
+        self.summary_label.setText(f"完成 {len(done)}/{len(self.jobs)}，失败 {len(failed)}")
+        if len(done) == len(self.jobs):
+            self.on_batch_done(failed)
+
+    @staticmethod
+    def _failed(job) -> bool:
+        return job.state != FINISHED or job.exit_code != 0
+
+    def on_batch_done(self, failed: list):
+        self.start_btn.setEnabled(True)
+        self.import_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.matrix_edit.setReadOnly(False)
+        lines = [f"批量执行 {self.meta.get('name', '')} 完成：共 {len(self.jobs)} 组，失败 {len(failed)} 组"]
+        for job in failed:
+            row = self.jobs.index(job)
+            lines.append(f"  第 {row + 1} 组 [{' '.join(job.args)}] {STATE_LABELS[job.state]}，退出码 {job.exit_code}")
+        summary = "\n".join(lines)
+        self.output_view.setPlainText(summary)
+        self.batch_finished.emit(summary)
+
+    def show_selected_output(self):
+        row = self.table.currentRow()
+        if 0 <= row < len(self.jobs):
+            self.output_view.setPlainText("\n".join(self.outputs[self.jobs[row].job_id]))
+
+    def closeEvent(self, event):
+        if self.is_running():
+            ret = QMessageBox.question(self, "提示", "批量任务仍在运行，是否全部停止并关闭？")
+            if ret != QMessageBox.Yes:
+                event.ignore()
+                return
+            self.scheduler.stop_all()
+        super().closeEvent(event)
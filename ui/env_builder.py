@@ -0,0 +1,28 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from plugin_env import EnvError, build_env
+
+
+class EnvBuildWorker(QThread):
+    """
+    后台创建插件的运行环境（venv + pip 安装依赖），创建完成后由主窗口启动等待中的运行
+    """
+    output = pyqtSignal(str)  # venv / pip 的输出
+    build_finished = pyqtSignal(bool, str)  # 是否成功, 失败原因
+
+    def __init__(self, meta: dict, wheel_dir: str, parent=None):
+        super().__init__(parent)
+        self.meta = meta
+        self.wheel_dir = wheel_dir
+        self.pending = []  # 环境创建成功后依次调用的回调（运行插件等）
+
+    def run(self):
+        try:
+            build_env(self.meta, self.wheel_dir, self.output.emit)
+        except EnvError as e:
+            self.build_finished.emit(False, str(e))
+            return
+        except Exception as e:
+            self.build_finished.emit(False, f"创建运行环境失败：{e}")
+            return
+        self.build_finished.emit(True, "")
@@ -0,0 +1,144 @@
+import os
+from collections import deque
+from datetime import datetime
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
+    QMessageBox, QPlainTextEdit
+)
+
+from logger_manager import open_plugin_log
+from proc_sampler import format_bytes
+from run_history import RunHistory
+from ui.job_scheduler import STATE_LABELS
+
+ALL_PLUGINS = "全部插件"
+# 查看日志时显示的最后行数（完整日志可能有几百 MB）
+LOG_TAIL_LINES = 5000
+
+
+def format_seconds(seconds) -> str:
+    if seconds is None:
+        return ""
+    if seconds < 60:
+        return f"{seconds:.1f} 秒"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes} 分 {seconds} 秒"
+
+
+class HistoryDialog(QDialog):
+    """
+    运行历史：按插件筛选，显示耗时统计，可按原参数重新运行
+    """
+    rerun_requested = pyqtSignal(dict)  # 运行记录
+
+    def __init__(self, history: RunHistory, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.runs = []
+        self.setWindowTitle("运行历史")
+        self.resize(900, 560)
+
+        v = QVBoxLayout(self)
+        row = QHBoxLayout()
+        self.plugin_combo = QComboBox()
+        self.plugin_combo.addItem(ALL_PLUGINS)
+        self.plugin_combo.addItems(history.plugins())
+        self.stats_label = QLabel("")
+        self.stats_label.setStyleSheet("color:#666;")
+        row.addWidget(QLabel("插件："))
+        row.addWidget(self.plugin_combo)
+        row.addWidget(self.stats_label, 1)
+        v.addLayout(row)
+
+        self.table = QTableWidget(0, 9)
+        self.table.setHorizontalHeaderLabels(["开始时间", "插件", "版本", "参数", "耗时", "状态", "退出码",
+                                              "峰值 CPU", "峰值内存"])
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        v.addWidget(self.table, 1)
+
+        btn_row = QHBoxLayout()
+        self.log_btn = QPushButton("查看日志")
+        self.log_btn.setEnabled(False)
+        self.rerun_btn = QPushButton("按相同参数重新运行")
+        self.rerun_btn.setEnabled(False)
+        btn_row.addStretch(1)
+        btn_row.addWidget(self.log_btn)
+        btn_row.addWidget(self.rerun_btn)
+        v.addLayout(btn_row)
+
+        self.plugin_combo.currentTextChanged.connect(self.reload)
+        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        self.table.itemDoubleClicked.connect(lambda _item: self.on_rerun_clicked())
+        self.rerun_btn.clicked.connect(self.on_rerun_clicked)
+        self.log_btn.clicked.connect(self.on_log_clicked)
+        self.reload()
+
+    def reload(self):
+        plugin = self.plugin_combo.currentText()
+        plugin = None if plugin == ALL_PLUGINS else plugin
+        self.runs = self.history.recent(plugin)
+        self.table.setRowCount(len(self.runs))
+        for i, run in enumerate(self.runs):
+            started = datetime.fromtimestamp(run["started"]).strftime("%Y-%m-%d %H:%M:%S") if run["started"] else ""
+            code = run["exit_code"]
+            values = [started, run["plugin"], run["version"] or "", " ".join(run["args"]),
+                      format_seconds(run["wall"]), STATE_LABELS.get(run["state"], run["state"] or ""),
+                      "" if code is None or code < 0 else str(code),
+                      "" if run["peak_cpu"] is None else f"{run['peak_cpu']:.0f}%",
+                      "" if run["peak_rss"] is None else format_bytes(run["peak_rss"])]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col == 0 and run["log_path"]:
+                    item.setToolTip(run["log_path"])
+                self.table.setItem(i, col, item)
+        self.table.resizeColumnsToContents()
+        self.rerun_btn.setEnabled(False)
+        self.log_btn.setEnabled(False)
+
+        if plugin is None:
+            self.stats_label.setText(f"最近 {len(self.runs)} 次运行")
+            return
+        stats = self.history.stats(plugin)
+        text = f"共 {stats['runs']} 次，成功 {stats['succeeded']} 次"
+        if stats["p50"] is not None:
+            text += f"，耗时 P50 {format_seconds(stats['p50'])}，P95 {format_seconds(stats['p95'])}"
+        self.stats_label.setText(text)
+
+    def on_selection_changed(self):
+        row = self.table.currentRow()
+        self.rerun_btn.setEnabled(0 <= row < len(self.runs))
+        self.log_btn.setEnabled(0 <= row < len(self.runs) and bool(self.runs[row]["log_path"]))
+
+    def on_log_clicked(self):
+        row = self.table.currentRow()
+        if not 0 <= row < len(self.runs) or not self.runs[row]["log_path"]:
+            return
+        path = self.runs[row]["log_path"]
+        try:
+            with open_plugin_log(path) as f:
+                lines = deque(f, maxlen=LOG_TAIL_LINES)
+        except (OSError, EOFError) as e:
+            QMessageBox.warning(self, "提示", f"无法读取日志（可能已被清理）：{path}\n{e}")
+            return
+        dlg = QDialog(self)
+        dlg.setWindowTitle(os.path.basename(path))
+        dlg.resize(900, 600)
+        view = QPlainTextEdit()
+        view.setReadOnly(True)
+        view.setFont(QFont("Courier", 10))
+        view.setPlainText("".join(lines))
+        view.moveCursor(view.textCursor().End)
+        QVBoxLayout(dlg).addWidget(view)
+        dlg.show()
+
+    def on_rerun_clicked(self):
+        row = self.table.currentRow()
+        if 0 <= row < len(self.runs):
+            self.rerun_requested.emit(self.runs[row])
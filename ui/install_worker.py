@@ -0,0 +1,29 @@
+import os
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from plugin_installer import stage_many
+
+
+class PluginInstallWorker(QThread):
+    """
+    后台并行校验、解压插件包到暂存目录；每完成一个发回 GUI 线程，由界面处理重名并完成安装（commit）
+    """
+    package_staged = pyqtSignal(str, object, str)  # zip 路径, 暂存结果（失败时为 None）, 失败原因
+    install_finished = pyqtSignal()
+
+    def __init__(self, zip_paths: list, plugins_dir, parent=None):
+        super().__init__(parent)
+        self.zip_paths = list(zip_paths)
+        self.plugins_dir = plugins_dir
+        # 解压以 IO 和 zlib 为主（zlib 解压时释放 GIL），按 CPU 数并行
+        self.workers = min(8, os.cpu_count() or 1)
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def run(self):
+        stage_many(self.zip_paths, self.plugins_dir, workers=self.workers,
+                   on_staged=lambda path, staged, error: self.package_staged.emit(path, staged, error or ""),
+                   is_cancelled=self.isInterruptionRequested)
+        self.install_finished.emit()
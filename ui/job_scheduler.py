@@ -0,0 +1,361 @@
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+import core
+import supervisor
+from launcher import output_encoding
+from logger_manager import get_plugin_logger
+from proc_sampler import ProcessTreeSampler, format_bytes, is_supported
+from stream_reader import LineReader
+
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+STOPPED = "stopped"
+CANCELLED = "cancelled"
+TIMEOUT = "timeout"
+
+# 进程资源采样间隔（毫秒）
+SAMPLE_INTERVAL_MS = 1000
+
+STATE_LABELS = {
+    QUEUED: "排队中",
+    RUNNING: "运行中",
+    FINISHED: "已结束",
+    FAILED: "启动失败",
+    STOPPED: "已停止",
+    CANCELLED: "已取消",
+    TIMEOUT: "已超时",
+}
+
+
+class PluginJob(QObject):
+    """
+    一次插件运行：包装一个 QProcess 及其插件日志
+    """
+    output = pyqtSignal(list)  # 插件输出（已带时间戳的日志行）
+    state_changed = pyqtSignal(str)
+    done = pyqtSignal(int)  # 退出码；未启动/被取消时为 -1
+    usage = pyqtSignal(dict)  # 进程树资源占用，见 proc_sampler.ProcessTreeSampler.sample
+
+    def __init__(self, job_id: int, meta: dict, args: list, program: str, program_args: list, cwd: str,
+                 encoding: str = "utf-8", parent=None, python_pool=None):
+        super().__init__(parent)
+        self.job_id = job_id
+        self.python_pool = python_pool  # 可在其中运行的预热 Python 进程池（ui.python_pool）
+        self.meta = meta
+        self.args = args
+        self.program = program
+        self.program_args = program_args
+        self.cwd = cwd
+        self.encoding = encoding
+        self.stdout_reader = LineReader(encoding)
+        self.stderr_reader = LineReader(encoding)
+        self.state = QUEUED
+        self.exit_code = None
+        self.process = None
+        self.plugin_logger = None
+        self.log_path = None
+        self.started = None
+        self.ended = None
+        self.sampler = None
+        self.sample_timer = None
+        self.peak_usage = None
+        self.limits = supervisor.read_limits(meta)
+        self.pid = 0
+        self.grouped = False  # 是否运行在独立进程组中（可整组结束）
+        self.timeout_timer = None
+        self.kill_timer = None
+        self.group = None  # 需要同时启动的作业（管道相连），见 JobScheduler.submit_group
+
+    @property
+    def name(self) -> str:
+        return self.meta.get("name", "")
+
+    @property
+    def title(self) -> str:
+        return f"#{self.job_id} {self.name}"
+
+    def is_active(self) -> bool:
+        return self.state in (QUEUED, RUNNING)
+
+    def _set_state(self, state: str):
+        self.state = state
+        self.state_changed.emit(state)
+
+    def append_log(self, text: str, is_append_file=True):
+        self.append_lines(str(text).splitlines(), is_append_file)
+
+    def append_lines(self, lines: list, is_append_file=True):
+        if not lines:
+            return
+        stamp = core.ts()
+        self.output.emit([f"[{stamp}] {line}" for line in lines])
+        if is_append_file and self.plugin_logger is not None:
+            self.plugin_logger.info_lines(lines)
+
+    def _new_process(self) -> QProcess:
+        process = QProcess(self)
+        # set working directory to plugin path
+        process.setWorkingDirectory(self.cwd)
+        process.setProcessChannelMode(QProcess.MergedChannels)
+        return process
+
+    def pipe_to(self, consumer: "PluginJob"):
+        """
+        把本作业的标准输出直接接到 consumer 的标准输入（进程间的管道，数据不经过界面进程）
+        需要在两个作业启动前调用，两个作业应同时启动（JobScheduler.submit_group）；本作业的日志中只有标准错误输出
+        """
+        for job in (self, consumer):
+            # 预热的进程已经启动，无法再连接管道
+            job.python_pool = None
+            if job.process is None:
+                job.process = job._new_process()
+        self.process.setProcessChannelMode(QProcess.SeparateChannels)
+        self.process.setStandardOutputProcess(consumer.process)
+
+    def start(self):
+        log_base_path, plugin_log_dir = core.get_loggers_path()
+        self.plugin_logger = get_plugin_logger(plugin_name=core.chinese_to_pinyin_no_space(self.name),
+                                               log_dir=plugin_log_dir, display_name=self.name)
+        self.log_path = self.plugin_logger.path
+        self.started = time.time()
+        warm = None
+        if self.process is None and self.python_pool is not None:
+            warm = self.python_pool.take(self.program, self.program_args[0], self.program_args[1:], self.cwd)
+        if warm is not None:
+            self.process = warm
+            self.process.setParent(self)
+        elif self.process is None:
+            self.process = self._new_process()
+        self.process.setReadChannel(QProcess.StandardOutput)
+        self.process.readyReadStandardOutput.connect(self.on_stdout)
+        self.process.readyReadStandardError.connect(self.on_stderr)
+        self.process.finished.connect(self.on_finished)
+        self.process.errorOccurred.connect(self.on_error)
+        self.process.started.connect(self.on_started)
+
+        self.append_log("******************************")
+        self.append_log(f"启动：{self.program} {' '.join(self.program_args)}")
+        if supervisor.describe_limits(self.limits):
+            self.append_log(f"限制：{supervisor.describe_limits(self.limits)}")
+        if warm is not None:
+            # 预热进程已经在运行，收到任务后直接执行插件脚本
+            self.append_log("使用预热的 Python 进程")
+            self.grouped = self.python_pool.grouped
+            self._set_state(RUNNING)
+            self.on_started()
+            return
+        program, program_args, self.grouped = supervisor.wrap_command(self.program, self.program_args, self.limits)
+        self._set_state(RUNNING)
+        self.process.start(program, program_args)
+
+    def on_started(self):
+        self.pid = int(self.process.processId())
+        if self.limits["timeout"]:
+            self.timeout_timer = QTimer(self)
+            self.timeout_timer.setSingleShot(True)
+            self.timeout_timer.timeout.connect(self.on_timeout)
+            self.timeout_timer.start(int(self.limits["timeout"] * 1000))
+        if not is_supported():
+            return
+        self.sampler = ProcessTreeSampler(self.pid)
+        self.sample_timer = QTimer(self)
+        self.sample_timer.timeout.connect(self.on_sample)
+        self.sample_timer.start(SAMPLE_INTERVAL_MS)
+        self.on_sample()
+
+    def on_sample(self):
+        usage = self.sampler.sample()
+        if usage is not None:
+            self.usage.emit(usage)
+
+    def stop(self, force: bool = False):
+        """
+        停止作业：排队中直接取消（管道相连的整组作业一起取消，只剩一端时管道已断开）；
+        运行中先请求整棵进程树退出，GRACE_SECONDS 秒后仍未退出再强制结束（force=True 时立即强制结束）
+        """
+        if self.state == QUEUED:
+            self.append_log("已从队列中取消", False)
+            self._finish(CANCELLED, -1)
+            for member in self.group or []:
+                if member.state == QUEUED:
+                    member.append_log(f"管道相连的作业 {self.title} 已取消", False)
+                    member.stop()
+        elif self.state == RUNNING and self.process.state() != QProcess.NotRunning:
+            self.state = STOPPED
+            self._terminate(force)
+        elif self.state in (STOPPED, TIMEOUT) and force:
+            self._kill()
+
+    def on_timeout(self):
+        if self.state == RUNNING and self.process.state() != QProcess.NotRunning:
+            self.append_log(f"运行超过 {self.limits['timeout']:g} 秒，终止插件")
+            self.state = TIMEOUT
+            self._terminate()
+
+    def _terminate(self, force: bool = False):
+        if force:
+            self._kill()
+            return
+        if self.grouped or supervisor.IS_WINDOWS:
+            supervisor.terminate_tree(self.pid)
+        else:
+            self.process.terminate()
+        self.append_log(f"已发送终止信号，{supervisor.GRACE_SECONDS} 秒后仍未退出将强制结束")
+        self.kill_timer = QTimer(self)
+        self.kill_timer.setSingleShot(True)
+        self.kill_timer.timeout.connect(self._kill)
+        self.kill_timer.start(supervisor.GRACE_SECONDS * 1000)
+
+    def _kill(self):
+        if self.process.state() == QProcess.NotRunning:
+            return
+        if self.grouped or supervisor.IS_WINDOWS:
+            supervisor.kill_tree(self.pid)
+        self.process.kill()
+        self.append_log("已强制结束进程树")
+
+    def on_stdout(self):
+        # 只输出完整的行，半行与被截断的多字节字符留在 reader 中等待后续数据
+        self.append_lines(self.stdout_reader.feed(self.process.readAllStandardOutput().data()))
+
+    def on_stderr(self):
+        lines = self.stderr_reader.feed(self.process.readAllStandardError().data())
+        self.append_lines(["[ERR] " + line for line in lines])
+
+    def flush_output(self):
+        self.on_stdout()
+        self.on_stderr()
+        self.append_lines(self.stdout_reader.flush())
+        self.append_lines(["[ERR] " + line for line in self.stderr_reader.flush()])
+
+    def on_error(self, error):
+        if error == QProcess.FailedToStart:
+            self.append_log("进程未启动. 错误: " + self.process.errorString())
+            self._finish(FAILED, -1)
+
+    def on_finished(self, exitCode, exitStatus):
+        self.flush_output()
+        for timer in (self.timeout_timer, self.kill_timer):
+            if timer is not None:
+                timer.stop()
+        # 插件主进程已退出，进程组中残留的子进程一并结束，避免成为孤儿进程继续占用资源
+        if self.grouped and supervisor.kill_tree(self.pid):
+            self.append_log("已结束插件遗留的子进程")
+        if self.sampler is not None:
+            self.sample_timer.stop()
+            self.peak_usage = self.sampler.peak_usage()
+            peak = self.peak_usage
+            self.append_log(f"资源峰值：CPU {peak['cpu']:.0f}%，内存 {format_bytes(peak['rss'])}，"
+                            f"线程 {peak['threads']}，进程 {peak['procs']}，"
+                            f"累计读 {format_bytes(peak['read'])}，写 {format_bytes(peak['write'])}")
+        self.append_log(f"进程结束，退出码：{exitCode}")
+        self._finish(self.state if self.state in (STOPPED, TIMEOUT) else FINISHED, exitCode)
+
+    def _finish(self, state: str, exit_code: int):
+        self.exit_code = exit_code
+        if self.started is not None:
+            self.ended = time.time()
+        if self.plugin_logger is not None:
+            # 后台线程写完剩余日志后关闭文件
+            self.plugin_logger.close()
+            self.plugin_logger = None
+        self._set_state(state)
+        self.done.emit(exit_code)
+
+    def history_record(self) -> dict:
+        """运行历史记录（见 run_history.RunHistory.record）"""
+        return {
+            "plugin": self.name,
+            "plugin_path": self.meta.get("path"),
+            "version": self.meta.get("version"),
+            "args": self.args,
+            "state": self.state,
+            "exit_code": self.exit_code,
+            "started": self.started,
+            "ended": self.ended,
+            "log_path": self.log_path,
+            "usage": self.peak_usage,
+        }
+
+
+class JobScheduler(QObject):
+    """
+    插件运行调度：最多同时运行 max_parallel 个作业，其余按提交顺序排队
+    """
+    job_submitted = pyqtSignal(object)
+    job_started = pyqtSignal(object)
+    job_done = pyqtSignal(object)
+    counts_changed = pyqtSignal(int, int)  # 运行中, 排队中
+
+    def __init__(self, max_parallel: int = 2, default_encoding: str = "utf-8", parent=None):
+        super().__init__(parent)
+        self.max_parallel = max(1, max_parallel)
+        self.default_encoding = default_encoding
+        self.queue = deque()
+        self.running = []
+        self._next_id = 1
+        self.python_pool = None  # 预热 Python 进程池，未设置时 py 插件直接启动
+
+    def create_job(self, meta: dict, args: list, program: str, program_args: list, cwd: str) -> PluginJob:
+        pool = self.python_pool
+        if pool is not None and not pool.accepts(meta, program, program_args):
+            pool = None
+        job = PluginJob(self._next_id, meta, args, program, program_args, cwd,
+                        output_encoding(meta, self.default_encoding), self, pool)
+        self._next_id += 1
+        return job
+
+    def submit(self, job: PluginJob):
+        job.done.connect(lambda _code, _job=job: self._on_job_done(_job))
+        self.queue.append(job)
+        self.job_submitted.emit(job)
+        self._pump()
+
+    def submit_group(self, jobs: list):
+        """
+        提交需要同时启动的一组作业（例如管道的两端）：每个作业占用一个并行名额，排到后等空闲名额足够时全部同时启动，
+        避免一端在运行、另一端还在排队而互相等待；组内作业数超过 max_parallel 时等没有作业在运行时再启动
+        """
+        for job in jobs:
+            job.group = jobs
+            job.done.connect(lambda _code, _job=job: self._on_job_done(_job))
+            self.queue.append(job)
+            self.job_submitted.emit(job)
+        self._pump()
+
+    def set_max_parallel(self, n: int):
+        self.max_parallel = max(1, n)
+        self._pump()
+
+    def stop_all(self, force: bool = False):
+        for job in list(self.queue) + list(self.running):
+            job.stop(force)
+
+    def _pump(self):
+        while self.queue and len(self.running) < self.max_parallel:
+            job = self.queue[0]
+            members = [job] + [m for m in (job.group or []) if m is not job and m in self.queue]
+            if self.max_parallel - len(self.running) < min(len(members), self.max_parallel):
+                # 空闲名额不够整组启动，按顺序等待（后面的作业也不越过它）
+                break
+            for member in members:
+                self.queue.remove(member)
+            for member in members:
+                self.running.append(member)
+                self.job_started.emit(member)
+            for member in members:
+                member.start()
+        self.counts_changed.emit(len(self.running), len(self.queue))
+
+    def _on_job_done(self, job: PluginJob):
+        if job in self.running:
+            self.running.remove(job)
+        elif job in self.queue:
+            self.queue.remove(job)
+        self.job_done.emit(job)
+        self._pump()
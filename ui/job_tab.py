@@ -0,0 +1,44 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
+
+from proc_sampler import format_usage
+from ui.job_scheduler import PluginJob, STATE_LABELS
+from ui.log_view import LogView
+
+
+class JobTab(QWidget):
+    """
+    单个作业的日志页：状态 + 停止按钮 + 运行日志
+    """
+
+    def __init__(self, job: PluginJob, max_lines: int = 10000, parent=None):
+        super().__init__(parent)
+        self.job = job
+        v = QVBoxLayout(self)
+        v.setContentsMargins(0, 4, 0, 0)
+
+        row = QHBoxLayout()
+        self.state_label = QLabel()
+        self.state_label.setStyleSheet("color:#666;")
+        self.usage_label = QLabel()
+        self.usage_label.setStyleSheet("color:#666;")
+        self.stop_btn = QPushButton("停止")
+        row.addWidget(self.state_label)
+        row.addWidget(self.usage_label, 1)
+        row.addWidget(self.stop_btn)
+        v.addLayout(row)
+
+        self.log_area = LogView(max_lines)
+        v.addWidget(self.log_area, 1)
+
+        self.stop_btn.clicked.connect(job.stop)
+        job.output.connect(self.log_area.append_lines)
+        job.state_changed.connect(self.on_state_changed)
+        job.usage.connect(lambda usage: self.usage_label.setText(format_usage(usage)))
+        self.on_state_changed(job.state)
+
+    def on_state_changed(self, state: str):
+        text = STATE_LABELS.get(state, state)
+        if self.job.exit_code is not None and self.job.exit_code >= 0:
+            text += f"（退出码 {self.job.exit_code}）"
+        self.state_label.setText(f"{self.job.title}  {text}")
+        self.stop_btn.setEnabled(self.job.is_active())
@@ -0,0 +1,116 @@
+import time
+from datetime import datetime
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
+    QComboBox
+)
+
+from log_search import MIN_QUERY_CHARS, SHORT_QUERY_LINES, LogSearchIndex
+
+# 单次检索最多显示的行数
+MAX_RESULTS = 500
+ALL_PLUGINS = "全部插件"
+
+
+class LogSearchDialog(QDialog):
+    """
+    历史插件日志检索：输入关键字，列出匹配的日志行（新的运行在前）
+    检索在 LogSearchIndex 的查询线程中执行，结果经信号回到界面线程
+    """
+    results_ready = pyqtSignal(str, list, float)  # 请求（插件 + 关键字）, 结果行, 开始时间
+    plugins_ready = pyqtSignal(list)  # 有日志的插件（显示名称）
+
+    def __init__(self, index: LogSearchIndex, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.pending_request = ""
+        self.setWindowTitle("搜索历史日志")
+        self.resize(900, 560)
+
+        v = QVBoxLayout(self)
+        row = QHBoxLayout()
+        self.keyword_edit = QLineEdit()
+        self.keyword_edit.setPlaceholderText("输入关键字，例如 错误 / Exception / 文件名")
+        self.search_btn = QPushButton("搜索")
+        self.plugin_combo = QComboBox()
+        self.plugin_combo.addItem(ALL_PLUGINS)
+        row.addWidget(self.plugin_combo)
+        row.addWidget(self.keyword_edit, 1)
+        row.addWidget(self.search_btn)
+        v.addLayout(row)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["插件", "运行时间", "内容"])
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        v.addWidget(self.table, 1)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color:#666;")
+        v.addWidget(self.status_label)
+
+        self.search_btn.clicked.connect(self.on_search)
+        self.keyword_edit.returnPressed.connect(self.on_search)
+        self.results_ready.connect(self.on_results)
+        self.plugins_ready.connect(self.on_plugins)
+        self.plugin_combo.activated.connect(lambda _index: self.on_search())
+        self.index.plugins(lambda names: self._emit(self.plugins_ready, names))
+
+    def on_search(self):
+        text = self.keyword_edit.text().strip()
+        if not text:
+            return
+        if len(text) < MIN_QUERY_CHARS:
+            self.status_label.setText(f"关键字至少 {MIN_QUERY_CHARS} 个字符")
+            return
+        start = time.perf_counter()
+        plugin = self.plugin_combo.currentText()
+        plugin = None if plugin == ALL_PLUGINS else plugin
+        # 结果回来时与最新的请求（插件 + 关键字）比较，过时的结果不显示
+        request = f"{plugin or ''}\0{text}"
+        self.pending_request = request
+        self.status_label.setText("正在搜索…")
+        self.index.search(text, MAX_RESULTS, lambda rows: self._emit(self.results_ready, request, rows, start), plugin)
+
+    @staticmethod
+    def _emit(signal, *args):
+        # 在查询线程中调用；对话框已关闭时信号对象已销毁
+        try:
+            signal.emit(*args)
+        except RuntimeError:
+            pass
+
+    def on_plugins(self, names: list):
+        current = self.plugin_combo.currentText()
+        self.plugin_combo.clear()
+        self.plugin_combo.addItem(ALL_PLUGINS)
+        self.plugin_combo.addItems(names)
+        self.plugin_combo.setCurrentIndex(max(0, self.plugin_combo.findText(current)))
+
+    def on_results(self, request: str, rows: list, start: float):
+        if request != self.pending_request:
+            return
+        text = request.split("\0", 1)[1]
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(rows))
+        for i, (plugin, started, lineno, line) in enumerate(rows):
+            run_time = datetime.fromtimestamp(started).strftime("%Y-%m-%d %H:%M:%S") if started else ""
+            self.table.setItem(i, 0, QTableWidgetItem(plugin))
+            self.table.setItem(i, 1, QTableWidgetItem(run_time))
+            item = QTableWidgetItem(line)
+            item.setToolTip(f"第 {lineno} 行")
+            self.table.setItem(i, 2, item)
+        self.table.resizeColumnToContents(0)
+        self.table.resizeColumnToContents(1)
+        self.table.setUpdatesEnabled(True)
+
+        more = f"（仅显示最近 {MAX_RESULTS} 条）" if len(rows) >= MAX_RESULTS else ""
+        if self.index.is_short_query(text):
+            more += f"，关键字少于 3 个字符时只检索最近 {SHORT_QUERY_LINES} 行"
+        self.status_label.setText(f"找到 {len(rows)} 条{more}，耗时 {elapsed:.0f} ms")
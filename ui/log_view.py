@@ -0,0 +1,55 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QPlainTextEdit
+
+# 刷新到控件的间隔（毫秒）：期间到达的日志行合并为一次插入
+FLUSH_INTERVAL_MS = 100
+
+
+class LogView(QPlainTextEdit):
+    """
+    批量刷新的只读日志控件
+
+    日志行先进入缓冲区，由定时器合并后一次性追加到控件；控件最多保留
+    max_lines 行（超出后丢弃最早的行），缓冲区也不会超过这个行数，
+    因此高频输出的插件既不会卡住界面线程，内存也不会无限增长。
+    """
+
+    def __init__(self, max_lines: int = 10000, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setFont(QFont("Courier", 10))
+        self.pending = []
+        self.dropped = 0
+        self.set_max_lines(max_lines)
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def set_max_lines(self, max_lines: int):
+        self.max_lines = max(1, max_lines)
+        self.setMaximumBlockCount(self.max_lines)
+
+    def append_lines(self, lines: list):
+        self.pending.extend(lines)
+        overflow = len(self.pending) - self.max_lines
+        if overflow > 0:
+            # 这些行刷新后也会被行数上限挤掉，直接丢弃
+            del self.pending[:overflow]
+            self.dropped += overflow
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        if self.dropped:
+            self.appendPlainText(f"... 输出过快，已省略 {self.dropped} 行，完整内容见插件日志文件")
+            self.dropped = 0
+        if self.pending:
+            self.appendPlainText("\n".join(self.pending))
+            self.pending = []
+
+    def clear(self):
+        self.pending = []
+        self.dropped = 0
+        super().clear()
@@ -1,23 +1,36 @@
-import json
 import os
-import shutil
-import sys
-import tempfile
-import zipfile
+from collections import OrderedDict
 from pathlib import Path
 
-from PyQt5.QtCore import Qt, QProcess, QTimer
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QIcon
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QListWidget, QListWidgetItem,
+    QWidget, QVBoxLayout, QListView,
     QPushButton, QFileDialog, QMessageBox, QLabel, QGroupBox, QFormLayout,
-    QLineEdit, QPlainTextEdit, QSplitter, QComboBox, QSpacerItem, QSizePolicy,
-    QHBoxLayout, QScrollArea
+    QLineEdit, QSplitter, QComboBox, QSpacerItem, QSizePolicy,
+    QHBoxLayout, QScrollArea, QStackedWidget, QTabWidget, QTabBar, QMenu, QApplication
 )
 
 import core
-from ui.settings_dialog import SettingsDialog
-from logger_manager import get_plugin_logger
+from last_args import LastArgs
+from launcher import LaunchError, default_args, resolve_command
+from log_janitor import LogJanitor
+from log_search import LogSearchIndex
+from ui.job_scheduler import JobScheduler
+from ui.job_tab import JobTab
+from ui.log_view import LogView
+import plugin_env
+from plugin_index import PluginIndex
+from plugin_search import parse_query
+from py_worker import parse_preload
+from run_history import RunHistory
+from ui.plugin_model import SORT_MODES, PluginFilterProxy, PluginListModel
+from ui.plugin_scanner import PluginScanWorker
+from ui.plugin_watcher import PluginFolderWatcher
+from ui.python_pool import PythonWorkerPool
+
+# 缓存的参数表单数（文件选择等控件较多的表单重建较慢，来回切换插件时直接复用）
+FORM_CACHE_SIZE = 20
 
 APP_MAC_STYLE = """
 QWidget {
@@ -64,7 +77,7 @@ QLineEdit, QTextEdit, QPlainTextEdit, QComboBox {
     padding: 4px 6px;
 }
 
-QListWidget {
+QListView {
     background-color: #ffffff;
     border: 1px solid #d2d2d7;
     border-radius: 8px;
@@ -120,16 +133,65 @@ class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("办公百宝箱")
-        icon_path = os.path.join(core.get_base_path(), "doc/logo.png")
-        self.setWindowIcon(QIcon(icon_path))
         self.resize(1000, 600)
-        self.process = None
         self.current_plugin = None
         self.arg_widgets = []  # list of dicts: {'spec':spec, 'widget': widget}
-        self.config = core.load_config()
+        # 最近使用的插件的参数表单（保留着用户填写的内容）：插件目录 -> {"meta", "form", "arg_widgets"}，最近使用的在末尾
+        self.form_cache = OrderedDict()
+        self.last_args = LastArgs(core.get_data_path() / "last_args.json")
+        self.config = core.get_config()
+        self.config.add_listener(self.on_config_changed)
+        self.plugin_index = PluginIndex(core.get_plugin_index_path())
+        self.scan_worker = None
+        self.install_worker = None
+        self._install = None  # 本次安装的状态，见 install_packages
+        self._scan_full = True
+        self._pending_scan = None  # 扫描进行中又收到的刷新请求："full" / "sync"
+        self.plugin_model = PluginListModel(self)
+        self.plugin_proxy = PluginFilterProxy(self)
+        self.plugin_proxy.setSourceModel(self.plugin_model)
+        self._syncing_selection = False
+        self.plugin_watcher = PluginFolderWatcher(parent=self)
+        self.plugin_watcher.changed.connect(self.sync_plugins)
+        self.scheduler = JobScheduler(self.config.get_int("max_parallel", 1),
+                                      self.config.get("output_encoding"), self)
+        self.scheduler.job_submitted.connect(self.on_job_submitted)
+        self.scheduler.counts_changed.connect(self.on_job_counts_changed)
+        self.scheduler.job_done.connect(self.record_run)
+        self.python_pool = PythonWorkerPool(parent=self)
+        self.env_builds = {}  # 环境目录 -> 正在创建该环境的 EnvBuildWorker
+        self.scheduler.python_pool = self.python_pool
+        self.run_history = RunHistory(str(core.get_data_path() / "run_history.db"))
+        log_base_path, plugin_log_dir = core.get_loggers_path()
+        self.log_janitor = LogJanitor(plugin_log_dir, *self._log_retention())
+        self.log_index = LogSearchIndex(str(core.get_cache_path() / "log_index.db"), plugin_log_dir)
+        self._background_started = False
+        self._closed = False
         self.init_ui()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._background_started:
+            self._background_started = True
+            # 窗口先画出来，扫描插件、日志清理与索引、预热进程等在第一次绘制之后再开始
+            # （在 showEvent 中安排的话，定时器会在第一次绘制之前执行）
+            QTimer.singleShot(0, self.start_background_work)
+
+    def start_background_work(self):
+        """启动后在后台进行的工作；写入记录、搜索等在此之前调用也可以（排队等待或直接读库）"""
+        if self._closed:
+            # 第一次绘制后、定时器执行前窗口已关闭
+            return
+        if QApplication.windowIcon().isNull():
+            # 图标是 1024x1024 的 png，解码约需几十毫秒，不放在首次绘制之前
+            QApplication.setWindowIcon(QIcon(os.path.join(core.get_base_path(), "doc/logo.png")))
+        self.plugin_watcher.set_root(core.get_plugins_folder())
         self.load_plugins()
-        self.plugin_logger = None
+        self.run_history.start()
+        self.log_janitor.start()
+        self.log_index.start()
+        self._configure_python_pool()
+        core.warm_up_pinyin()
 
     def init_ui(self):
         self.setStyleSheet(APP_MAC_STYLE)
@@ -146,18 +208,47 @@ class MainWindow(QWidget):
         self.upload_btn = QPushButton("上传新插件")
         self.refresh_btn = QPushButton("刷新列表")
         self.setting_btn = QPushButton("设置")
+        upload_menu = QMenu(self.upload_btn)
+        upload_menu.addAction("选择插件 zip 包...", self.upload_plugin)
+        upload_menu.addAction("从文件夹批量安装...", self.upload_plugin_folder)
+        self.upload_btn.setMenu(upload_menu)
         up_btn_row.addWidget(self.upload_btn)
         up_btn_row.addWidget(self.refresh_btn)
         up_btn_row.addWidget(self.setting_btn)
         left_box.addLayout(up_btn_row)
 
-        self.plugin_list = QListWidget()
-        self.plugin_list.setSelectionMode(QListWidget.SingleSelection)
+        self.plugin_filter = QLineEdit()
+        self.plugin_filter.setPlaceholderText("搜索插件：名称、说明、拼音或首字母")
+        self.plugin_filter.setClearButtonEnabled(True)
+        self.plugin_sort = QComboBox()
+        for mode, label in SORT_MODES:
+            self.plugin_sort.addItem(label, mode)
+        filter_row = QHBoxLayout()
+        filter_row.addWidget(self.plugin_filter, 1)
+        filter_row.addWidget(self.plugin_sort)
+        left_box.addLayout(filter_row)
+
+        self.plugin_list = QListView()
+        self.plugin_list.setModel(self.plugin_proxy)
+        self.plugin_list.setSelectionMode(QListView.SingleSelection)
+        self.plugin_list.setEditTriggers(QListView.NoEditTriggers)
+        # 行高一致，视图不必逐行计算尺寸，插件很多时滚动、刷新都不受影响
+        self.plugin_list.setUniformItemSizes(True)
         left_box.addWidget(self.plugin_list, 1)
 
-        left_footer = QLabel("插件目录： " + str(core.get_plugins_folder()))
-        left_footer.setStyleSheet("color: #666; font-size: 11px;")
-        left_box.addWidget(left_footer)
+        scan_row = QHBoxLayout()
+        self.scan_status = QLabel("")
+        self.scan_status.setStyleSheet("color: #666; font-size: 11px;")
+        self.cancel_scan_btn = QPushButton("取消扫描")
+        scan_row.addWidget(self.scan_status, 1)
+        scan_row.addWidget(self.cancel_scan_btn)
+        self.scan_status.hide()
+        self.cancel_scan_btn.hide()
+        left_box.addLayout(scan_row)
+
+        self.plugin_footer = QLabel("插件目录： " + str(core.get_plugins_folder()))
+        self.plugin_footer.setStyleSheet("color: #666; font-size: 11px;")
+        left_box.addWidget(self.plugin_footer)
 
         left_widget = QWidget()
         left_widget.setStyleSheet("background-color: #f0f0f3; border-right: 1px solid #d2d2d7;")
@@ -182,19 +273,15 @@ class MainWindow(QWidget):
 
         # 参数区域放在 GroupBox 里并可滚动（若需再改为 QScrollArea）
         self.args_group = QGroupBox("参数")
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setStyleSheet("background-color:#ffffff;width:10px;border-radius: 5px;")
-
-        form_container = QWidget()
-        self.args_form = QFormLayout(form_container)
-        self.args_form.setLabelAlignment(Qt.AlignRight)
-        self.args_form.setSpacing(8)
-
-        scroll_area.setWidget(form_container)
+        # 每个插件的参数表单是 args_stack 中的一页，切换插件时只切换页面（见 show_plugin_meta）
+        self.args_scroll = QScrollArea()
+        self.args_scroll.setWidgetResizable(True)
+        self.args_scroll.setStyleSheet("background-color:#ffffff;width:10px;border-radius: 5px;")
+        self.args_stack = QStackedWidget()
+        self.args_scroll.setWidget(self.args_stack)
 
         vbox = QVBoxLayout(self.args_group)
-        vbox.addWidget(scroll_area)
+        vbox.addWidget(self.args_scroll)
         right_top_v.addWidget(self.args_group)
 
         # 执行按钮区域
@@ -202,8 +289,17 @@ class MainWindow(QWidget):
         self.run_btn = QPushButton("执行")
         self.stop_btn = QPushButton("停止")
         self.stop_btn.setEnabled(False)
+        self.batch_btn = QPushButton("批量执行")
+        self.pipeline_btn = QPushButton("流水线")
+        self.history_btn = QPushButton("运行历史")
+        self.job_count_label = QLabel("")
+        self.job_count_label.setStyleSheet("color:#666;")
         btn_row.addWidget(self.run_btn)
         btn_row.addWidget(self.stop_btn)
+        btn_row.addWidget(self.batch_btn)
+        btn_row.addWidget(self.pipeline_btn)
+        btn_row.addWidget(self.history_btn)
+        btn_row.addWidget(self.job_count_label)
         btn_row.addItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
         right_top_v.addLayout(btn_row)
 
@@ -218,12 +314,19 @@ class MainWindow(QWidget):
         log_label.setFont(QFont("", 11, QFont.Bold))
         right_bottom_v.addWidget(log_label)
 
-        self.log_area = QPlainTextEdit()
-        self.log_area.setReadOnly(True)
-        self.log_area.setFont(QFont("Courier", 10))
-        right_bottom_v.addWidget(self.log_area, 1)
+        self.log_area = LogView(self.config.get_int("log_max_lines", 100))
+        # 第一页为系统日志，每个插件作业一个独立的日志页
+        self.log_tabs = QTabWidget()
+        self.log_tabs.setTabsClosable(True)
+        self.log_tabs.addTab(self.log_area, "系统")
+        self.log_tabs.tabBar().setTabButton(0, QTabBar.RightSide, None)
+        right_bottom_v.addWidget(self.log_tabs, 1)
+        log_btn_row = QHBoxLayout()
+        self.search_log_btn = QPushButton("搜索历史日志")
         self.clear_log_btn = QPushButton("清空日志")
-        right_bottom_v.addWidget(self.clear_log_btn)
+        log_btn_row.addWidget(self.search_log_btn)
+        log_btn_row.addWidget(self.clear_log_btn, 1)
+        right_bottom_v.addLayout(log_btn_row)
         right_bottom = QWidget()
         right_bottom.setLayout(right_bottom_v)
 
@@ -251,65 +354,202 @@ class MainWindow(QWidget):
         self.setLayout(main_layout)
 
         # 事件绑定
-        self.upload_btn.clicked.connect(self.upload_plugin)
         self.refresh_btn.clicked.connect(self.load_plugins)
-        self.plugin_list.itemSelectionChanged.connect(self.on_plugin_selected)
+        self.cancel_scan_btn.clicked.connect(self.on_cancel_scan_clicked)
+        self.plugin_list.selectionModel().selectionChanged.connect(self.on_plugin_selected)
+        self.plugin_filter.textChanged.connect(self.on_plugin_filter_changed)
+        self.plugin_sort.currentIndexChanged.connect(self.on_plugin_sort_changed)
+        self.plugin_list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.plugin_list.customContextMenuRequested.connect(self.on_plugin_context_menu)
         self.run_btn.clicked.connect(self.on_run_clicked)
         self.stop_btn.clicked.connect(self.on_stop_clicked)
+        self.batch_btn.clicked.connect(self.on_batch_clicked)
+        self.pipeline_btn.clicked.connect(self.on_pipeline_clicked)
+        self.history_btn.clicked.connect(self.on_history_clicked)
+        self.log_tabs.currentChanged.connect(self.update_stop_btn)
+        self.log_tabs.tabCloseRequested.connect(self.on_job_tab_close)
         self.setting_btn.clicked.connect(self.on_setting_clicked)
         self.clear_log_btn.clicked.connect(self.on_clear_log_clicked)
+        self.search_log_btn.clicked.connect(self.on_search_log_clicked)
         # 样式（简单美化）
         self.setStyleSheet("""
             QPushButton { padding:6px 10px; }
             QGroupBox { font-weight: bold; }
-            QListWidget { background: white; }
+            QListView { background: white; }
         """)
 
     # ---------------- 插件管理 ----------------
     def load_plugins(self):
-        """扫描 plugins 目录，加载 plugin.json 信息"""
-        self.plugin_list.clear()
-        count = 0
-        for p in sorted(core.get_plugins_folder().iterdir()):
-            if p.is_dir():
-                j = p / "plugin.json"
-                if j.exists():
-                    try:
-                        meta = json.loads(j.read_text(encoding="utf-8"))
-                        meta['path'] = str(p)
-                        item = QListWidgetItem(str(count + 1) + '. ' + meta.get("name", p.name))
-                        item.setData(Qt.UserRole, meta)
-                        item.setToolTip(meta.get("description", ""))
-                        self.plugin_list.addItem(item)
-                        count += 1
-                    except Exception as e:
-                        print("load plugin failed", p, e)
-        self.append_log(f"已加载 {count} 个插件")
-
-    def on_plugin_selected(self):
-        item = self.plugin_list.currentItem()
-        if not item:
+        """后台扫描 plugins 目录，重新加载整个插件列表（未变化的插件直接取自索引）"""
+        self._start_scan(full=True)
+
+    def sync_plugins(self):
+        """后台扫描 plugins 目录，只对列表做增量的新增/更新/删除"""
+        self._start_scan(full=False)
+
+    def _start_scan(self, full: bool):
+        if self.scan_worker is not None and self.scan_worker.isRunning():
+            # 上一次扫描结束后再开始；全量刷新直接中止正在进行的扫描
+            if full or self._pending_scan == "full":
+                self._pending_scan = "full"
+                self.scan_worker.cancel()
+            else:
+                self._pending_scan = "sync"
+            return
+        self._pending_scan = None
+        self._scan_full = full
+        if full:
+            self.plugin_model.clear()
+        self.scan_status.setText("正在扫描插件...")
+        self.scan_status.show()
+        self.cancel_scan_btn.show()
+        self.scan_worker = PluginScanWorker(self.plugin_index, core.get_plugins_folder(), self)
+        if full:
+            self.scan_worker.batch_ready.connect(self.on_plugins_batch)
+        self.scan_worker.progress.connect(self.on_scan_progress)
+        self.scan_worker.scan_finished.connect(self.on_scan_finished)
+        self.scan_worker.start()
+
+    def on_plugin_filter_changed(self, text: str):
+        # 过滤掉选中的行时视图会改选相邻的插件，过滤后按右侧正在显示的插件恢复选中
+        self._syncing_selection = True
+        try:
+            self.plugin_proxy.set_keywords(parse_query(text))
+            self._select_current_plugin()
+        finally:
+            self._syncing_selection = False
+
+    def _select_current_plugin(self):
+        row = self.plugin_model.row_of(self.current_plugin["path"]) if self.current_plugin is not None else -1
+        index = self.plugin_proxy.mapFromSource(self.plugin_model.index(row)) if row >= 0 else None
+        if index is not None and index.isValid():
+            self.plugin_list.setCurrentIndex(index)
+        else:
+            self.plugin_list.clearSelection()
+
+    def on_plugin_sort_changed(self, _index: int):
+        self.plugin_model.set_sort_mode(self.plugin_sort.currentData())
+        current = self.plugin_list.currentIndex()
+        if current.isValid():
+            self.plugin_list.scrollTo(current)
+
+    def on_plugins_batch(self, records: list):
+        self.plugin_model.add(records)
+
+    def apply_plugin_changes(self, records: list):
+        """把新的插件列表增量合并到列表模型，只改动有变化的行"""
+        added, updated, removed = self.plugin_model.merge(records)
+        current = self.current_plugin
+        if current is not None and current["path"] in updated:
+            meta = self.plugin_index.manifest(current["path"])
+            if meta is not None and meta != current:
+                self.show_plugin_meta(meta)
+        return len(added), len(updated), len(removed)
+
+    def on_scan_progress(self, done: int, total: int):
+        self.scan_status.setText(f"正在扫描插件 {done}/{total}")
+
+    def on_scan_finished(self, result: dict):
+        self.scan_worker.deleteLater()
+        self.scan_worker = None
+        self.scan_status.hide()
+        self.cancel_scan_btn.hide()
+        if self._pending_scan:
+            self._start_scan(full=self._pending_scan == "full")
+            return
+        if self._scan_full:
+            for p, err in result["failed"]:
+                print("load plugin failed", p, err)
+        if result.get("cancelled"):
+            self.append_log(f"插件扫描已取消，已加载 {self.plugin_model.rowCount()} 个插件")
+            return
+        if result.get("error"):
+            # 扫描失败不代表插件都被删除了，保留现有列表与目录监听，目录恢复后刷新即可
+            self.append_log(f"扫描插件目录失败：{result['error']}")
             return
-        meta = item.data(Qt.UserRole)
-        self.show_plugin_meta(meta)
+        self.plugin_watcher.sync_plugin_dirs(result.get("dirs", []))
+        if self._scan_full:
+            self.append_log(f"已加载 {len(result['plugins'])} 个插件")
+            return
+        added, updated, removed = self.apply_plugin_changes(result["plugins"])
+        if added or updated or removed:
+            self.append_log(f"插件目录有变化：新增 {added} 个，更新 {updated} 个，移除 {removed} 个")
+
+    def on_cancel_scan_clicked(self):
+        if self.scan_worker is not None:
+            self._pending_scan = None
+            self.scan_worker.cancel()
+
+    def _record_at(self, index):
+        """视图中的行对应的插件记录"""
+        if not index.isValid():
+            return None
+        return self.plugin_model.record(self.plugin_proxy.mapToSource(index).row())
+
+    def _load_plugin_meta(self, record):
+        """读取插件的完整清单，失败时提示并返回 None"""
+        meta = self.plugin_index.manifest(record.path)
+        if meta is None:
+            QMessageBox.warning(self, "提示", f"插件 {record.name} 的 plugin.json 不存在或无法解析")
+        return meta
+
+    def on_plugin_selected(self, *_args):
+        indexes = self.plugin_list.selectionModel().selectedIndexes()
+        if self._syncing_selection or not indexes:
+            return
+        meta = self._load_plugin_meta(self._record_at(indexes[0]))
+        if meta is not None:
+            self.show_plugin_meta(meta)
 
     def show_plugin_meta(self, meta: dict):
-        """展示插件信息并动态生成参数表单"""
+        """展示插件信息与参数表单；表单按插件缓存，plugin.json 没有变化时直接复用"""
+        self.remember_args()
         self.current_plugin = meta
         name = meta.get("name", "未命名插件")
         desc = meta.get("description", "")
         self.plugin_title.setText(name)
         self.plugin_desc.setText(desc)
-        # 清空旧控件
-        while self.args_form.rowCount():
-            self.args_form.removeRow(0)
-        self.arg_widgets = []
+        path = meta["path"]
+        cached = self.form_cache.get(path)
+        if cached is None or cached["meta"] != meta:
+            if cached is not None:
+                self._drop_args_form(cached["form"])
+            form, arg_widgets = self._build_args_form(meta)
+            self.args_stack.addWidget(form)
+            cached = {"meta": meta, "form": form, "arg_widgets": arg_widgets}
+            self.form_cache[path] = cached
+        self.form_cache.move_to_end(path)
+        # 不显示的页面不参与尺寸计算，滚动区域的大小只取决于当前表单
+        previous = self.args_stack.currentWidget()
+        if previous is not None and previous is not cached["form"]:
+            previous.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+        cached["form"].setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
+        self.args_stack.setCurrentWidget(cached["form"])
+        self.arg_widgets = cached["arg_widgets"]
+        while len(self.form_cache) > max(1, FORM_CACHE_SIZE):
+            _path, evicted = self.form_cache.popitem(last=False)
+            self._drop_args_form(evicted["form"])
+
+    def _drop_args_form(self, form: QWidget):
+        self.args_stack.removeWidget(form)
+        form.deleteLater()
+
+    def _build_args_form(self, meta: dict):
+        """
+        生成插件的参数表单，初始值为上次使用的值（见 LastArgs）
+        :return: (表单控件, arg_widgets)
+        """
+        form_container = QWidget()
+        args_form = QFormLayout(form_container)
+        args_form.setLabelAlignment(Qt.AlignRight)
+        args_form.setSpacing(8)
+        arg_widgets = []
+        values = self.last_args.values(meta)
 
         args = meta.get("args", [])
-        for spec in args:
+        for spec, default in zip(args, values):
             label = spec.get("label") or spec.get("name")
             atype = spec.get("type", "string")
-            default = spec.get("default", "")
             widget = None
 
             if atype == "string":
@@ -364,83 +604,236 @@ class MainWindow(QWidget):
                 cb = QComboBox()
                 for o in spec.get("options", []):
                     cb.addItem(str(o))
-                idx = 0
-                try:
-                    idx = spec.get("options", []).index(default)
-                except:
-                    idx = 0
-                cb.setCurrentIndex(idx)
+                cb.setCurrentIndex(max(0, cb.findText(default)))
                 widget = cb
             else:
                 widget = QLineEdit()
                 widget.setText(str(default))
 
-            self.arg_widgets.append({"spec": spec, "widget": widget})
+            arg_widgets.append({"spec": spec, "widget": widget})
             widget.setFixedWidth(400)
             qlabel = QLabel(label + ":")
-            self.args_form.addRow(qlabel, widget)
+            args_form.addRow(qlabel, widget)
 
         # 如果没有 args，显示占位
         if not args:
-            self.args_form.addRow(QLabel("提示:"), QLabel("该插件不需要参数"))
+            args_form.addRow(QLabel("提示:"), QLabel("该插件不需要参数"))
+        return form_container, arg_widgets
+
+    def remember_args(self):
+        """记住当前插件表单中的参数值（切换插件、执行、关闭窗口时），下次打开插件时填回"""
+        if self.current_plugin is None or not self.arg_widgets:
+            return
+        try:
+            self.last_args.remember(self.current_plugin, self.collect_args())
+        except OSError as e:
+            print("save last args failed", e)
+
+    def on_plugin_context_menu(self, pos):
+        record = self._record_at(self.plugin_list.indexAt(pos))
+        if record is None:
+            return
+        menu = QMenu(self)
+        menu.addAction("版本管理...", lambda: self.show_versions(record.path))
+        menu.exec_(self.plugin_list.mapToGlobal(pos))
+
+    def show_versions(self, plugin_path: str):
+        from plugin_store import PluginStore
+        from ui.version_dialog import VersionDialog
+        dialog = VersionDialog(PluginStore(core.get_plugins_folder()), Path(plugin_path).name, self)
+        dialog.exec_()
+        if dialog.changed:
+            self.sync_plugins()
 
     # ---------------- 上传插件 ----------------
     def upload_plugin(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "选择插件 zip 包", core.get_base_path(), "Zip files (*.zip)")
-        if not file_path:
+        files, _ = QFileDialog.getOpenFileNames(self, "选择插件 zip 包（可多选）", core.get_base_path(),
+                                                "Zip files (*.zip)")
+        if files:
+            self.install_packages(files)
+
+    def upload_plugin_folder(self):
+        import plugin_installer
+        folder = QFileDialog.getExistingDirectory(self, "选择存放插件 zip 包的文件夹", core.get_base_path())
+        if not folder:
             return
         try:
-            tmp = Path(tempfile.mkdtemp(prefix="plugin_"))
-            with zipfile.ZipFile(file_path, 'r') as zf:
-                zf.extractall(str(tmp))
-            # 在 tmp 中寻找 plugin.json
-            found = None
-            for root, dirs, files in os.walk(str(tmp)):
-                if "plugin.json" in files:
-                    found = Path(root) / "plugin.json"
-                    break
-            if not found:
-                QMessageBox.warning(self, "上传失败", "zip 包中未包含 plugin.json")
-                shutil.rmtree(tmp)
-                return
-            meta = json.loads(found.read_text(encoding="utf-8"))
-            plugin_name = core.sanitize_name(meta.get("folder", meta.get("name", Path(file_path).stem)))
-            dest = core.get_plugins_folder() / plugin_name
-            if dest.exists():
-                # 提示覆盖或改名
-                ret = QMessageBox.question(self, "插件已存在", f"插件目录 {dest} 已存在，是否覆盖？",
-                                           QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
-                if ret == QMessageBox.Cancel:
-                    shutil.rmtree(tmp)
-                    return
-                elif ret == QMessageBox.No:
-                    # 尝试创建新名字
-                    idx = 1
-                    while True:
-                        cand = core.get_plugins_folder() / f"{plugin_name}_{idx}"
-                        if not cand.exists():
-                            dest = cand
-                            break
-                        idx += 1
-            shutil.move(str(found.parent), str(dest))
-            # 如果 tmp 下还有其它残留，尝试删除
-            try:
-                shutil.rmtree(tmp)
-            except:
-                pass
-            QMessageBox.information(self, "上传成功", f"已安装到：{dest}")
-            self.load_plugins()
-        except Exception as e:
+            files = plugin_installer.list_zips(folder)
+        except OSError as e:
             QMessageBox.critical(self, "上传失败", str(e))
+            return
+        if not files:
+            QMessageBox.information(self, "提示", "文件夹中没有 zip 包")
+            return
+        self.install_packages(files)
+
+    def install_packages(self, zip_paths: list):
+        """后台并行校验、解压插件包，解压完成的逐个在界面线程中处理重名并换入插件目录"""
+        # 安装、版本管理、各对话框只在用到时导入，不拖慢启动
+        import plugin_installer
+        from plugin_store import PluginStore
+        from ui.install_worker import PluginInstallWorker
+        if self.install_worker is not None:
+            QMessageBox.information(self, "提示", "正在安装插件，请稍候")
+            return
+        plugins_dir = core.get_plugins_folder()
+        plugin_installer.remove_leftovers(plugins_dir)
+        self._install = {"dir": plugins_dir, "store": PluginStore(plugins_dir), "total": len(zip_paths), "queue": [],
+                         "installed": [], "failed": [], "activate": None, "committing": False, "finished": False}
+        self.install_worker = PluginInstallWorker(zip_paths, plugins_dir, self)
+        self.install_worker.package_staged.connect(self.on_package_staged)
+        self.install_worker.install_finished.connect(self.on_install_finished)
+        self.upload_btn.setEnabled(False)
+        self.append_log(f"开始安装 {len(zip_paths)} 个插件包")
+        self.install_worker.start()
+
+    def on_package_staged(self, zip_path: str, staged, error: str):
+        if staged is None:
+            self._install["failed"].append((zip_path, error))
+            self.append_log(f"安装失败 {zip_path}：{error}")
+            return
+        self._install["queue"].append(staged)
+        self._commit_staged()
+
+    def on_install_finished(self):
+        self._install["finished"] = True
+        self._commit_staged()
+
+    def _commit_staged(self):
+        import plugin_installer
+        state = self._install
+        # 询问覆盖的对话框打开期间仍会收到后续的信号，这里保证逐个处理
+        if state["committing"]:
+            return
+        state["committing"] = True
+        try:
+            while state["queue"]:
+                staged = state["queue"].pop(0)
+                dest = os.path.join(str(state["dir"]), staged["name"])
+                activate = True
+                if os.path.exists(dest):
+                    activate = self._ask_activate(dest, staged["meta"])
+                    if activate is None:
+                        plugin_installer.discard(staged)
+                        self.append_log(f"已跳过 {staged['zip']}")
+                        continue
+                try:
+                    version = state["store"].install(staged, activate)
+                except plugin_installer.InstallError as e:
+                    state["failed"].append((staged["zip"], str(e)))
+                    self.append_log(f"安装失败 {staged['zip']}：{e}")
+                    continue
+                state["installed"].append(dest)
+                label = version["version"] or version["id"]
+                if activate:
+                    self.append_log(f"已安装 {staged['meta'].get('name', '')} {label} 到 {dest}（{staged['files']} 个文件）")
+                else:
+                    self.append_log(f"已保存 {staged['meta'].get('name', '')} {label} 为历史版本，可在版本管理中启用")
+        finally:
+            state["committing"] = False
+        if state["finished"] and state is self._install:
+            self._finish_install()
+
+    def _ask_activate(self, dest: str, meta: dict):
+        """
+        插件目录已存在时询问是否启用新版本（原有版本保留在插件仓库中，可以回滚）；批量安装时可以选择“全部”
+        :return: True 启用新版本，False 只保存为历史版本，None 跳过
+        """
+        state = self._install
+        if state["activate"] is not None:
+            return state["activate"]
+        buttons = QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+        if state["total"] > 1:
+            buttons |= QMessageBox.YesToAll | QMessageBox.NoToAll
+        version = meta.get("version", "")
+        ret = QMessageBox.question(self, "插件已存在",
+                                   f"插件目录 {dest} 已存在，是否启用新版本 {version}？\n"
+                                   f"原有版本会保留，可在插件的“版本管理”中回滚；选择“否”只保存新版本，不启用",
+                                   buttons)
+        if ret in (QMessageBox.YesToAll, QMessageBox.NoToAll):
+            state["activate"] = ret == QMessageBox.YesToAll
+            return state["activate"]
+        if ret == QMessageBox.Cancel:
+            return None
+        return ret == QMessageBox.Yes
+
+    def _finish_install(self):
+        state = self._install
+        self._install = None
+        self.install_worker.deleteLater()
+        self.install_worker = None
+        self.upload_btn.setEnabled(True)
+        installed, failed = state["installed"], state["failed"]
+        if installed:
+            self.sync_plugins()
+        if state["total"] == 1:
+            if installed:
+                QMessageBox.information(self, "上传成功", f"已安装到：{installed[0]}")
+            elif failed:
+                QMessageBox.critical(self, "上传失败", failed[0][1])
+            return
+        text = f"已安装 {len(installed)} 个插件，失败 {len(failed)} 个"
+        self.append_log(text)
+        if failed:
+            details = "\n".join(f"{os.path.basename(path)}：{error}" for path, error in failed[:10])
+            QMessageBox.warning(self, "批量安装完成", f"{text}\n\n{details}")
+        else:
+            QMessageBox.information(self, "批量安装完成", text)
 
     # ---------------- 执行插件 ----------------
     def on_run_clicked(self):
-        item = self.plugin_list.currentItem()
-        if not item:
+        if self.current_plugin is None:
+            QMessageBox.information(self, "提示", "请先选择一个插件")
+            return
+        self.remember_args()
+        self.start_process(self.current_plugin, self.collect_args())
+
+    def on_batch_clicked(self):
+        if self.current_plugin is None:
             QMessageBox.information(self, "提示", "请先选择一个插件")
             return
-        meta = item.data(Qt.UserRole)
-        # collect args in order
+        from ui.batch_dialog import BatchDialog
+        self.remember_args()
+        dlg = BatchDialog(self.current_plugin, self.collect_args(), self.build_command, self.when_envs_ready,
+                          self.scheduler.default_encoding, self)
+        dlg.batch_finished.connect(self.append_log)
+        dlg.scheduler.job_done.connect(self.record_run)
+        dlg.scheduler.python_pool = self.python_pool
+        dlg.show()
+
+    def on_pipeline_clicked(self):
+        from ui.pipeline_dialog import PipelineDialog
+        dlg = PipelineDialog(core.get_plugins_folder(), self.find_plugin_meta, self.build_command,
+                             self.when_envs_ready, self.scheduler, self)
+        dlg.pipeline_finished.connect(self.append_log)
+        dlg.show()
+
+    def find_plugin_meta(self, name: str):
+        """按插件名称或目录名查找插件的完整清单（流水线中引用插件）"""
+        record = self.plugin_model.find(name)
+        return self.plugin_index.manifest(record.path) if record is not None else None
+
+    def on_history_clicked(self):
+        from ui.history_dialog import HistoryDialog
+        dlg = HistoryDialog(self.run_history, self)
+        dlg.rerun_requested.connect(self.rerun)
+        dlg.show()
+
+    def rerun(self, run: dict):
+        """按运行记录中的参数再次运行插件"""
+        record = self.plugin_model.by_path.get(run.get("plugin_path")) or self.plugin_model.find(run.get("plugin", ""))
+        meta = self.plugin_index.manifest(record.path) if record is not None else None
+        if meta is None:
+            QMessageBox.warning(self, "提示", f"插件 {run.get('plugin', '')} 已不存在")
+            return
+        # 插件升级后参数个数可能变化：多余的丢弃，缺少的使用默认值
+        args = default_args(meta)
+        n = min(len(args), len(run.get("args", [])))
+        args[:n] = run["args"][:n]
+        self.start_process(meta, args)
+
+    def collect_args(self) -> list:
+        """按参数定义的顺序收集表单中的参数值"""
         args = []
         for aw in self.arg_widgets:
             spec = aw['spec']
@@ -459,154 +852,186 @@ class MainWindow(QWidget):
                     le = widget.findChild(QLineEdit)
                     val = le.text() if le else ""
             args.append(str(val))
-        self.start_process(meta, args)
+        return args
 
-    def append_log(self, text: str, is_append_file=False):
-        for line in str(text).splitlines():
-            self.log_area.appendPlainText(f"[{core.ts()}] {line}")
-            if is_append_file and self.plugin_logger is not None:
-                self.plugin_logger.info(line)
+    def append_log(self, text: str):
+        stamp = core.ts()
+        self.log_area.append_lines([f"[{stamp}] {line}" for line in str(text).splitlines()])
 
     def clear_log(self):
-        self.log_area.clear()
+        tab = self.log_tabs.currentWidget()
+        if isinstance(tab, JobTab):
+            tab.log_area.clear()
+        else:
+            self.log_area.clear()
 
     def start_process(self, meta: dict, args: list):
-        if self.process and self.process.state() != QProcess.NotRunning:
-            QMessageBox.warning(self, "警告", "已有插件在运行，请先停止")
-            return
-        entry = meta.get("entry")
-        ptype = meta.get("type", "").lower()
-        plugin_path = Path(meta.get("path", ""))
-        if not entry:
-            # default mapping
-            if ptype == "bat":
-                entry = "run.bat"
-            elif ptype == "python":
-                entry = "run.py"
-            else:
-                # try guess
-                if (plugin_path / "run.py").exists():
-                    entry = "run.py"
-                    ptype = "python"
-                elif (plugin_path / "run.bat").exists():
-                    entry = "run.bat"
-                    ptype = "bat"
-                else:
-                    QMessageBox.critical(self, "错误", "找不到入口脚本 (run.py/run.bat)，请检查插件目录")
-                    return
-        script_path = str(plugin_path / entry)
-        if not Path(script_path).exists():
-            QMessageBox.critical(self, "错误", f"入口文件不存在：{script_path}")
-            return
+        self.when_env_ready(meta, lambda: self._submit_process(meta, args))
 
-        self.process = QProcess(self)
-        # set working directory to plugin path
-
-        self.process.setWorkingDirectory(str(plugin_path))
-        self.process.setProcessChannelMode(QProcess.MergedChannels)
-        self.process.setReadChannel(QProcess.StandardOutput)
-        self.process.readyReadStandardOutput.connect(self.on_stdout)
-        self.process.readyReadStandardError.connect(self.on_stderr)
-        self.process.finished.connect(self.on_finished)
-
-        # build program / args for QProcess.start(program, args)
-        if ptype == "bat" or script_path.lower().endswith(".bat"):
-            program = "cmd"
-            qargs = ["/c", script_path] + args
-        elif ptype == "python" or script_path.lower().endswith(".py"):
-            HAS_PYTHON = bool(shutil.which("python3") or shutil.which("python"))
-            if not HAS_PYTHON:
-                QMessageBox.warning(self, "警告", "系统未检测到 Python,不能执行插件")
-                return
-            if getattr(sys, 'frozen', False):
-                program = shutil.which("python3") or shutil.which("python") or "python"
-            else:
-                program = sys.executable
-            qargs = [script_path] + args
-        elif ptype == "exe" or script_path.lower().endswith(".exe"):
-            program = script_path
-            qargs = args
-        elif ptype == "java" or script_path.lower().endswith(".jar"):
-            program = self.config.get("java_path").get("value")
-            if not program or not Path(program).exists():
-                QMessageBox.warning(self, "警告", "未配置 Java 路径，请先在设置中配置 JDK！")
-                return
-            qargs = ["-Dfile.encoding=UTF-8", "-jar", str(script_path)] + args
-        else:
-            # try make executable
-            program = script_path
-            qargs = args
+    def _submit_process(self, meta: dict, args: list):
+        command = self.build_command(meta, args)
+        if command is None:
+            return
+        program, qargs, cwd = command
+        job = self.scheduler.create_job(meta, args, program, qargs, cwd)
+        self.scheduler.submit(job)
 
-        # start
+    def when_env_ready(self, meta: dict, callback):
+        """插件的运行环境就绪后调用 callback；环境尚未创建时在后台创建，成功后再调用"""
         try:
-            log_base_path, plugin_log_dir = core.get_loggers_path()
-            plugin_name = meta.get("name")
-            self.plugin_logger = get_plugin_logger(plugin_name=core.chinese_to_pinyin_no_space(plugin_name),
-                                                   log_dir=plugin_log_dir)
-            self.append_log("******************************", True)
-            self.append_log(f"启动：{program} {' '.join(qargs)}", True)
-            self.run_btn.setEnabled(False)
-            self.stop_btn.setEnabled(True)
-            self.process.start(program, qargs)
-            # slight timeout to check start success
-            QTimer.singleShot(800, self._check_started)
-        except Exception as e:
-            self.append_log("启动失败：" + str(e), True)
-            self.run_btn.setEnabled(True)
-            self.stop_btn.setEnabled(False)
-
-    def _check_started(self):
-        if not self.process:
+            planned = plugin_env.plan(meta)
+        except plugin_env.EnvError as e:
+            QMessageBox.warning(self, "警告", str(e))
             return
-        if self.process.state() == QProcess.NotRunning:
-            # failed to start, read error
-            err = bytes(self.process.readAllStandardError()).decode(errors="ignore")
-            self.append_log("进程未启动. 错误: " + err, True)
-            self.run_btn.setEnabled(True)
-            self.stop_btn.setEnabled(False)
-
-    def on_stdout(self):
-        if not self.process:
+        if planned is not None and not plugin_env.is_ready(planned[0]):
+            self.build_env_then(meta, str(planned[0]), callback)
             return
-        data = self.process.readAllStandardOutput().data().decode('utf-8', errors='ignore')
-        if data.strip():
-            self.append_log(data.strip(), True)
+        callback()
 
-    def on_stderr(self):
-        if not self.process:
+    def when_envs_ready(self, metas: list, callback):
+        """多个插件（流水线的各步骤）的运行环境都就绪后调用 callback，环境逐个创建"""
+        if not metas:
+            callback()
             return
-        data = self.process.readAllStandardError().data().decode('utf-8', errors='ignore')
-        if data.strip():
-            self.append_log("[ERR] " + data.strip(), True)
+        self.when_env_ready(metas[0], lambda: self.when_envs_ready(metas[1:], callback))
 
-    def on_finished(self, exitCode, exitStatus):
-        self.append_log(f"进程结束，退出码：{exitCode}", True)
-        self.run_btn.setEnabled(True)
-        self.stop_btn.setEnabled(False)
-        # clear self.process after short delay
-        QTimer.singleShot(200, self._clear_process)
+    def build_env_then(self, meta: dict, env_dir: str, callback):
+        """后台创建插件的运行环境，完成后调用 callback；同一个环境只创建一次"""
+        worker = self.env_builds.get(env_dir)
+        if worker is None:
+            from ui.env_builder import EnvBuildWorker
+            worker = EnvBuildWorker(meta, self.config.get("wheel_dir"), self)
+            worker.output.connect(self.append_log)
+            worker.build_finished.connect(lambda ok, error, _dir=env_dir: self.on_env_built(_dir, ok, error))
+            self.env_builds[env_dir] = worker
+            worker.start()
+            self.append_log(f"插件 {meta.get('name', '')} 的运行环境尚未创建，正在创建，完成后自动运行")
+        worker.pending.append(callback)
 
-    def _clear_process(self):
+    def on_env_built(self, env_dir: str, ok: bool, error: str):
+        worker = self.env_builds.pop(env_dir)
+        if not ok:
+            self.append_log(error)
+            QMessageBox.warning(self, "警告", error)
+            return
+        for callback in worker.pending:
+            callback()
+
+    def build_command(self, meta: dict, args: list):
+        """
+        根据插件类型构造启动命令，出错时弹窗提示
+        :return: (program, program_args, cwd)，无法启动时返回 None
+        """
         try:
-            self.process = None
-            self.plugin_logger = None
-        except:
-            self.process = None
-            self.plugin_logger = None
+            return resolve_command(meta, args, self.config.get("java_path"))
+        except LaunchError as e:
+            if e.title == "错误":
+                QMessageBox.critical(self, e.title, str(e))
+            else:
+                QMessageBox.warning(self, e.title, str(e))
+            return None
 
-    def on_stop_clicked(self):
-        if not self.process:
+    # ---------------- 作业管理 ----------------
+    def record_run(self, job):
+        if job.started is not None:
+            self.run_history.record(job.history_record())
+
+    def on_job_submitted(self, job):
+        tab = JobTab(job, self.config.get_int("log_max_lines", 100))
+        job.state_changed.connect(self.update_stop_btn)
+        index = self.log_tabs.addTab(tab, job.title)
+        self.log_tabs.setCurrentIndex(index)
+        self.append_log(f"{job.title} 已提交")
+
+    def on_job_counts_changed(self, running: int, queued: int):
+        self.job_count_label.setText(f"运行中 {running} / 排队 {queued}" if running or queued else "")
+
+    def update_stop_btn(self, *_args):
+        tab = self.log_tabs.currentWidget()
+        self.stop_btn.setEnabled(isinstance(tab, JobTab) and tab.job.is_active())
+
+    def on_job_tab_close(self, index: int):
+        tab = self.log_tabs.widget(index)
+        if not isinstance(tab, JobTab):
+            return
+        if tab.job.is_active():
+            QMessageBox.information(self, "提示", "插件仍在运行，请先停止")
             return
-        if self.process.state() != QProcess.NotRunning:
-            self.process.kill()
-            self.append_log("已发送 kill 信号", True)
-            self.stop_btn.setEnabled(False)
+        self.log_tabs.removeTab(index)
+        tab.deleteLater()
+        tab.job.deleteLater()
+
+    def on_stop_clicked(self):
+        tab = self.log_tabs.currentWidget()
+        if isinstance(tab, JobTab):
+            tab.job.stop()
 
     def on_setting_clicked(self):
-        dlg = SettingsDialog(self.config, self)
-        if dlg.exec():
-            self.config = dlg.config
-            self.append_log("配置已更新")
+        # 保存后由 on_config_changed 应用变化的配置项
+        from ui.settings_dialog import SettingsDialog
+        SettingsDialog(self.config, self).exec()
+
+    def on_config_changed(self, changed: set):
+        """配置保存后立即生效，只处理变化了的配置项（java 路径等在启动插件时读取，不需要处理）"""
+        if "max_parallel" in changed:
+            self.scheduler.set_max_parallel(self.config.get_int("max_parallel", 1))
+        if "output_encoding" in changed:
+            self.scheduler.default_encoding = self.config.get("output_encoding")
+        if changed & {"log_retention_days", "log_max_total_mb"}:
+            self.log_janitor.set_policy(*self._log_retention())
+        if changed & {"python_pool_size", "python_pool_preload"}:
+            self._configure_python_pool()
+        if "log_max_lines" in changed:
+            max_lines = self.config.get_int("log_max_lines", 100)
+            for i in range(self.log_tabs.count()):
+                view = self.log_tabs.widget(i)
+                view = view.log_area if isinstance(view, JobTab) else view
+                view.set_max_lines(max_lines)
+        if "plugin_path" in changed:
+            folder = core.get_plugins_folder()
+            self.plugin_footer.setText("插件目录： " + str(folder))
+            self.plugin_watcher.set_root(folder)
+            self.load_plugins()
+        self.append_log("配置已更新：" + "、".join(self.config.data()[key].get("label", key) for key in sorted(changed)))
+
+    def _log_retention(self):
+        """插件日志保留策略：(保留天数, 总大小上限字节数)，0 表示不限制"""
+        return (self.config.get_int("log_retention_days", 0),
+                self.config.get_int("log_max_total_mb", 0) * 1024 * 1024)
+
+    def _configure_python_pool(self):
+        self.python_pool.configure(self.config.get_int("python_pool_size", 0),
+                                   parse_preload(self.config.get("python_pool_preload")))
 
     def on_clear_log_clicked(self):
         self.clear_log();
+
+    def on_search_log_clicked(self):
+        from ui.log_search_dialog import LogSearchDialog
+        LogSearchDialog(self.log_index, self).exec_()
+
+    def closeEvent(self, event):
+        self._closed = True
+        self.config.remove_listener(self.on_config_changed)
+        self.remember_args()
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+            self.scan_worker.wait()
+        if self.install_worker is not None:
+            # 未换入插件目录的暂存目录在下次安装时清理
+            self.install_worker.cancel()
+            self.install_worker.wait()
+        for worker in self.env_builds.values():
+            # pip 安装不能中途取消，等待其结束（未完成的环境下次启动时重新创建）
+            worker.wait()
+        # 程序退出后无法再等待优雅退出，直接强制结束所有插件进程树（包括仍打开的批量运行窗口中的作业）
+        from ui.batch_dialog import BatchDialog
+        for dlg in self.findChildren(BatchDialog):
+            dlg.scheduler.stop_all(force=True)
+        self.scheduler.stop_all(force=True)
+        self.python_pool.shutdown()
+        self.log_janitor.close()
+        self.log_index.close()
+        self.run_history.close()
+        super().closeEvent(event)
+
@@ -0,0 +1,198 @@
+import os
+import time
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QMessageBox, QTableWidget, QTableWidgetItem,
+    QHeaderView
+)
+
+import core
+from pipeline import RUN_DIR, STATE_LABELS, PipelineError, PipelineRun, list_pipelines, load_pipeline, resolve_args
+from ui.pipeline_runner import PipelineRunner
+
+
+class PipelineDialog(QDialog):
+    """
+    流水线：选择插件目录下的 *.pipeline.json 运行，各步骤作为普通作业提交到主窗口的调度器（日志在主窗口的日志页中）
+    """
+    pipeline_finished = pyqtSignal(str)  # 汇总信息
+
+    def __init__(self, plugins_dir, find_meta, build_command, when_envs_ready, scheduler, parent=None):
+        """
+        :param find_meta: 按插件名称或目录名查找插件，返回完整的 meta 或 None
+        :param build_command: 构造启动命令，出错时提示并返回 None
+        :param when_envs_ready: when_envs_ready(metas, callback)，插件的运行环境都就绪后调用 callback
+        """
+        super().__init__(parent)
+        self.plugins_dir = plugins_dir
+        self.find_meta = find_meta
+        self.build_command = build_command
+        self.when_envs_ready = when_envs_ready
+        self.scheduler = scheduler
+        self.pipeline = None
+        self.runner = None
+        self.run_dir = ""
+        self.setWindowTitle("流水线")
+        self.resize(760, 420)
+        self.init_ui()
+        self.reload()
+
+    def init_ui(self):
+        v = QVBoxLayout(self)
+        row = QHBoxLayout()
+        self.pipeline_combo = QComboBox()
+        self.refresh_btn = QPushButton("刷新")
+        row.addWidget(QLabel("流水线："))
+        row.addWidget(self.pipeline_combo, 1)
+        row.addWidget(self.refresh_btn)
+        v.addLayout(row)
+
+        self.desc_label = QLabel("")
+        self.desc_label.setWordWrap(True)
+        self.desc_label.setStyleSheet("color:#666;")
+        v.addWidget(self.desc_label)
+
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["步骤", "插件", "依赖", "状态", "作业"])
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        v.addWidget(self.table, 1)
+
+        self.summary_label = QLabel("")
+        v.addWidget(self.summary_label)
+
+        btn_row = QHBoxLayout()
+        self.start_btn = QPushButton("运行")
+        self.stop_btn = QPushButton("停止")
+        self.stop_btn.setEnabled(False)
+        btn_row.addStretch(1)
+        btn_row.addWidget(self.start_btn)
+        btn_row.addWidget(self.stop_btn)
+        v.addLayout(btn_row)
+
+        self.refresh_btn.clicked.connect(self.reload)
+        self.pipeline_combo.currentIndexChanged.connect(self.on_pipeline_changed)
+        self.start_btn.clicked.connect(self.on_start_clicked)
+        self.stop_btn.clicked.connect(self.on_stop_clicked)
+
+    def is_running(self) -> bool:
+        return self.runner is not None and not self.runner.finished
+
+    def reload(self):
+        current = self.pipeline_combo.currentData()
+        self.pipeline_combo.blockSignals(True)
+        self.pipeline_combo.clear()
+        for path in list_pipelines(self.plugins_dir):
+            self.pipeline_combo.addItem(os.path.basename(path), path)
+        self.pipeline_combo.blockSignals(False)
+        index = self.pipeline_combo.findData(current)
+        self.pipeline_combo.setCurrentIndex(max(0, index))
+        self.on_pipeline_changed()
+
+    def on_pipeline_changed(self, *_args):
+        if self.is_running():
+            return
+        self.pipeline = None
+        self.table.setRowCount(0)
+        self.summary_label.setText("")
+        path = self.pipeline_combo.currentData()
+        self.start_btn.setEnabled(False)
+        if not path:
+            self.desc_label.setText(f"插件目录下没有流水线定义（*.pipeline.json）：{self.plugins_dir}")
+            return
+        try:
+            self.pipeline = load_pipeline(path)
+        except PipelineError as e:
+            self.desc_label.setText(f"流水线定义有误：{e}")
+            return
+        self.desc_label.setText(self.pipeline["description"] or self.pipeline["name"])
+        steps = self.pipeline["steps"]
+        self.table.setRowCount(len(steps))
+        for row, step in enumerate(steps):
+            deps = sorted(self.pipeline["deps"][step["id"]])
+            if step["stdin"]:
+                deps.append(f"管道 ← {step['stdin']}")
+            for col, text in enumerate([step["id"], step["plugin"], "、".join(deps), "", ""]):
+                self.table.setItem(row, col, QTableWidgetItem(text))
+        self.table.resizeColumnsToContents()
+        self.start_btn.setEnabled(True)
+
+    def on_start_clicked(self):
+        if self.pipeline is None or self.is_running():
+            return
+        metas = {}
+        for step in self.pipeline["steps"]:
+            meta = self.find_meta(step["plugin"])
+            if meta is None:
+                QMessageBox.warning(self, "提示", f"步骤 {step['id']} 的插件不存在：{step['plugin']}")
+                return
+            metas[step["id"]] = meta
+        folder = core.sanitize_name(self.pipeline["name"]) or "pipeline"
+        run_dir = os.path.join(str(core.get_data_path()), "pipelines", folder, time.strftime("%Y%m%d-%H%M%S"))
+        try:
+            args = resolve_args(self.pipeline, metas, run_dir)
+        except PipelineError as e:
+            QMessageBox.warning(self, "参数错误", str(e))
+            return
+        unique = list({meta["path"]: meta for meta in metas.values()}.values())
+        self.start_btn.setEnabled(False)
+        self.when_envs_ready(unique, lambda: self._start(metas, args, run_dir))
+        # 运行环境创建失败时不会回调，可以重新点击运行
+        self.start_btn.setEnabled(not self.is_running())
+
+    def _start(self, metas: dict, args: dict, run_dir: str):
+        if self.is_running():
+            return
+        commands = {}
+        for sid, meta in metas.items():
+            command = self.build_command(meta, args[sid])
+            if command is None:
+                return
+            commands[sid] = command
+        if any(RUN_DIR in value for step in self.pipeline["steps"] for value in step["args"].values()):
+            os.makedirs(run_dir, exist_ok=True)
+        self.runner = PipelineRunner(PipelineRun(self.pipeline, metas, args, run_dir), commands, self.scheduler, self)
+        self.runner.step_changed.connect(self.on_step_changed)
+        self.runner.job_created.connect(self.on_job_created)
+        self.runner.run_finished.connect(self.on_run_finished)
+        self.run_dir = run_dir
+        for row in range(self.table.rowCount()):
+            self.table.item(row, 3).setText("")
+            self.table.item(row, 4).setText("")
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.pipeline_combo.setEnabled(False)
+        self.summary_label.setText(f"运行目录：{run_dir}")
+        self.runner.start()
+
+    def _row(self, sid: str) -> int:
+        return [step["id"] for step in self.pipeline["steps"]].index(sid)
+
+    def on_step_changed(self, sid: str):
+        self.table.item(self._row(sid), 3).setText(STATE_LABELS[self.runner.run.state(sid)])
+
+    def on_job_created(self, sid: str, job):
+        self.table.item(self._row(sid), 4).setText(job.title)
+
+    def on_stop_clicked(self):
+        if self.is_running():
+            self.runner.stop()
+
+    def on_run_finished(self, summary: str):
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.pipeline_combo.setEnabled(True)
+        self.summary_label.setText(f"{summary}\n运行目录：{self.run_dir}")
+        self.pipeline_finished.emit(summary)
+
+    def closeEvent(self, event):
+        if self.is_running():
+            ret = QMessageBox.question(self, "提示", "流水线仍在运行，是否停止并关闭？")
+            if ret != QMessageBox.Yes:
+                event.ignore()
+                return
+            self.runner.stop()
+        super().closeEvent(event)
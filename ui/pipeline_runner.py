@@ -0,0 +1,72 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from pipeline import PipelineRun
+from ui.job_scheduler import FINISHED, JobScheduler
+
+
+class PipelineRunner(QObject):
+    """
+    在作业调度器中执行一次流水线：依赖都已成功的步骤组提交为作业（管道相连的步骤同时启动），
+    步骤失败时停止管道另一端的步骤，依赖它的步骤不再提交
+    """
+    step_changed = pyqtSignal(str)  # 步骤 id（状态见 PipelineRun.state）
+    job_created = pyqtSignal(str, object)  # 步骤 id, PluginJob
+    run_finished = pyqtSignal(str)  # 汇总信息
+
+    def __init__(self, run: PipelineRun, commands: dict, scheduler: JobScheduler, parent=None):
+        """
+        :param commands: {步骤: (program, program_args, cwd)}，启动前已全部构造好（见 launcher.resolve_command）
+        """
+        super().__init__(parent)
+        self.run = run
+        self.commands = commands
+        self.scheduler = scheduler
+        self.jobs = {}  # 步骤 -> PluginJob
+        self.finished = False
+
+    def start(self):
+        self._submit_ready()
+
+    def stop(self):
+        for sid in self.run.stop():
+            self.jobs[sid].stop()
+        for sid in self.run.step_ids():
+            self.step_changed.emit(sid)
+        self._check_finished()
+
+    def _submit_ready(self):
+        for group in self.run.ready_groups():
+            jobs = []
+            for sid in group:
+                program, program_args, cwd = self.commands[sid]
+                job = self.scheduler.create_job(self.run.metas[sid], self.run.args[sid], program, program_args, cwd)
+                job.done.connect(lambda _code, _sid=sid, _job=job: self._on_job_done(_sid, _job))
+                self.jobs[sid] = job
+                jobs.append(job)
+                self.job_created.emit(sid, job)
+            for sid in group:
+                source = self.run.stdin_of[sid]
+                if source is not None:
+                    self.jobs[source].pipe_to(self.jobs[sid])
+            self.run.mark_running(group)
+            for sid in group:
+                self.step_changed.emit(sid)
+            if len(jobs) == 1:
+                self.scheduler.submit(jobs[0])
+            else:
+                self.scheduler.submit_group(jobs)
+
+    def _on_job_done(self, sid: str, job):
+        partners, skipped = self.run.step_done(sid, job.state == FINISHED and job.exit_code == 0)
+        for partner in partners:
+            self.jobs[partner].append_log(f"流水线步骤 {sid} 失败，停止本步骤")
+            self.jobs[partner].stop()
+        for changed in [sid] + skipped:
+            self.step_changed.emit(changed)
+        self._submit_ready()
+        self._check_finished()
+
+    def _check_finished(self):
+        if not self.finished and self.run.is_finished():
+            self.finished = True
+            self.run_finished.emit(self.run.summary())
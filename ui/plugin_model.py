@@ -0,0 +1,187 @@
+import bisect
+from collections import namedtuple
+from pathlib import Path
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QSortFilterProxyModel, Qt
+
+from plugin_search import matches
+
+# 列表中的一个插件：只保留显示、排序、搜索需要的字段，完整的 plugin.json（参数定义等）选中时再读取
+PluginRecord = namedtuple("PluginRecord", ["path", "name", "version", "type", "description", "search"])
+
+SORT_MODES = (("folder", "按目录排序"), ("name", "按名称排序"), ("type", "按类型分组"))
+
+
+def plugin_record(meta: dict) -> PluginRecord:
+    """由扫描得到的插件 meta 生成列表记录"""
+    return PluginRecord(meta["path"], str(meta.get("name") or Path(meta["path"]).name), str(meta.get("version", "")),
+                        str(meta.get("type", "")).lower(), str(meta.get("description", "")), meta.get("_search", ""))
+
+
+def type_label(record: PluginRecord) -> str:
+    return record.type or "未指定类型"
+
+
+class PluginListModel(QAbstractListModel):
+    """
+    插件列表模型
+
+    records 按当前排序方式有序（同时保存排序键，增删时二分查找位置），切换排序只重排记录、不重建条目；
+    扫描结果通过 add()（全量扫描的批次）与 merge()（增量同步）更新，只通知有变化的行。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self.keys = []
+        self.by_path = {}  # 插件目录 -> PluginRecord
+        self.sort_mode = "folder"
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.records[index.row()]
+        if role == Qt.DisplayRole:
+            text = record.name
+            if record.version:
+                text += f"  v{record.version}"
+            if self.sort_mode == "type":
+                text = f"[{type_label(record)}] {text}"
+            return text
+        if role == Qt.ToolTipRole:
+            return record.description
+        return None
+
+    def record(self, row: int) -> PluginRecord:
+        return self.records[row]
+
+    def sort_key(self, record: PluginRecord) -> tuple:
+        if self.sort_mode == "name":
+            return record.name.lower(), record.path
+        if self.sort_mode == "type":
+            return type_label(record), record.name.lower(), record.path
+        return (record.path,)
+
+    def row_of(self, path: str) -> int:
+        """插件所在的行，不在列表中时返回 -1"""
+        record = self.by_path.get(path)
+        if record is None:
+            return -1
+        return bisect.bisect_left(self.keys, self.sort_key(record))
+
+    def find(self, name: str):
+        """按插件名称或目录名查找（大小写不敏感，与 launcher.find_plugin 一致）"""
+        lowered = name.lower()
+        for record in self.records:
+            if record.name.lower() == lowered or Path(record.path).name.lower() == lowered:
+                return record
+        return None
+
+    def set_sort_mode(self, mode: str):
+        if mode == self.sort_mode:
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_rows = {record.path: row for row, record in enumerate(self.records)}
+        self.sort_mode = mode
+        self.records.sort(key=self.sort_key)
+        self.keys = [self.sort_key(r) for r in self.records]
+        # 选中项、当前项等随记录移动到新的行
+        persistent = self.persistentIndexList()
+        new_rows = {record.path: row for row, record in enumerate(self.records)}
+        moved = {row: new_rows[path] for path, row in old_rows.items()}
+        self.changePersistentIndexList(persistent, [self.index(moved[i.row()]) for i in persistent])
+        self.layoutChanged.emit()
+
+    def clear(self):
+        self.beginResetModel()
+        self.records = []
+        self.keys = []
+        self.by_path = {}
+        self.endResetModel()
+
+    def add(self, records: list):
+        """加入一批新插件（全量扫描按目录名有序地分批到达，按目录排序时整批追加到末尾）"""
+        records = sorted(records, key=self.sort_key)
+        if not records:
+            return
+        keys = [self.sort_key(r) for r in records]
+        if not self.keys or keys[0] > self.keys[-1]:
+            start = len(self.records)
+            self.beginInsertRows(QModelIndex(), start, start + len(records) - 1)
+            self.records.extend(records)
+            self.keys.extend(keys)
+            self.by_path.update((r.path, r) for r in records)
+            self.endInsertRows()
+            return
+        for record, key in zip(records, keys):
+            self._insert(record, key)
+
+    def _insert(self, record: PluginRecord, key: tuple):
+        row = bisect.bisect_left(self.keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.records.insert(row, record)
+        self.keys.insert(row, key)
+        self.by_path[record.path] = record
+        self.endInsertRows()
+
+    def _remove(self, path: str):
+        row = self.row_of(path)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.records[row]
+        del self.keys[row]
+        del self.by_path[path]
+        self.endRemoveRows()
+
+    def merge(self, records: list):
+        """
+        用新的完整插件列表增量更新模型
+        :return: (新增, 更新, 移除) 的插件目录列表
+        """
+        new_paths = {r.path for r in records}
+        removed = [path for path in self.by_path if path not in new_paths]
+        for path in removed:
+            self._remove(path)
+        added, updated = [], []
+        for record in records:
+            old = self.by_path.get(record.path)
+            if old is None:
+                self._insert(record, self.sort_key(record))
+                added.append(record.path)
+            elif old != record:
+                updated.append(record.path)
+                key = self.sort_key(record)
+                row = self.row_of(record.path)
+                if key == self.keys[row]:
+                    self.records[row] = record
+                    self.by_path[record.path] = record
+                    self.dataChanged.emit(self.index(row), self.index(row))
+                else:
+                    # 排序位置变了（改名等）：移除后按新位置插入
+                    self._remove(record.path)
+                    self._insert(record, key)
+        return added, updated, removed
+
+
+class PluginFilterProxy(QSortFilterProxyModel):
+    """按搜索关键词过滤插件（匹配 plugin_search.search_text 预先算好的文本），并给可见的行编号"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.keywords = []
+
+    def set_keywords(self, keywords: list):
+        if keywords != self.keywords:
+            self.keywords = keywords
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return not self.keywords or matches(self.sourceModel().records[source_row].search, self.keywords)
+
+    def data(self, index, role=Qt.DisplayRole):
+        value = super().data(index, role)
+        if role == Qt.DisplayRole and value is not None:
+            return f"{index.row() + 1}. {value}"
+        return value
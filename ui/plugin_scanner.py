@@ -0,0 +1,50 @@
+import logging
+import os
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from plugin_index import PluginIndex
+from ui.plugin_model import plugin_record
+
+
+class PluginScanWorker(QThread):
+    """
+    后台扫描插件目录，按批次把插件发回 GUI 线程
+    发回的是精简的 PluginRecord（不含参数定义等），完整的清单由界面在选中插件时通过 PluginIndex.manifest 读取
+    """
+    batch_ready = pyqtSignal(list)  # 一批 PluginRecord（按目录名有序）
+    progress = pyqtSignal(int, int)  # 已扫描目录数, 目录总数
+    scan_finished = pyqtSignal(dict)  # PluginIndex.scan 的结果，其中 plugins 换成了 PluginRecord
+
+    def __init__(self, index: PluginIndex, folder, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.folder = folder
+        # 解析以 IO 为主，线程数略多于 CPU 数可以掩盖网络盘的延迟
+        self.workers = min(16, (os.cpu_count() or 1) * 2)
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def run(self):
+        try:
+            result = self.index.scan(self.folder, workers=self.workers,
+                                     on_batch=self._on_batch,
+                                     is_cancelled=self.isInterruptionRequested)
+        except Exception as e:
+            # 插件目录不可访问（网络盘断开、路径指向文件等）：error 非空，界面保留现有列表
+            logging.exception(f"扫描插件目录失败：{self.folder}")
+            result = {"plugins": [], "failed": [(str(self.folder), str(e))], "dirs": [], "parsed": 0, "reused": 0,
+                      "removed": 0, "cancelled": False, "error": str(e)}
+        try:
+            self.index.save()
+        except Exception as e:
+            # 索引写不进去不影响本次扫描结果，scan_finished 必须发出，否则界面一直停在扫描中
+            print("save plugin index failed", e)
+        result["plugins"] = [plugin_record(meta) for meta in result["plugins"]]
+        self.scan_finished.emit(result)
+
+    def _on_batch(self, plugins, done, total):
+        if plugins:
+            self.batch_ready.emit([plugin_record(meta) for meta in plugins])
+        self.progress.emit(done, total)
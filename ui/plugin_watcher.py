@@ -0,0 +1,54 @@
+import os
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+
+class PluginFolderWatcher(QObject):
+    """
+    监听插件根目录及各插件目录的变化，合并（防抖）后发出一次 changed 信号
+
+    批量拷贝几百个插件时会产生大量文件系统事件，这里只在最后一次事件之后
+    静默 debounce_ms 毫秒才通知，由界面做一次增量同步。
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, debounce_ms: int = 500, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._on_event)
+        self.watcher.fileChanged.connect(self._on_event)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self.changed.emit)
+        self.root = None
+        self.plugin_dirs = set()
+
+    def set_root(self, root):
+        """切换监听的插件根目录"""
+        self.clear()
+        self.root = str(root)
+        if os.path.isdir(self.root):
+            self.watcher.addPath(self.root)
+
+    def sync_plugin_dirs(self, plugin_dirs):
+        """让被监听的插件目录与当前插件列表保持一致"""
+        wanted = set(plugin_dirs)
+        remove = self.plugin_dirs - wanted
+        add = wanted - self.plugin_dirs
+        if remove:
+            self.watcher.removePaths(list(remove))
+        if add:
+            self.watcher.addPaths(list(add))
+        self.plugin_dirs = wanted
+
+    def clear(self):
+        self.timer.stop()
+        paths = self.watcher.directories() + self.watcher.files()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.plugin_dirs = set()
+
+    def _on_event(self, _path):
+        # 每次事件都重新计时，连续事件只触发一次
+        self.timer.start()
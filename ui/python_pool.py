@@ -0,0 +1,116 @@
+import logging
+
+from PyQt5.QtCore import QObject, QProcess, QTimer
+
+import supervisor
+from plugin_env import python_program
+from py_worker import job_line, worker_args
+
+# 空闲预热进程意外退出后，延迟多久补充（毫秒）；连续失败超过 MAX_FAILURES 次则停用进程池
+RESPAWN_DELAY_MS = 1000
+MAX_FAILURES = 3
+
+
+class PythonWorkerPool(QObject):
+    """
+    预热 Python 解释器池（可选，设置中的预热进程数为 0 时关闭）
+
+    池中保持 size 个已启动并导入了 preload 模块的解释器；
+    py 插件运行时取走一个（take），插件在其中以 __main__ 方式运行，同时在后台补充新的预热进程。
+    """
+
+    def __init__(self, size: int = 0, preload: list = None, parent=None):
+        super().__init__(parent)
+        self.size = 0
+        self.preload = []
+        self.program = None
+        self.grouped = False  # 预热进程是否运行在独立进程组中（见 supervisor.wrap_command）
+        self.idle = []  # 空闲的预热进程
+        self.failures = 0
+        self.configure(size, preload or [])
+
+    def configure(self, size: int, preload: list):
+        """调整进程池大小 / 预先导入的模块；预先导入的模块变化时重建全部空闲进程"""
+        if list(preload) != self.preload:
+            self.shutdown()
+        self.size = max(0, size)
+        self.preload = list(preload)
+        if self.size and self.program is None:
+            self.program = python_program()
+        self.failures = 0
+        while len(self.idle) > self.size:
+            self._discard(self.idle.pop())
+        self._fill()
+
+    def accepts(self, meta: dict, program: str, program_args: list) -> bool:
+        """
+        插件能否在预热进程中运行：py 入口脚本、使用同一个 python、未配置资源限制（限制在进程启动时设置），
+        且 plugin.json 未声明 "warm_start": false
+        """
+        limits = supervisor.read_limits(meta)
+        return (self.size > 0 and program == self.program and bool(program_args)
+                and program_args[0].lower().endswith(".py") and meta.get("warm_start", True) is not False
+                and not limits["memory_mb"] and not limits["cpu_seconds"])
+
+    def take(self, program: str, script: str, argv: list, cwd: str):
+        """
+        取一个空闲的预热进程运行插件脚本
+        :return: 已写入任务的 QProcess（调用方负责 setParent 与信号连接）；没有可用进程时返回 None
+        """
+        if program != self.program:
+            return None
+        while self.idle:
+            process = self.idle.pop(0)
+            process.finished.disconnect(self._on_idle_finished)
+            if process.state() != QProcess.Running:
+                self._discard(process)
+                continue
+            # 预热阶段的输出（例如导入模块时的警告）不属于本次插件运行
+            process.readAll()
+            process.write(job_line(script, argv, cwd))
+            QTimer.singleShot(0, self._fill)
+            return process
+        QTimer.singleShot(0, self._fill)
+        return None
+
+    def shutdown(self):
+        """结束全部空闲的预热进程"""
+        while self.idle:
+            self._discard(self.idle.pop())
+
+    def _fill(self):
+        if self.program is None:
+            return
+        while len(self.idle) < self.size and self.failures < MAX_FAILURES:
+            program, args, self.grouped = supervisor.wrap_command(self.program, worker_args(self.preload), {})
+            process = QProcess(self)
+            process.setProcessChannelMode(QProcess.MergedChannels)
+            process.finished.connect(self._on_idle_finished)
+            process.start(program, args)
+            self.idle.append(process)
+
+    def _on_idle_finished(self, *_args):
+        process = self.sender()
+        if process not in self.idle:
+            return
+        self.idle.remove(process)
+        output = bytes(process.readAll()).decode("utf-8", "replace").strip()
+        process.deleteLater()
+        self.failures += 1
+        logging.warning(f"预热 Python 进程意外退出（{self.failures}/{MAX_FAILURES}）：{output[-500:]}")
+        if self.failures >= MAX_FAILURES:
+            logging.warning("预热 Python 进程连续启动失败，已停用预热，插件改为直接启动")
+            return
+        QTimer.singleShot(RESPAWN_DELAY_MS, self._fill)
+
+    @staticmethod
+    def _discard(process: QProcess):
+        try:
+            process.finished.disconnect()
+        except TypeError:
+            pass
+        if process.state() != QProcess.NotRunning:
+            supervisor.kill_tree(int(process.processId()))
+            process.kill()
+            process.waitForFinished(1000)
+        process.deleteLater()
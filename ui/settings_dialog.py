@@ -7,11 +7,13 @@ import core
 
 
 class SettingsDialog(QDialog):
-    def __init__(self, config: dict, parent=None):
+    def __init__(self, config: core.Config, parent=None):
         super().__init__(parent)
         self.setWindowTitle("设置")
         self.resize(600, 200)
-        self.config = config.copy()
+        self.service = config
+        self.config = config.snapshot()
+        self.changed = set()  # 保存时发生变化的配置项
         self.id_form_map = {}
         self.form_layout = QFormLayout(self)
         self.load_params()
@@ -104,6 +106,10 @@ class SettingsDialog(QDialog):
             if isinstance(widget, QComboBox):
                 value = widget.currentText()
             self.config[key]["value"] = value
-        core.save_config(self.config)
+        try:
+            self.changed = self.service.update({key: item["value"] for key, item in self.config.items()})
+        except OSError as e:
+            QMessageBox.critical(self, "失败", f"保存设置失败：{e}")
+            return
         QMessageBox.information(self, "成功", "设置已保存")
         self.accept()
@@ -0,0 +1,116 @@
+import os
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox
+)
+
+from plugin_installer import InstallError
+from plugin_store import PluginStore
+
+
+class VersionDialog(QDialog):
+    """
+    插件的版本管理：查看仓库中保存的版本，启用（切换 / 回滚）或删除历史版本
+    """
+
+    def __init__(self, store: PluginStore, name: str, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.name = name
+        self.versions = []
+        self.changed = False  # 是否切换过版本（关闭后需要刷新插件列表）
+        self.setWindowTitle(f"版本管理 - {name}")
+        self.resize(760, 360)
+
+        v = QVBoxLayout(self)
+        self.tip_label = QLabel("")
+        self.tip_label.setStyleSheet("color:#666;")
+        v.addWidget(self.tip_label)
+
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["版本", "安装时间", "文件数", "来源", "状态"])
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        v.addWidget(self.table, 1)
+
+        btn_row = QHBoxLayout()
+        self.activate_btn = QPushButton("启用所选版本")
+        self.remove_btn = QPushButton("删除所选版本")
+        self.activate_btn.setEnabled(False)
+        self.remove_btn.setEnabled(False)
+        btn_row.addStretch(1)
+        btn_row.addWidget(self.activate_btn)
+        btn_row.addWidget(self.remove_btn)
+        v.addLayout(btn_row)
+
+        self.table.itemSelectionChanged.connect(self.update_buttons)
+        self.table.itemDoubleClicked.connect(lambda _item: self.on_activate_clicked())
+        self.activate_btn.clicked.connect(self.on_activate_clicked)
+        self.remove_btn.clicked.connect(self.on_remove_clicked)
+        self.reload()
+
+    def reload(self):
+        self.versions = self.store.versions(self.name)
+        active = self.store.active_version(self.name)
+        active_id = active["id"] if active else None
+        self.table.setRowCount(len(self.versions))
+        for i, version in enumerate(self.versions):
+            label = version.get("version") or version["id"]
+            cells = [label, version.get("installed", ""), str(len(version["files"])),
+                     os.path.basename(version.get("source", "")) or version.get("source", ""),
+                     "当前版本" if version["id"] == active_id else ""]
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if col == 0:
+                    item.setToolTip(f"版本标识：{version['id']}")
+                self.table.setItem(i, col, item)
+        self.table.resizeColumnsToContents()
+        if not self.versions:
+            self.tip_label.setText("该插件不在插件仓库中（手动拷贝的插件在下次上传新版本时加入仓库）")
+        else:
+            self.tip_label.setText(f"共 {len(self.versions)} 个版本，相同的文件在各版本间只保存一份")
+        self.update_buttons()
+
+    def _selected(self):
+        row = self.table.currentRow()
+        if 0 <= row < len(self.versions) and self.table.selectedItems():
+            return self.versions[row]
+        return None
+
+    def update_buttons(self):
+        version = self._selected()
+        active = self.store.active_version(self.name)
+        is_active = version is not None and active is not None and version["id"] == active["id"]
+        self.activate_btn.setEnabled(version is not None and not is_active)
+        self.remove_btn.setEnabled(version is not None and not is_active)
+
+    def on_activate_clicked(self):
+        version = self._selected()
+        if version is None:
+            return
+        try:
+            self.store.activate(self.name, version["id"])
+        except InstallError as e:
+            QMessageBox.critical(self, "切换失败", str(e))
+            return
+        self.changed = True
+        self.reload()
+
+    def on_remove_clicked(self):
+        version = self._selected()
+        if version is None:
+            return
+        label = version.get("version") or version["id"]
+        ret = QMessageBox.question(self, "删除版本", f"确定删除版本 {label}？删除后不能再回滚到该版本",
+                                   QMessageBox.Yes | QMessageBox.No)
+        if ret != QMessageBox.Yes:
+            return
+        try:
+            self.store.remove_version(self.name, version["id"])
+        except InstallError as e:
+            QMessageBox.critical(self, "删除失败", str(e))
+            return
+        self.reload()